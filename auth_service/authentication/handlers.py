@@ -0,0 +1,17 @@
+"""
+📥 Réactions de auth_service aux événements des autres services.
+"""
+from commun.events import consommateur
+from .models import AuditLog
+
+
+@consommateur('rh.employe_modifie', 'rh.employe_supprime')
+def journaliser_evenement_rh(message):
+    """Les changements d'employés rh_service rejoignent le journal d'audit central."""
+    AuditLog.objects.create(
+        user=None,
+        action_type=message['type'].upper().replace('.', '_'),
+        entity_type=message['aggregate_type'],
+        entity_id=message['aggregate_id'],
+        details={**message['payload'], 'service': message['service'], 'event_id': message['event_id']},
+    )
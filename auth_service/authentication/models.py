@@ -1,7 +1,10 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
+from commun.models import CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase
+from commun.events import publier_evenement
+
 # ============================================================
 # 👤 Rôles utilisateurs
 # ============================================================
@@ -74,6 +77,30 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'Utilisateur'
         verbose_name_plural = 'Utilisateurs'
 
+    # Champs dont la modification est diffusée aux autres services
+    CHAMPS_PUBLIES = {'username', 'email', 'full_name', 'role', 'magasin_id', 'is_active'}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Les mises à jour techniques (last_login, mot de passe) ne sont pas publiées
+        if update_fields is not None and not self.CHAMPS_PUBLIES.intersection(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            publier_evenement('auth.utilisateur_modifie', self, {
+                'username': self.username,
+                'full_name': self.full_name,
+                'role': self.role,
+                'magasin_id': self.magasin_id,
+                'is_active': self.is_active,
+            })
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            publier_evenement('auth.utilisateur_supprime', self, {'username': self.username})
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -148,3 +175,18 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
+
+
+# ============================================================
+# 📨 Outbox transactionnelle et bus d'événements (voir commun/events.py)
+# ============================================================
+class EvenementOutbox(EvenementOutboxBase):
+    pass
+
+
+class EvenementConsomme(EvenementConsommeBase):
+    pass
+
+
+class CurseurConsommateur(CurseurConsommateurBase):
+    pass
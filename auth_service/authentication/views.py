@@ -361,21 +361,12 @@ def receive_external_log(request):
         return Response({"status": "error", "message": str(e)}, status=500)
 
 class CombinedLogsView(APIView):
+    """
+    Journal combiné : les événements rh_service arrivent par le bus d'événements
+    (voir handlers.py) et sont déjà enregistrés dans AuditLog.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Logs locaux auth_service
-        local_logs = AuditLog.objects.all().order_by('-timestamp')
-        local_serialized = AuditLogSerializer(local_logs, many=True).data
-
-        # Optionnel : récupérer les logs RH depuis rh_service
-        try:
-            response = requests.get("http://rh_service:8000/api/rh/logs/", timeout=5)
-            rh_logs = response.json() if response.status_code == 200 else []
-        except Exception as e:
-            print(f"Erreur récupération logs RH : {e}")
-            rh_logs = []
-
-        all_logs = local_serialized + rh_logs
-        all_logs_sorted = sorted(all_logs, key=lambda x: x['timestamp'], reverse=True)
-        return Response(all_logs_sorted)
\ No newline at end of file
+        logs = AuditLog.objects.select_related('user').order_by('-timestamp')
+        return Response(AuditLogSerializer(logs, many=True).data)
@@ -14,6 +14,9 @@ python manage.py makemigrations authentication --noinput
 echo "📦 Applying all migrations..."
 python manage.py migrate --noinput
 
+echo "📨 Preparing event bus database..."
+python manage.py preparer_bus
+
 echo "⚙️ Collecting static files..."
 python manage.py collectstatic --noinput
 
@@ -0,0 +1,123 @@
+"""
+Point d'entrée : python -m benchmarks <commande>
+
+    run      exécute les workloads d'un ou plusieurs services
+    compare  compare un rapport avec une baseline (code retour 1 si régression)
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.compare import compare, load_report
+from benchmarks.harness import REPO_ROOT, SCALES, SERVICES
+
+
+def _run_one(args, service):
+    # Un processus par service : chaque service est un projet Django distinct
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        output = tmp.name
+    cmd = [
+        sys.executable, "-m", "benchmarks", "_run_service", service,
+        "--db", args.db, "--scale", args.scale,
+        "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+        "--seed", str(args.seed), "--output", output,
+    ]
+    if args.regenerate:
+        cmd.append("--regenerate")
+    for name in args.only or []:
+        cmd += ["--only", name]
+    subprocess.run(cmd, cwd=REPO_ROOT, check=True)
+    return json.loads(Path(output).read_text())
+
+
+def cmd_run(args):
+    services = list(SERVICES) if args.service == "all" else [args.service]
+    report = {"services": {service: _run_one(args, service) for service in services}}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Rapport écrit dans {args.output}")
+
+    if args.baseline:
+        return _report_regressions(report, load_report(args.baseline), args)
+    return 0
+
+
+def cmd_run_service(args):
+    from benchmarks.harness import run, write_report
+
+    report = run(
+        args.service, db=args.db, scale=args.scale, iterations=args.iterations,
+        warmup=args.warmup, only=args.only, regenerate=args.regenerate, seed=args.seed,
+    )
+    write_report(report, args.output)
+    return 0
+
+
+def cmd_compare(args):
+    return _report_regressions(load_report(args.current), load_report(args.baseline), args)
+
+
+def _report_regressions(current, baseline, args):
+    regressions = compare(current, baseline, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("✅ Aucune régression par rapport à la baseline.")
+    return 0
+
+
+def _add_threshold_args(parser):
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Dégradation relative tolérée (0.20 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Écart absolu minimal de p95 pour signaler une régression")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_args(p, service_choices):
+        p.add_argument("service", choices=service_choices)
+        p.add_argument("--db", choices=["sqlite", "postgres"], default="sqlite")
+        p.add_argument("--scale", choices=list(SCALES), default="small")
+        p.add_argument("--iterations", type=int, default=100)
+        p.add_argument("--warmup", type=int, default=5)
+        p.add_argument("--seed", type=int, default=42)
+        p.add_argument("--only", action="append", help="Limiter à un workload (répétable)")
+        p.add_argument("--regenerate", action="store_true",
+                       help="Vider la base et régénérer les données synthétiques")
+
+    run = sub.add_parser("run", help="Exécuter les benchmarks")
+    add_run_args(run, list(SERVICES) + ["all"])
+    run.add_argument("--output", help="Fichier JSON du rapport")
+    run.add_argument("--baseline", help="Rapport de référence à comparer")
+    _add_threshold_args(run)
+    run.set_defaults(func=cmd_run)
+
+    run_service = sub.add_parser("_run_service")
+    add_run_args(run_service, list(SERVICES))
+    run_service.add_argument("--output", required=True)
+    run_service.set_defaults(func=cmd_run_service)
+
+    cmp = sub.add_parser("compare", help="Comparer un rapport avec une baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("baseline")
+    _add_threshold_args(cmp)
+    cmp.set_defaults(func=cmd_compare)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Comparaison d'un rapport de benchmark avec une baseline.
+
+Une régression est signalée quand, pour un workload présent des deux côtés :
+    - le p95 dépasse la baseline de plus de `threshold` (relatif) ET de plus de
+      `min_delta_ms` (absolu, pour ignorer le bruit sur les appels très rapides) ;
+    - ou le débit baisse de plus de `threshold` ;
+    - ou le nombre maximal de requêtes SQL augmente ;
+    - ou le nombre de requêtes SQL dépasse le budget `max_queries` du workload ;
+    - ou des erreurs apparaissent alors que la baseline n'en avait pas.
+"""
+import json
+from pathlib import Path
+
+
+def load_report(path):
+    return json.loads(Path(path).read_text())
+
+
+def _services(report):
+    # Rapport multi-services {"services": {...}} ou rapport d'un seul service
+    if "services" in report:
+        return report["services"]
+    return {report["service"]: report}
+
+
+def compare(current, baseline, threshold=0.20, min_delta_ms=1.0):
+    """Retourne la liste des régressions (chaînes lisibles)."""
+    regressions = []
+    base_services = _services(baseline)
+
+    for service, report in _services(current).items():
+        base_workloads = base_services.get(service, {}).get("workloads", {})
+        for name, stats in report["workloads"].items():
+            label = f"{service}.{name}"
+
+            budget = stats.get("max_queries")
+            if budget is not None and stats["queries_max"] > budget:
+                regressions.append(
+                    f"{label}: {stats['queries_max']} requêtes SQL (budget {budget})"
+                )
+
+            base = base_workloads.get(name)
+            if base is None:
+                continue
+
+            delta = stats["p95_ms"] - base["p95_ms"]
+            if delta > min_delta_ms and stats["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{label}: p95 {base['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms "
+                    f"(+{delta / base['p95_ms'] * 100 if base['p95_ms'] else 100:.0f}%)"
+                )
+
+            if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{label}: débit {base['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s"
+                )
+
+            if stats["queries_max"] > base["queries_max"]:
+                regressions.append(
+                    f"{label}: requêtes SQL {base['queries_max']} -> {stats['queries_max']}"
+                )
+
+            if stats["errors"] and not base["errors"]:
+                regressions.append(f"{label}: {stats['errors']} erreurs (0 dans la baseline)")
+
+    return regressions
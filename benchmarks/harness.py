@@ -0,0 +1,252 @@
+"""
+Moteur du benchmark : démarrage Django d'un service, exécution des workloads,
+mesure des latences (p50/p95/p99), du débit et du nombre de requêtes SQL.
+"""
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# service -> (dossier du projet Django, module de settings)
+SERVICES = {
+    "auth": ("auth_service", "auth_service.settings"),
+    "rh": ("rh_service", "rh_service.settings"),
+    "stock": ("stock_service", "stock_service.settings"),
+    "finance": ("finance_service", "finance_service.settings"),
+    "cordo": ("cordo_service", "cordo_service.settings"),
+}
+
+# Volumes générés par niveau. "large" correspond aux volumes de production visés.
+SCALES = {
+    "small": {
+        "magasins": 20, "articles": 200, "stocks": 2_000, "mouvements": 20_000, "inventaires": 50,
+        "employes": 500, "conges": 1_500, "contrats": 800, "affectations": 600,
+        "audit_logs": 20_000, "users": 200,
+        "demandes_decaissement": 2_000, "depenses": 1_500, "bulletins": 1_000, "validations": 500,
+        "coordinateurs": 10, "dossiers": 2_000,
+    },
+    "medium": {
+        "magasins": 500, "articles": 2_000, "stocks": 50_000, "mouvements": 300_000, "inventaires": 500,
+        "employes": 5_000, "conges": 15_000, "contrats": 8_000, "affectations": 6_000,
+        "audit_logs": 200_000, "users": 1_000,
+        "demandes_decaissement": 20_000, "depenses": 15_000, "bulletins": 10_000, "validations": 5_000,
+        "coordinateurs": 30, "dossiers": 20_000,
+    },
+    "large": {
+        "magasins": 2_000, "articles": 5_000, "stocks": 200_000, "mouvements": 2_000_000, "inventaires": 2_000,
+        "employes": 20_000, "conges": 60_000, "contrats": 30_000, "affectations": 25_000,
+        "audit_logs": 1_000_000, "users": 5_000,
+        "demandes_decaissement": 100_000, "depenses": 80_000, "bulletins": 60_000, "validations": 20_000,
+        "coordinateurs": 100, "dossiers": 100_000,
+    },
+}
+
+BATCH_SIZE = 5_000
+
+
+@dataclass
+class Workload:
+    """Une opération chronométrée (appel HTTP ou opération modèle)."""
+    name: str
+    call: Callable[["BenchContext"], Any]
+    description: str = ""
+    # Budget de requêtes SQL par appel (None = pas de budget)
+    max_queries: Optional[int] = None
+
+
+@dataclass
+class BenchContext:
+    service: str
+    client: Any = None
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+    data: dict = field(default_factory=dict)
+    # Nombre total d'appels prévus par workload (warmup inclus)
+    budget: int = 0
+
+    def pick(self, key):
+        return self.rng.choice(self.data[key])
+
+
+# ============================================================
+# ⚙️ Démarrage Django
+# ============================================================
+def setup_django(service: str, db: str = "sqlite"):
+    """Configure et démarre Django pour un service, puis applique les migrations."""
+    project_dir, settings_module = SERVICES[service]
+    sys.path.insert(0, str(REPO_ROOT / project_dir))
+    sys.path.insert(0, str(REPO_ROOT))
+    os.environ["BENCH_SERVICE"] = service
+    os.environ["BENCH_SERVICE_SETTINGS"] = settings_module
+    os.environ["BENCH_DB"] = db
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+
+    import django
+    from django.core.management import call_command
+
+    # Secret JWT de développement (< 32 octets) : avertissement sans intérêt ici
+    warnings.filterwarnings("ignore", message="The HMAC key is")
+    django.setup()
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def load_scenario(service: str):
+    return importlib.import_module(f"benchmarks.scenarios.{service}")
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    """Insère une séquence (éventuellement un générateur) par lots."""
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def make_service_token(role="admin", user_id=None, **claims):
+    """Signe un JWT identique à celui vérifié par Kong / KongJWTAuthentication."""
+    import jwt
+    from django.conf import settings
+
+    payload = {
+        "iss": settings.JWT_ISSUER,
+        "sub": str(user_id or uuid.uuid4()),
+        "username": "bench",
+        "role": role,
+        "exp": datetime.now(dt_timezone.utc) + timedelta(hours=6),
+        **claims,
+    }
+    token = jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return token.decode("utf-8") if isinstance(token, bytes) else token
+
+
+def api_client(token=None):
+    """Client DRF in-process (pas de réseau, pas de Kong)."""
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if token:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+# ============================================================
+# 📊 Mesures
+# ============================================================
+def percentile(sorted_values, pct):
+    """Percentile par rang le plus proche sur une liste déjà triée."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100.0 * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+def _is_error(result):
+    status_code = getattr(result, "status_code", None)
+    return status_code is not None and status_code >= 400
+
+
+def run_workload(ctx: BenchContext, workload: Workload, iterations: int, warmup: int):
+    from collections import deque
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # Journal des requêtes assez grand pour les pires endpoints (N+1 sur gros volumes)
+    connection.queries_log = deque(maxlen=1_000_000)
+
+    for _ in range(warmup):
+        try:
+            workload.call(ctx)
+        except Exception:
+            pass
+
+    durations, query_counts = [], []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            t0 = time.perf_counter()
+            try:
+                result = workload.call(ctx)
+            except Exception:
+                result = None
+                errors += 1
+            else:
+                if _is_error(result):
+                    errors += 1
+            durations.append((time.perf_counter() - t0) * 1000.0)
+        query_counts.append(len(captured.captured_queries))
+    elapsed = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "p99_ms": round(percentile(durations, 99), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3) if durations else 0.0,
+        "throughput_rps": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "queries_mean": round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+        "queries_max": max(query_counts) if query_counts else 0,
+        "max_queries": workload.max_queries,
+    }
+
+
+def run(service, db="sqlite", scale="small", iterations=100, warmup=5,
+        only=None, regenerate=False, seed=42, log=print):
+    setup_django(service, db)
+    scenario = load_scenario(service)
+    counts = SCALES[scale]
+
+    if regenerate or not scenario.is_populated():
+        from django.core.management import call_command
+
+        call_command("flush", verbosity=0, interactive=False)
+        log(f"[{service}] génération des données ({scale})...")
+        t0 = time.perf_counter()
+        scenario.generate(counts, random.Random(seed))
+        log(f"[{service}] données générées en {time.perf_counter() - t0:.1f}s")
+
+    ctx = BenchContext(service=service, rng=random.Random(seed), budget=iterations + warmup)
+    scenario.prepare(ctx)
+
+    results = {}
+    for workload in scenario.WORKLOADS:
+        if only and workload.name not in only:
+            continue
+        stats = run_workload(ctx, workload, iterations, warmup)
+        results[workload.name] = stats
+        log(
+            f"[{service}] {workload.name:<28} p50={stats['p50_ms']:>9.2f}ms "
+            f"p95={stats['p95_ms']:>9.2f}ms p99={stats['p99_ms']:>9.2f}ms "
+            f"{stats['throughput_rps']:>8.1f} req/s  sql={stats['queries_mean']:.1f} "
+            f"(max {stats['queries_max']})  erreurs={stats['errors']}"
+        )
+
+    return {
+        "service": service,
+        "db": db,
+        "scale": scale,
+        "iterations": iterations,
+        "generated_at": datetime.now(dt_timezone.utc).isoformat(),
+        "workloads": results,
+    }
+
+
+def write_report(report, path):
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
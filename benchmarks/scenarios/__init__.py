@@ -0,0 +1,7 @@
+"""
+Un module par service. Chaque module expose :
+    - is_populated() -> bool : les données synthétiques sont-elles présentes ?
+    - generate(counts, rng)  : génère les données (volumes de harness.SCALES)
+    - prepare(ctx)           : client authentifié + échantillons d'identifiants
+    - WORKLOADS              : liste de harness.Workload
+"""
@@ -0,0 +1,78 @@
+"""
+Scénario auth_service : utilisateurs, journaux d'audit, connexion.
+"""
+import uuid
+
+from benchmarks.harness import Workload, api_client, bulk_insert
+
+PASSWORD = "Bench-Passw0rd!"
+ROLES = ['admin', 'responsable_rh', 'responsable_stock', 'responsable_finance', 'magasinier', 'coordinateur']
+
+
+def is_populated():
+    from authentication.models import User
+    return User.objects.filter(username__startswith="bench_").exists()
+
+
+def generate(counts, rng):
+    from django.contrib.auth.hashers import make_password
+    from authentication.models import User, AuditLog
+
+    # Un seul hachage partagé : le coût PBKDF2 reste payé à chaque connexion
+    password_hash = make_password(PASSWORD)
+    users = [
+        User(
+            username=f"bench_{i}", email=f"bench_{i}@example.mg", full_name=f"Bench {i}",
+            role=ROLES[i % len(ROLES)], password=password_hash,
+            magasin_id=uuid.uuid4() if ROLES[i % len(ROLES)] == 'magasinier' else None,
+        )
+        for i in range(counts["users"])
+    ]
+    bulk_insert(User, users)
+
+    actions = ['LOGIN', 'LOGOUT', 'API_CREATE', 'API_UPDATE', 'API_DELETE', 'UPDATE_USER']
+
+    def logs():
+        for _ in range(counts["audit_logs"]):
+            yield AuditLog(
+                user=rng.choice(users), action_type=rng.choice(actions), entity_type="API",
+                entity_id=f"/api/rh/employers/{uuid.uuid4()}/", details={"status_code": 200},
+                ip_address="10.0.0.1", user_agent="bench",
+            )
+    bulk_insert(AuditLog, logs())
+
+
+def prepare(ctx):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from authentication.models import User
+
+    ctx.data["usernames"] = list(
+        User.objects.filter(username__startswith="bench_").values_list("username", flat=True)[:1_000]
+    )
+    admin = User.objects.filter(username__startswith="bench_", role='admin').first()
+    ctx.client = api_client(str(RefreshToken.for_user(admin).access_token))
+    ctx.data["anonymous"] = api_client()
+
+
+# ============================================================
+# Workloads
+# ============================================================
+def login(ctx):
+    return ctx.data["anonymous"].post(
+        "/api/auth/login/", {"username": ctx.pick("usernames"), "password": PASSWORD}, format="json"
+    )
+
+
+def me(ctx):
+    return ctx.client.get("/api/auth/me/")
+
+
+def my_logs(ctx):
+    return ctx.client.get("/api/auth/logs/my-logs/")
+
+
+WORKLOADS = [
+    Workload("login", login, "POST /login/ (PBKDF2 + audit)"),
+    Workload("me", me, "GET /me/"),
+    Workload("my_logs", my_logs, "GET /logs/my-logs/"),
+]
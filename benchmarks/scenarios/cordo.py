@@ -0,0 +1,128 @@
+"""
+Scénario cordo_service : coordinateurs, dossiers de décaissement, validations, alertes.
+"""
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from benchmarks.harness import Workload, api_client, bulk_insert, make_service_token
+
+TYPES = ['salaire', 'achat', 'location', 'electricite', 'mission', 'autre']
+
+
+def is_populated():
+    from cordo.models import DossierDecaissement
+    return DossierDecaissement.objects.exists()
+
+
+def generate(counts, rng):
+    from cordo.models import (
+        ProfilCoordinateur, DossierDecaissement, HistoriqueValidation, AlerteDecaissement, ModeleDecision
+    )
+
+    coordinateurs = [
+        ProfilCoordinateur(
+            user_id=uuid.uuid4(), nom_complet=f"Coordinateur {i}", email=f"coordo{i}@example.mg",
+            statut=rng.choice(['actif', 'actif', 'actif', 'inactif']), date_embauche=date(2020, 1, 1),
+        )
+        for i in range(counts["coordinateurs"])
+    ]
+    bulk_insert(ProfilCoordinateur, coordinateurs)
+
+    now = timezone.now()
+    dossiers = [
+        DossierDecaissement(
+            numero=f"DOS-{uuid.uuid4().hex[:12].upper()}", demande_decaissement_id=uuid.uuid4(),
+            coordinateur=rng.choice(coordinateurs),
+            priorite=rng.choice(['basse', 'normale', 'normale', 'haute', 'urgente']),
+            type_decaissement=rng.choice(TYPES), montant_demande=Decimal(rng.randint(10_000, 50_000_000)),
+            justification="Bench", demandeur_finance_id=uuid.uuid4(),
+            date_limite_decision=now + timedelta(hours=rng.randint(-72, 240)),
+        )
+        for _ in range(counts["dossiers"])
+    ]
+    for dossier in dossiers:
+        dossier.score_file = dossier.score()
+    bulk_insert(DossierDecaissement, dossiers)
+
+    bulk_insert(HistoriqueValidation, (
+        HistoriqueValidation(
+            dossier_decaissement=dossier, coordinateur=dossier.coordinateur,
+            action=rng.choice(['approuve', 'rejete', 'renvoi']), montant_approuve=dossier.montant_demande,
+        )
+        for dossier in rng.sample(dossiers, len(dossiers) // 2)
+    ))
+    bulk_insert(AlerteDecaissement, (
+        AlerteDecaissement(
+            dossier_decaissement=dossier, type_alerte=rng.choice(['date_limite', 'montant_eleve']),
+            severite=rng.choice(['info', 'avertissement', 'critique']), message="Bench",
+            est_lue=rng.random() < 0.5,
+        )
+        for dossier in rng.sample(dossiers, len(dossiers) // 3)
+    ))
+    bulk_insert(ModeleDecision, (
+        ModeleDecision(
+            nom=f"Modèle {i}", description="Bench", type_decaissement=rng.choice(TYPES + ['']),
+            montant_min=Decimal(i * 100_000), montant_max=Decimal((i + 5) * 100_000),
+            decision_defaut=rng.choice(['approuve', 'rejete']),
+        )
+        for i in range(50)
+    ))
+
+
+def prepare(ctx):
+    from cordo.models import ProfilCoordinateur, DossierDecaissement
+
+    ctx.client = api_client(make_service_token(role="coordinateur"))
+    ctx.data["coordinateurs"] = [str(pk) for pk in ProfilCoordinateur.objects.values_list("id", flat=True)]
+    ctx.data["dossiers"] = [str(pk) for pk in DossierDecaissement.objects.values_list("id", flat=True)[:2_000]]
+
+    coordinateur = ProfilCoordinateur.objects.filter(statut='actif', peut_valider_decaissement=True).first()
+    ctx.data["client_coordinateur"] = api_client(make_service_token(role="coordinateur", user_id=coordinateur.user_id))
+
+
+# ============================================================
+# Workloads (tableaux de bord des dossiers)
+# ============================================================
+def dossiers_coordinateur(ctx):
+    return ctx.client.get("/api/cordo/dossier-decaissement/", {"coordinateur": ctx.pick("coordinateurs")})
+
+
+def dossiers_urgents(ctx):
+    return ctx.client.get("/api/cordo/dossier-decaissement/", {"priorite": "urgente", "ordering": "-montant_demande"})
+
+
+def dossier_detail(ctx):
+    return ctx.client.get(f"/api/cordo/dossier-decaissement/{ctx.pick('dossiers')}/")
+
+
+def file_travail(ctx):
+    return ctx.data["client_coordinateur"].post("/api/cordo/dossier-decaissement/file/", {"nombre": 10}, format="json")
+
+
+def suggestions_arriere(ctx):
+    return ctx.client.get("/api/cordo/dossier-decaissement/suggestions/")
+
+
+def generation_alertes(ctx):
+    from cordo.alertes import generer_alertes
+    return generer_alertes()
+
+
+def alertes_non_lues(ctx):
+    return ctx.client.get("/api/cordo/alerte-decaissement/", {"est_lue": "false"})
+
+
+WORKLOADS = [
+    Workload("dossiers_coordinateur", dossiers_coordinateur, "GET /dossier-decaissement/?coordinateur="),
+    Workload("dossiers_urgents", dossiers_urgents, "GET /dossier-decaissement/?priorite=urgente"),
+    Workload("dossier_detail", dossier_detail, "GET /dossier-decaissement/{id}/"),
+    Workload("alertes_non_lues", alertes_non_lues, "GET /alerte-decaissement/?est_lue=false"),
+    Workload("file_travail", file_travail, "POST /dossier-decaissement/file/ (10 dossiers)", max_queries=9),
+    Workload("suggestions_arriere", suggestions_arriere, "GET /dossier-decaissement/suggestions/ (arriéré complet)",
+             max_queries=3),
+    Workload("generation_alertes", generation_alertes, "generer_alertes() incrémental (après une passe complète)",
+             max_queries=8),
+]
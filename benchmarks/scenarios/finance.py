@@ -0,0 +1,144 @@
+"""
+Scénario finance_service : demandes de décaissement, dépenses, bulletins de paie.
+"""
+import uuid
+from decimal import Decimal
+
+from benchmarks.harness import Workload, api_client, bulk_insert, make_service_token
+
+
+def is_populated():
+    from finance.models import DemandeDecaissement
+    return DemandeDecaissement.objects.exists()
+
+
+def _demandes(nombre, types, rng, statut=None):
+    from finance.models import DemandeDecaissement
+
+    responsables = [uuid.uuid4() for _ in range(20)]
+    for _ in range(nombre):
+        yield DemandeDecaissement(
+            numero=f"DEC-{uuid.uuid4().hex[:12].upper()}",
+            type_decaissement=rng.choice(types), demandeur_finance_id=rng.choice(responsables),
+            montant_demande=Decimal(rng.randint(10_000, 50_000_000)), justification="Bench",
+            statut=statut or rng.choice(['en_attente', 'approuve', 'approuve', 'rejete']),
+        )
+
+
+def generate(counts, rng):
+    from finance.models import TypeDecaissement, DemandeDecaissement, Depense, BulletinPaie, ValidationDemande
+
+    types = [
+        TypeDecaissement(nom=label, type_decaissement=code)
+        for code, label in TypeDecaissement.TYPE_CHOICES
+    ]
+    bulk_insert(TypeDecaissement, types)
+
+    demandes = list(_demandes(counts["demandes_decaissement"], types, rng))
+    bulk_insert(DemandeDecaissement, demandes)
+    approuvees = [d for d in demandes if d.statut == 'approuve']
+
+    depenses = [
+        Depense(
+            numero=f"DEP-{uuid.uuid4().hex[:12].upper()}",
+            demande_decaissement=demande, type_depense=demande.type_decaissement,
+            montant=demande.montant_demande, description="Bench",
+            statut=rng.choice(['en_attente', 'payee', 'payee', 'annulee']),
+            responsable_finance_id=demande.demandeur_finance_id,
+        )
+        for demande in rng.sample(approuvees, min(counts["depenses"], len(approuvees)))
+    ]
+    bulk_insert(Depense, depenses)
+
+    employes = [uuid.uuid4() for _ in range(max(1, counts["bulletins"] // 12))]
+
+    def bulletins():
+        for i in range(counts["bulletins"]):
+            base = Decimal(rng.randint(300_000, 3_000_000))
+            primes = Decimal(rng.randint(0, 200_000))
+            retenues = Decimal(rng.randint(0, 100_000))
+            mois, annee = i // len(employes) % 12 + 1, 2025 - i // (len(employes) * 12)
+            yield BulletinPaie(
+                numero=f"BP-{uuid.uuid4().hex[:12].upper()}",
+                employer_id=employes[i % len(employes)], depense=rng.choice(depenses),
+                mois=mois, annee=annee, salaire_base=base, primes=primes, retenues=retenues,
+                salaire_net=base + primes - retenues, responsable_finance_id=uuid.uuid4(),
+            )
+    bulk_insert(BulletinPaie, bulletins())
+
+    bulk_insert(ValidationDemande, (
+        ValidationDemande(
+            numero=f"VAL-{uuid.uuid4().hex[:12].upper()}",
+            type_demande=rng.choice(['contrat', 'achat_stock', 'location', 'electricite']),
+            demande_origine_id=uuid.uuid4(), service_origine=rng.choice(['rh_service', 'stock_service']),
+            montant=Decimal(rng.randint(10_000, 5_000_000)), description="Bench",
+        )
+        for _ in range(counts["validations"])
+    ))
+
+
+def prepare(ctx):
+    from finance.models import TypeDecaissement, DemandeDecaissement, Depense
+
+    ctx.client = api_client(make_service_token(role="responsable_finance"))
+    ctx.data["depenses"] = [str(pk) for pk in Depense.objects.values_list("id", flat=True)[:2_000]]
+
+    # Demandes en attente : une par appel d'approbation
+    en_attente = DemandeDecaissement.objects.filter(statut='en_attente')
+    manquantes = ctx.budget - en_attente.count()
+    if manquantes > 0:
+        bulk_insert(DemandeDecaissement, _demandes(
+            manquantes, list(TypeDecaissement.objects.all()), ctx.rng, statut='en_attente'
+        ))
+    ctx.data["demandes_en_attente"] = [str(pk) for pk in en_attente.values_list("id", flat=True)[:ctx.budget]]
+
+
+# ============================================================
+# Workloads
+# ============================================================
+def depenses_liste(ctx):
+    return ctx.client.get("/api/finance/depenses/")
+
+
+def bulletins_liste(ctx):
+    return ctx.client.get("/api/finance/bulletins-paie/")
+
+
+def depenses_liste_compacte(ctx):
+    return ctx.client.get("/api/finance/depenses/", {"mode": "compact"})
+
+
+def bulletins_liste_compacte(ctx):
+    return ctx.client.get("/api/finance/bulletins-paie/", {"mode": "compact"})
+
+
+def bulletin_creation(ctx):
+    return ctx.client.post("/api/finance/bulletins-paie/", {
+        "employer_id": str(uuid.uuid4()),
+        "depense_id": ctx.pick("depenses"),
+        "mois": ctx.rng.randint(1, 12),
+        "annee": 2026,
+        "salaire_base": "850000.00",
+        "primes": "50000.00",
+        "retenues": "12000.00",
+        "responsable_finance_id": str(uuid.uuid4()),
+    }, format="json")
+
+
+def demande_approbation(ctx):
+    demande_id = ctx.data["demandes_en_attente"].pop()
+    return ctx.client.post(
+        f"/api/finance/demandes-decaissement/{demande_id}/approuver/",
+        {"coordinateur_id": str(uuid.uuid4()), "commentaire": "Bench"}, format="json",
+    )
+
+
+WORKLOADS = [
+    # Listes : relations chargées par select_related, une requête quel que soit le volume
+    Workload("depenses_liste", depenses_liste, "GET /depenses/", max_queries=1),
+    Workload("bulletins_liste", bulletins_liste, "GET /bulletins-paie/", max_queries=1),
+    Workload("depenses_liste_compacte", depenses_liste_compacte, "GET /depenses/?mode=compact", max_queries=1),
+    Workload("bulletins_liste_compacte", bulletins_liste_compacte, "GET /bulletins-paie/?mode=compact", max_queries=1),
+    Workload("bulletin_creation", bulletin_creation, "POST /bulletins-paie/ (paie unitaire)"),
+    Workload("demande_approbation", demande_approbation, "POST /demandes-decaissement/{id}/approuver/"),
+]
@@ -0,0 +1,245 @@
+"""
+Scénario rh_service : géographie, employés, congés, contrats et affectations.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.harness import Workload, api_client, bulk_insert, make_service_token
+
+NOMS = ["Rakoto", "Rabe", "Randria", "Razafy", "Rasoa", "Andria", "Rajaona", "Ravelo", "Raharison", "Rakotomalala"]
+PRENOMS = ["Hery", "Fara", "Tiana", "Mialy", "Naina", "Haja", "Lova", "Soa", "Fanja", "Toky"]
+
+
+def is_populated():
+    from rh.models import Employer
+    return Employer.objects.exists()
+
+
+def generate(counts, rng):
+    from rh.models import (
+        District, Commune, Fokontany, Fonction, Employer, TypeConge, Conge,
+        TypeContrat, Contrat, Affectation, Payement, Demande, TypeAchat, Achat, Location, Electricite
+    )
+
+    districts = [District(name=f"District {i}", code=f"D{i:04d}", region=f"Région {i % 23}") for i in range(120)]
+    bulk_insert(District, districts)
+    communes = [
+        Commune(name=f"Commune {i}", code=f"C{i:05d}", district=districts[i % len(districts)])
+        for i in range(1_500)
+    ]
+    bulk_insert(Commune, communes)
+    bulk_insert(Fokontany, (
+        Fokontany(name=f"Fokontany {i}", code=f"F{i:06d}", commune=communes[i % len(communes)])
+        for i in range(18_000)
+    ))
+    fonctions = [Fonction(nom_fonction=f"Fonction {i}") for i in range(60)]
+    bulk_insert(Fonction, fonctions)
+
+    employes = [
+        Employer(
+            nom_employer=f"{rng.choice(NOMS)}{i}", prenom_employer=rng.choice(PRENOMS),
+            date_entree=date(2010, 1, 1) + timedelta(days=rng.randint(0, 5_000)),
+            email=f"employe{i}@example.mg", domaine_etude="Gestion",
+            district=rng.choice(districts), fonction=rng.choice(fonctions),
+        )
+        for i in range(counts["employes"])
+    ]
+    bulk_insert(Employer, employes)
+
+    types_conge = [
+        TypeConge(nom=nom, nombre_jours_max=jours)
+        for nom, jours in [("Annuel", 30), ("Maladie", 15), ("Maternité", 98), ("Paternité", 10), ("Sans solde", 60)]
+    ]
+    bulk_insert(TypeConge, types_conge)
+
+    today = date.today()
+    statuts_conge = ['approuve', 'termine', 'termine', 'refuse', 'annule', 'en_attente']
+
+    def conges():
+        for _ in range(counts["conges"]):
+            debut = today - timedelta(days=rng.randint(-120, 1_500))
+            jours = rng.randint(1, 20)
+            yield Conge(
+                employer=rng.choice(employes), type_conge=rng.choice(types_conge),
+                status_conge=rng.choice(statuts_conge), date_debut=debut,
+                date_fin=debut + timedelta(days=jours - 1), nombre_jours=jours, motif="Bench",
+            )
+    bulk_insert(Conge, conges())
+
+    types_contrat = [TypeContrat(nom_type=nom) for nom in ("CDI", "CDD", "Stage", "Consultance")]
+    bulk_insert(TypeContrat, types_contrat)
+
+    def contrats():
+        for i in range(counts["contrats"]):
+            debut = today - timedelta(days=rng.randint(0, 3_000))
+            yield Contrat(
+                employer=employes[i % len(employes)], type_contrat=rng.choice(types_contrat),
+                status_contrat=rng.choice(['actif', 'actif', 'expire', 'termine']),
+                date_debut_contrat=debut,
+                date_fin_contrat=debut + timedelta(days=rng.randint(90, 1_000)) if i % 3 else None,
+                salaire=Decimal(rng.randint(300_000, 3_000_000)),
+            )
+    contrats_crees = list(contrats())
+    bulk_insert(Contrat, contrats_crees)
+    # Trois salaires versés par contrat actif (chronologie des employés)
+    bulk_insert(Payement, (
+        Payement(contrat=contrat, montant=contrat.salaire, status=rng.choice(['complete', 'complete', 'en_attente']),
+                 reference=f"PAY-BENCH-{i}-{mois}")
+        for i, contrat in enumerate(contrats_crees) if contrat.status_contrat == 'actif'
+        for mois in range(3)
+    ))
+
+    def affectations():
+        for _ in range(counts["affectations"]):
+            employe = rng.choice(employes)
+            temporaire = rng.random() < 0.4
+            yield Affectation(
+                employer=employe, ancien_district=employe.district, ancienne_fonction=employe.fonction,
+                nouveau_district=rng.choice(districts), nouveau_fonction=rng.choice(fonctions),
+                type_affectation='temporaire' if temporaire else 'permanente',
+                status_affectation=rng.choice(['active', 'inactive', 'terminee']),
+                date_fin=today + timedelta(days=rng.randint(-200, 200)) if temporaire else None,
+            )
+    bulk_insert(Affectation, affectations())
+
+    # Locations (échéances sur l'année) et leurs compteurs d'électricité
+    locations = [
+        Location(nom=f"Bureau {i}", type_location="bureau", montant=Decimal(rng.randint(200_000, 2_000_000)),
+                 date_echeance=today.replace(day=1) + timedelta(days=rng.randint(0, 365)))
+        for i in range(counts["employes"] // 2)
+    ]
+    bulk_insert(Location, locations)
+    bulk_insert(Electricite, (
+        Electricite(numero_compteur=f"CPT-{i:06d}", fournisseur="Jirama", location=location,
+                    montant=Decimal(rng.randint(20_000, 300_000)))
+        for i, location in enumerate(locations)
+    ))
+
+    # Demandes d'achat : quelques très grosses, paiements liés pour les statuts
+    types_achat = [TypeAchat(type_achat=code, nom=code.title()) for code in ("fournitures", "materiel", "carburant")]
+    bulk_insert(TypeAchat, types_achat)
+    demandes = [Demande(description=f"Demande bench {i}") for i in range(counts["employes"] // 5)]
+    bulk_insert(Demande, demandes)
+    bulk_insert(Achat, (
+        Achat(
+            demande=demande, article=f"Article {i}-{j}", code_achat=f"ACH-{i}-{j}", nombre=rng.randint(1, 20),
+            montant=Decimal(rng.randint(1_000, 500_000)), type_achat=rng.choice(types_achat),
+        )
+        for i, demande in enumerate(demandes)
+        for j in range(500 if i % 50 == 0 else rng.randint(1, 10))
+    ))
+    payements = list(Payement.objects.values_list("id", flat=True)[:len(demandes) * 2])
+    Lien = Demande.payements.through
+    bulk_insert(Lien, (
+        Lien(demande_id=demande.pk, payement_id=payements[(2 * i + k) % len(payements)])
+        for i, demande in enumerate(demandes) for k in range(i % 3)
+    ))
+
+
+def prepare(ctx):
+    from rh.models import District, Employer, Payement, TypeConge
+
+    ctx.client = api_client(make_service_token(role="responsable_rh"))
+    ctx.data["employes"] = list(Employer.objects.values_list("id", "nom_employer")[:5_000])
+    ctx.data["types_conge"] = [str(pk) for pk in TypeConge.objects.values_list("id", flat=True)]
+    ctx.data["paiements_en_attente"] = [
+        str(pk) for pk in Payement.objects.filter(status="en_attente").values_list("id", flat=True)
+    ]
+    ctx.data["districts"] = [str(pk) for pk in District.objects.values_list("id", flat=True)]
+
+
+# ============================================================
+# Workloads
+# ============================================================
+def employers_recherche(ctx):
+    _, nom = ctx.pick("employes")
+    return ctx.client.get("/api/rh/employers/", {"search": nom})
+
+
+def employers_typeahead(ctx):
+    _, nom = ctx.pick("employes")
+    return ctx.client.get("/api/rh/employers/typeahead/", {"q": nom[:ctx.rng.randint(3, len(nom))], "limit": 10})
+
+
+def employer_detail(ctx):
+    employe_id, _ = ctx.pick("employes")
+    return ctx.client.get(f"/api/rh/employers/{employe_id}/")
+
+
+def employer_timeline(ctx):
+    employe_id, _ = ctx.pick("employes")
+    return ctx.client.get(f"/api/rh/employers/{employe_id}/timeline/", {"limit": 20})
+
+
+def conges_employe(ctx):
+    employe_id, _ = ctx.pick("employes")
+    return ctx.client.get("/api/rh/conges/", {"employer_id": str(employe_id)})
+
+
+def contrats_employe(ctx):
+    employe_id, _ = ctx.pick("employes")
+    return ctx.client.get("/api/rh/contrats/", {"employer": str(employe_id)})
+
+
+def conge_creation(ctx):
+    employe_id, _ = ctx.pick("employes")
+    debut = date.today() + timedelta(days=ctx.rng.randint(30, 3_000))
+    return ctx.client.post("/api/rh/conges/", {
+        "employer_id": str(employe_id),
+        "type_conge_id": ctx.pick("types_conge"),
+        "date_debut": debut.isoformat(),
+        "date_fin": (debut + timedelta(days=ctx.rng.randint(0, 9))).isoformat(),
+        "motif": "Bench",
+    }, format="json")
+
+
+def soldes_conges(ctx):
+    employes = ctx.rng.sample(ctx.data["employes"], min(100, len(ctx.data["employes"])))
+    return ctx.client.get("/api/rh/soldes-conges/", {"employer_ids": ",".join(str(pk) for pk, _ in employes)})
+
+
+def demandes_liste(ctx):
+    return ctx.client.get("/api/rh/demandes/", {"status": "en_attente"})
+
+
+def paiements_campagne(ctx):
+    debut = date.today().replace(day=1)
+    return ctx.client.post("/api/rh/payements/generer/",
+                           {"debut": str(debut), "fin": str(debut + timedelta(days=30))}, format="json")
+
+
+def paiements_completer(ctx):
+    ids = ctx.rng.sample(ctx.data["paiements_en_attente"], min(100, len(ctx.data["paiements_en_attente"])))
+    return ctx.client.post("/api/rh/payements/completer/", {"ids": ids}, format="json")
+
+
+def geo_arbre(ctx):
+    return ctx.client.get("/api/rh/geo/tree/", HTTP_ACCEPT_ENCODING="gzip")
+
+
+def geo_arbre_froid(ctx):
+    from rh.geo import invalider
+    invalider()  # Hors transaction : nouvelle version immédiate, arbre reconstruit
+    return ctx.client.get("/api/rh/geo/tree/", {"district": ctx.pick("districts")}, HTTP_ACCEPT_ENCODING="gzip")
+
+
+WORKLOADS = [
+    Workload("employers_recherche", employers_recherche, "GET /employers/?search="),
+    Workload("employers_typeahead", employers_typeahead, "GET /employers/typeahead/?q= (saisie partielle)",
+             max_queries=1),
+    Workload("employer_detail", employer_detail, "GET /employers/{id}/"),
+    Workload("employer_timeline", employer_timeline, "GET /employers/{id}/timeline/ (4 sources fusionnées)",
+             max_queries=5),
+    Workload("conges_employe", conges_employe, "GET /conges/?employer_id="),
+    Workload("contrats_employe", contrats_employe, "GET /contrats/?employer="),
+    Workload("conge_creation", conge_creation, "POST /conges/"),
+    Workload("soldes_conges", soldes_conges, "GET /soldes-conges/?employer_ids= (100 employés)", max_queries=2),
+    Workload("demandes_liste", demandes_liste, "GET /demandes/ (montants et statuts de paiement annotés)",
+             max_queries=1),
+    Workload("paiements_campagne", paiements_campagne, "POST /payements/generer/ (relance d'une période déjà générée)",
+             max_queries=5),
+    Workload("paiements_completer", paiements_completer, "POST /payements/completer/ (100 paiements)",
+             max_queries=5),
+    Workload("geo_arbre", geo_arbre, "GET /geo/tree/ (arbre complet, cache chaud)", max_queries=3),
+    Workload("geo_arbre_froid", geo_arbre_froid, "GET /geo/tree/?district= après invalidation", max_queries=3),
+]
@@ -0,0 +1,154 @@
+"""
+Scénario stock_service : magasins, articles, stocks, mouvements et inventaires.
+"""
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from benchmarks.harness import Workload, api_client, bulk_insert, make_service_token
+
+
+def is_populated():
+    from stock.models import MouvementStock
+    return MouvementStock.objects.exists()
+
+
+def generate(counts, rng):
+    from stock.models import Categorie, Article, Magasin, Stock, MouvementStock
+
+    types = [c[0] for c in Categorie.TYPE_CATEGORIE_CHOICES]
+    categories = [
+        Categorie(code=f"CAT-{i:03d}", nom=f"Catégorie {i}", type_categorie=types[i % len(types)])
+        for i in range(12)
+    ]
+    Categorie.objects.bulk_create(categories)
+
+    articles = [
+        Article(
+            code=f"ART-{i:06d}", nom=f"Article {i:06d}", categorie=rng.choice(categories),
+            prix_unitaire_estime=rng.randint(500, 500_000),
+        )
+        for i in range(counts["articles"])
+    ]
+    bulk_insert(Article, articles)
+
+    magasins = [
+        Magasin(nom=f"Magasin {i}", adresse=f"Lot {i}", district_id=uuid.uuid4())
+        for i in range(counts["magasins"])
+    ]
+    bulk_insert(Magasin, magasins)
+
+    pairs = set()
+    target = min(counts["stocks"], len(articles) * len(magasins))
+    while len(pairs) < target:
+        pairs.add((rng.randrange(len(articles)), rng.randrange(len(magasins))))
+    bulk_insert(Stock, (
+        Stock(article=articles[a], magasin=magasins[m], quantite=rng.randint(0, 5_000))
+        for a, m in pairs
+    ))
+
+    magasiniers = [uuid.uuid4() for _ in range(50)]
+    now = timezone.now()
+
+    def mouvements():
+        for _ in range(counts["mouvements"]):
+            type_mouvement = rng.choice(['entree', 'sortie', 'retour', 'transfert'])
+            source = rng.choice(magasins) if type_mouvement in ('sortie', 'transfert') else None
+            dest = rng.choice(magasins) if type_mouvement != 'sortie' else None
+            yield MouvementStock(
+                article=rng.choice(articles), magasin_source=source, magasin_dest=dest,
+                quantite=rng.randint(1, 200), type_mouvement=type_mouvement,
+                magasinier_id=rng.choice(magasiniers),
+                date_mouvement=now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+            )
+    bulk_insert(MouvementStock, mouvements())
+
+    _creer_inventaires(counts["inventaires"], magasins, articles, rng)
+
+
+def _creer_inventaires(nombre, magasins, articles, rng, lignes_par_inventaire=20):
+    from stock.models import Inventaire, LigneInventaire
+
+    inventaires = [
+        Inventaire(magasin=rng.choice(magasins), responsable_id=uuid.uuid4())
+        for _ in range(nombre)
+    ]
+    bulk_insert(Inventaire, inventaires)
+    bulk_insert(LigneInventaire, (
+        LigneInventaire(
+            inventaire=inventaire, article=article,
+            quantite_comptée=rng.randint(0, 5_000), quantite_stock=0,
+        )
+        for inventaire in inventaires
+        for article in rng.sample(articles, min(lignes_par_inventaire, len(articles)))
+    ))
+    return inventaires
+
+
+def prepare(ctx):
+    from stock.models import Article, Magasin, Stock, Inventaire
+
+    ctx.client = api_client(make_service_token(role="admin"))
+    ctx.data["articles"] = list(Article.objects.values_list("id", "nom")[:2_000])
+    ctx.data["magasins"] = list(Magasin.objects.values_list("id", flat=True)[:2_000])
+    ctx.data["stocks"] = list(Stock.objects.values_list("id", flat=True)[:2_000])
+
+    # Inventaires en cours : un par appel de validation
+    manquants = ctx.budget - Inventaire.objects.filter(status='en_cours').count()
+    if manquants > 0:
+        _creer_inventaires(
+            manquants,
+            list(Magasin.objects.all()[:200]),
+            list(Article.objects.all()[:500]),
+            ctx.rng,
+        )
+    ctx.data["inventaires"] = list(
+        Inventaire.objects.filter(status='en_cours').values_list("id", flat=True)[:ctx.budget]
+    )
+
+
+# ============================================================
+# Workloads
+# ============================================================
+def stocks_par_magasin(ctx):
+    return ctx.client.get("/api/stock/stocks/", {"magasin": ctx.pick("magasins")})
+
+
+def articles_liste(ctx):
+    return ctx.client.get("/api/stock/articles/")
+
+
+def mouvements_recherche(ctx):
+    _, nom = ctx.pick("articles")
+    return ctx.client.get("/api/stock/mouvements-stock/", {"search": nom})
+
+
+def mouvement_entree(ctx):
+    # Opération modèle : le serializer n'expose pas d'écriture pour article/magasin
+    from stock.models import MouvementStock
+
+    article_id, _ = ctx.pick("articles")
+    mouvement = MouvementStock(
+        article_id=article_id, magasin_dest_id=ctx.pick("magasins"),
+        quantite=ctx.rng.randint(1, 50), type_mouvement='entree', magasinier_id=uuid.uuid4(),
+    )
+    mouvement.save()
+    return mouvement
+
+
+def inventaire_valider(ctx):
+    from stock.models import Inventaire
+
+    inventaire = Inventaire.objects.get(pk=ctx.data["inventaires"].pop())
+    inventaire.valider(responsable_stock_id=uuid.uuid4())
+    return inventaire
+
+
+WORKLOADS = [
+    Workload("stocks_par_magasin", stocks_par_magasin, "GET /stocks/?magasin="),
+    Workload("articles_liste", articles_liste, "GET /articles/"),
+    Workload("mouvements_recherche", mouvements_recherche, "GET /mouvements-stock/?search="),
+    Workload("mouvement_entree", mouvement_entree, "MouvementStock.save() (entrée)"),
+    Workload("inventaire_valider", inventaire_valider, "Inventaire.valider() sur 20 lignes"),
+]
@@ -0,0 +1,51 @@
+"""
+Settings de benchmark : reprend les settings d'un service et remplace la base.
+
+Le module de settings du service est désigné par BENCH_SERVICE_SETTINGS
+(ex: "stock_service.settings"). La base est choisie par BENCH_DB :
+    - sqlite   : fichier local benchmarks/.data/<service>.sqlite3 (défaut)
+    - postgres : PostgreSQL local (BENCH_PG_HOST, BENCH_PG_PORT, BENCH_PG_USER,
+                 BENCH_PG_PASSWORD, BENCH_PG_NAME)
+Aucun Kong n'est nécessaire : les tokens sont signés avec JWT_SECRET du service.
+"""
+import importlib
+import os
+from pathlib import Path
+
+_base = importlib.import_module(os.environ["BENCH_SERVICE_SETTINGS"])
+for _name in dir(_base):
+    if _name.isupper():
+        globals()[_name] = getattr(_base, _name)
+
+BENCH_SERVICE = os.environ.get("BENCH_SERVICE", "service")
+BENCH_DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+if os.environ.get("BENCH_DB", "sqlite") == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("BENCH_PG_NAME", f"bench_{BENCH_SERVICE}"),
+            "USER": os.environ.get("BENCH_PG_USER", "postgres"),
+            "PASSWORD": os.environ.get("BENCH_PG_PASSWORD", "postgres"),
+            "HOST": os.environ.get("BENCH_PG_HOST", "localhost"),
+            "PORT": os.environ.get("BENCH_PG_PORT", "5432"),
+        }
+    }
+else:
+    BENCH_DATA_DIR.mkdir(exist_ok=True)
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(BENCH_DATA_DIR / f"{BENCH_SERVICE}.sqlite3"),
+        }
+    }
+
+# Le bus d'événements partage la base du service : pas de seconde connexion
+# (SQLite verrouillerait le fichier pendant le relais).
+EVENT_BUS_DATABASE = "default"
+
+# Cache en mémoire du processus (pas de createcachetable pour les benchmarks)
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
@@ -0,0 +1,8 @@
+"""
+🧩 Code commun aux services : bus d'événements (outbox, relais, consommation)
+et numérotation des documents.
+
+Application Django installée par chaque service. Les modèles sont abstraits :
+chaque service en déclare les tables dans son propre models.py (et ses
+migrations), ce module n'en crée aucune.
+"""
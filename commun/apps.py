@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class CommunConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'commun'
+    verbose_name = 'Commun aux services'
@@ -0,0 +1,355 @@
+"""
+📨 Outbox transactionnelle et bus d'événements inter-services.
+
+- Producteur : `publier_evenement()` écrit l'événement dans la table outbox du
+  service, dans la même transaction que la modification métier.
+- Relais : `relayer_outbox()` publie les événements en attente, par lots, vers le
+  broker configuré par EVENT_BROKER.
+- Consommateur : `consommer_evenements()` lit le bus et applique chaque événement
+  une seule fois (table EvenementConsomme), via les handlers déclarés avec
+  `@consommateur(...)` dans `<app>/handlers.py`.
+
+La livraison est « au moins une fois » : un lot peut être republié après une
+panne du relais, les consommateurs dédupliquent sur l'identifiant d'événement.
+
+Module partagé par tous les services : le nom du service vient de
+settings.EVENT_SERVICE, les tables de son models.py (modèles concrets de
+commun.models).
+"""
+import json
+import logging
+import select
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .models import (
+    CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase, modele_concret,
+)
+
+logger = logging.getLogger(__name__)
+
+BROKER_PAR_DEFAUT = "commun.events.TableQueueBroker"
+
+
+def nom_service():
+    return settings.EVENT_SERVICE
+
+
+# ============================================================
+# ✉️ Publication (producteur)
+# ============================================================
+def publier_evenement(type_evenement, instance, payload):
+    """
+    Ajoute un événement à l'outbox. À appeler dans la transaction qui modifie
+    `instance` : l'événement n'existe que si la modification est validée.
+    """
+    EvenementOutbox = modele_concret(EvenementOutboxBase)
+
+    return EvenementOutbox.objects.create(
+        type_evenement=type_evenement,
+        aggregate_type=instance.__class__.__name__,
+        aggregate_id=str(instance.pk),
+        payload=payload,
+    )
+
+
+def publier_evenements(evenements):
+    """Version par lots de publier_evenement : [(type_evenement, instance, payload), ...]."""
+    EvenementOutbox = modele_concret(EvenementOutboxBase)
+
+    return EvenementOutbox.objects.bulk_create([
+        EvenementOutbox(
+            type_evenement=type_evenement,
+            aggregate_type=instance.__class__.__name__,
+            aggregate_id=str(instance.pk),
+            payload=payload,
+        )
+        for type_evenement, instance, payload in evenements
+    ])
+
+
+def _message(evenement):
+    return {
+        "event_id": str(evenement.id),
+        "service": nom_service(),
+        "type": evenement.type_evenement,
+        "aggregate_type": evenement.aggregate_type,
+        "aggregate_id": evenement.aggregate_id,
+        "payload": evenement.payload,
+        "occurred_at": evenement.created_at.isoformat(),
+    }
+
+
+# ============================================================
+# 🚚 Brokers
+# ============================================================
+class BaseBroker:
+    """Interface d'un broker : publication par lots et lecture ordonnée par position."""
+
+    def publier(self, messages):
+        raise NotImplementedError
+
+    def lire(self, apres_id, types_evenement, limite):
+        """Retourne les messages de position > apres_id, triés par position."""
+        raise NotImplementedError
+
+    def attendre(self, timeout):
+        """Bloque jusqu'à `timeout` secondes ou jusqu'à l'arrivée de nouveaux messages."""
+        time.sleep(timeout)
+
+
+class TableQueueBroker(BaseBroker):
+    """
+    Bus sous forme de table partagée par tous les services (base EVENT_BUS_DATABASE).
+    Sous PostgreSQL, chaque lot publié déclenche un NOTIFY qui réveille les
+    consommateurs en LISTEN ; ailleurs (SQLite) les consommateurs interrogent la table.
+    """
+    TABLE = "bus_evenements"
+    CANAL = "bus_evenements"
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, "EVENT_BUS_DATABASE", "default")
+        self._installe = False
+        self._en_ecoute = False
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def installer(self):
+        """Crée la table du bus si besoin (elle n'appartient à aucun service)."""
+        if self._installe:
+            return
+        if self.connection.vendor == "postgresql":
+            cle = "BIGSERIAL PRIMARY KEY"
+        else:
+            cle = "INTEGER PRIMARY KEY AUTOINCREMENT"
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    id {cle},
+                    event_id VARCHAR(36) NOT NULL UNIQUE,
+                    service VARCHAR(50) NOT NULL,
+                    type_evenement VARCHAR(100) NOT NULL,
+                    aggregate_type VARCHAR(100) NOT NULL,
+                    aggregate_id VARCHAR(100) NOT NULL,
+                    payload TEXT NOT NULL,
+                    occurred_at VARCHAR(40) NOT NULL,
+                    publie_epoch DOUBLE PRECISION NOT NULL
+                )
+            """)
+        self._installe = True
+
+    def publier(self, messages):
+        self.installer()
+        maintenant = time.time()
+        lignes = [
+            (
+                m["event_id"], m["service"], m["type"], m["aggregate_type"], m["aggregate_id"],
+                json.dumps(m["payload"], cls=DjangoJSONEncoder), m["occurred_at"], maintenant,
+            )
+            for m in messages
+        ]
+        with transaction.atomic(using=self.alias), self.connection.cursor() as cursor:
+            # Un lot republié après une panne du relais est ignoré (event_id unique)
+            cursor.executemany(
+                f"INSERT INTO {self.TABLE} (event_id, service, type_evenement, aggregate_type, "
+                f"aggregate_id, payload, occurred_at, publie_epoch) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT (event_id) DO NOTHING",
+                lignes,
+            )
+            if self.connection.vendor == "postgresql":
+                cursor.execute(f"NOTIFY {self.CANAL}")
+
+    def lire(self, apres_id, types_evenement, limite):
+        self.installer()
+        if not types_evenement:
+            return []
+        marqueurs = ", ".join(["%s"] * len(types_evenement))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id, event_id, service, type_evenement, aggregate_type, aggregate_id, "
+                f"payload, occurred_at, publie_epoch FROM {self.TABLE} "
+                f"WHERE id > %s AND type_evenement IN ({marqueurs}) ORDER BY id LIMIT %s",
+                [apres_id, *types_evenement, limite],
+            )
+            return [
+                {
+                    "id": ligne[0], "event_id": ligne[1], "service": ligne[2], "type": ligne[3],
+                    "aggregate_type": ligne[4], "aggregate_id": ligne[5],
+                    "payload": json.loads(ligne[6]), "occurred_at": ligne[7], "publie_epoch": ligne[8],
+                }
+                for ligne in cursor.fetchall()
+            ]
+
+    def attendre(self, timeout):
+        if self.connection.vendor != "postgresql":
+            return super().attendre(timeout)
+        if not self._en_ecoute:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.CANAL}")
+            self._en_ecoute = True
+        conn = self.connection.connection
+        if select.select([conn], [], [], timeout)[0]:
+            conn.poll()
+            del conn.notifies[:]
+
+
+def preparer_bus(alias=None):
+    """
+    Crée la base du bus (EVENT_BUS_DATABASE) si elle n'existe pas encore, puis sa
+    table. Idempotent : lancé au démarrage de chaque service et de chaque worker.
+    """
+    alias = alias or getattr(settings, "EVENT_BUS_DATABASE", "default")
+    connection = connections[alias]
+    if connection.vendor == "postgresql":
+        nom = connection.settings_dict["NAME"]
+        # Connexion à la base de maintenance du même serveur (la base du bus n'existe peut-être pas)
+        with connection._nodb_cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", [nom])
+            if cursor.fetchone() is None:
+                try:
+                    cursor.execute(f"CREATE DATABASE {connection.ops.quote_name(nom)}")
+                except DatabaseError:
+                    # Créée entre-temps par un autre service qui démarre en même temps
+                    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", [nom])
+                    if cursor.fetchone() is None:
+                        raise
+    TableQueueBroker(alias).installer()
+
+
+_broker = None
+
+
+def get_broker():
+    """Instance unique du broker configuré par EVENT_BROKER."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "EVENT_BROKER", BROKER_PAR_DEFAUT))()
+    return _broker
+
+
+# ============================================================
+# 🔁 Relais outbox → broker
+# ============================================================
+def relayer_outbox(broker=None, taille_lot=500):
+    """
+    Publie un lot d'événements en attente et retourne leur nombre. Les lignes sont
+    verrouillées (SKIP LOCKED) : plusieurs relais peuvent tourner en parallèle.
+    """
+    EvenementOutbox = modele_concret(EvenementOutboxBase)
+
+    broker = broker or get_broker()
+    with transaction.atomic():
+        lot = list(
+            EvenementOutbox.objects.filter(publie_le__isnull=True)
+            .order_by("created_at")
+            .select_for_update(skip_locked=True)[:taille_lot]
+        )
+        if not lot:
+            return 0
+        broker.publier([_message(evenement) for evenement in lot])
+        EvenementOutbox.objects.filter(pk__in=[evenement.pk for evenement in lot]).update(
+            publie_le=timezone.now()
+        )
+    return len(lot)
+
+
+def purger_outbox(jours=7):
+    """Supprime les événements publiés depuis plus de `jours` jours."""
+    EvenementOutbox = modele_concret(EvenementOutboxBase)
+
+    limite = timezone.now() - timedelta(days=jours)
+    supprimes, _ = EvenementOutbox.objects.filter(publie_le__lt=limite).delete()
+    return supprimes
+
+
+# ============================================================
+# 📥 Consommation idempotente
+# ============================================================
+_HANDLERS = {}
+
+
+def consommateur(*types_evenement):
+    """Décorateur : enregistre un handler pour un ou plusieurs types d'événement."""
+    def decorateur(fonction):
+        for type_evenement in types_evenement:
+            _HANDLERS[type_evenement] = fonction
+        return fonction
+    return decorateur
+
+
+def _charger_handlers():
+    # <app>/handlers.py de chaque application installée
+    autodiscover_modules("handlers")
+
+
+def _marquer_consomme(nom, message):
+    """Enregistre l'event_id ; False s'il a déjà été appliqué par un consommateur concurrent."""
+    EvenementConsomme = modele_concret(EvenementConsommeBase)
+
+    try:
+        with transaction.atomic():
+            EvenementConsomme.objects.create(
+                consommateur=nom, event_id=message["event_id"], type_evenement=message["type"]
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def consommer_evenements(nom=None, broker=None, taille_lot=500, delai_stabilite=5.0):
+    """
+    Applique un lot d'événements du bus et retourne le nombre traité.
+
+    Chaque handler s'exécute dans la même transaction que l'enregistrement de
+    l'event_id dans EvenementConsomme : un événement rejoué est ignoré. Le curseur
+    n'avance que sur les messages publiés depuis plus de `delai_stabilite`
+    secondes, pour ne pas sauter une position attribuée à un lot encore en cours
+    de validation chez un autre relais.
+    """
+    CurseurConsommateur = modele_concret(CurseurConsommateurBase)
+    EvenementConsomme = modele_concret(EvenementConsommeBase)
+
+    _charger_handlers()
+    if not _HANDLERS:
+        return 0
+    nom = nom or nom_service()
+    broker = broker or get_broker()
+    curseur, _ = CurseurConsommateur.objects.get_or_create(nom=nom)
+    messages = broker.lire(curseur.position, sorted(_HANDLERS), taille_lot)
+    if not messages:
+        return 0
+
+    deja_traites = {
+        str(event_id) for event_id in EvenementConsomme.objects.filter(
+            consommateur=nom, event_id__in=[m["event_id"] for m in messages]
+        ).values_list("event_id", flat=True)
+    }
+    limite_stable = time.time() - delai_stabilite
+    position, stable = curseur.position, True
+    traites = 0
+    for message in messages:
+        if message["event_id"] not in deja_traites:
+            try:
+                with transaction.atomic():
+                    if _marquer_consomme(nom, message):
+                        _HANDLERS[message["type"]](message)
+                        traites += 1
+            except Exception:
+                logger.exception("Échec du traitement de l'événement %s (%s)", message["event_id"], message["type"])
+                break
+        stable = stable and message["publie_epoch"] <= limite_stable
+        if stable:
+            position = message["id"]
+
+    if position != curseur.position:
+        curseur.position = position
+        curseur.save(update_fields=["position", "updated_at"])
+    return traites
@@ -0,0 +1,45 @@
+"""
+Relais de l'outbox et consommation du bus d'événements.
+
+    python manage.py bus_evenements            # vide l'outbox et le bus puis s'arrête
+    python manage.py bus_evenements --follow   # worker permanent (docker-compose)
+"""
+from django.core.management.base import BaseCommand
+
+from commun.events import consommer_evenements, get_broker, preparer_bus, purger_outbox, relayer_outbox
+
+
+class Command(BaseCommand):
+    help = "Publie l'outbox du service sur le bus et applique les événements reçus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--sans-relais", action="store_true", help="Ne publie pas l'outbox.")
+        parser.add_argument("--sans-consommation", action="store_true", help="Ne lit pas le bus.")
+        parser.add_argument("--lot", type=int, default=500, help="Taille des lots (défaut 500).")
+        parser.add_argument("--intervalle", type=float, default=2.0,
+                            help="Attente maximale entre deux passes en mode --follow (secondes).")
+        parser.add_argument("--consommateur", help="Nom du curseur de consommation (défaut : le service).")
+        parser.add_argument("--purge-jours", type=int, default=7,
+                            help="Supprime les événements publiés depuis plus de N jours (0 : jamais).")
+
+    def handle(self, *args, **options):
+        preparer_bus()
+        broker = get_broker()
+        if options["purge_jours"]:
+            supprimes = purger_outbox(options["purge_jours"])
+            if supprimes:
+                self.stdout.write(f"🧹 {supprimes} événement(s) publiés purgés")
+
+        while True:
+            publies = consommes = 0
+            if not options["sans_relais"]:
+                publies = relayer_outbox(broker, options["lot"])
+            if not options["sans_consommation"]:
+                consommes = consommer_evenements(options["consommateur"], broker, options["lot"])
+            if publies or consommes:
+                self.stdout.write(f"📨 {publies} publié(s), {consommes} consommé(s)")
+                continue
+            if not options["follow"]:
+                break
+            broker.attendre(options["intervalle"])
@@ -0,0 +1,16 @@
+"""
+Crée la base et la table du bus d'événements si besoin (entrypoint.sh).
+
+    python manage.py preparer_bus
+"""
+from django.core.management.base import BaseCommand
+
+from commun.events import preparer_bus
+
+
+class Command(BaseCommand):
+    help = "Crée la base partagée du bus d'événements (EVENT_BUS_DATABASE) et sa table si elles manquent."
+
+    def handle(self, *args, **options):
+        preparer_bus()
+        self.stdout.write("📨 Bus d'événements prêt")
@@ -0,0 +1,99 @@
+"""
+Modèles abstraits partagés. Chaque service les concrétise dans son models.py :
+
+    class EvenementOutbox(EvenementOutboxBase):
+        pass
+
+Les tables (db_table, index) sont celles du service : une base par service.
+"""
+import uuid
+from functools import cache
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class EvenementOutboxBase(models.Model):
+    """Événement métier en attente de publication sur le bus."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    type_evenement = models.CharField(max_length=100)
+    aggregate_type = models.CharField(max_length=100)
+    aggregate_id = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    publie_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+        db_table = 'outbox_evenements'
+        verbose_name = 'Événement outbox'
+        verbose_name_plural = 'Événements outbox'
+        ordering = ['created_at']
+        indexes = [
+            # Index partiel : seuls les événements à publier sont parcourus par le relais
+            models.Index(
+                fields=['created_at'], name='outbox_a_publier_idx',
+                condition=models.Q(publie_le__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type_evenement} - {self.aggregate_type} {self.aggregate_id}"
+
+
+class EvenementConsommeBase(models.Model):
+    """Événement du bus déjà appliqué par un consommateur (idempotence)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    consommateur = models.CharField(max_length=100)
+    event_id = models.UUIDField()
+    type_evenement = models.CharField(max_length=100)
+    traite_le = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        db_table = 'evenements_consommes'
+        verbose_name = 'Événement consommé'
+        verbose_name_plural = 'Événements consommés'
+        unique_together = [['consommateur', 'event_id']]
+
+    def __str__(self):
+        return f"{self.consommateur} - {self.type_evenement} ({self.event_id})"
+
+
+class CurseurConsommateurBase(models.Model):
+    """Position de lecture d'un consommateur dans le bus."""
+    nom = models.CharField(max_length=100, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        db_table = 'curseurs_consommateurs'
+        verbose_name = 'Curseur de consommateur'
+        verbose_name_plural = 'Curseurs de consommateurs'
+
+    def __str__(self):
+        return f"{self.nom} @ {self.position}"
+
+
+class CompteurNumeroBase(models.Model):
+    """Dernier numéro attribué par (préfixe, période), hors PostgreSQL (voir numerotation.py)."""
+    prefixe = models.CharField(max_length=20)
+    periode = models.CharField(max_length=20)
+    valeur = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        db_table = 'compteurs_numero'
+        unique_together = [['prefixe', 'periode']]
+
+    def __str__(self):
+        return f"{self.prefixe}-{self.periode} = {self.valeur}"
+
+
+@cache
+def modele_concret(base):
+    """Le modèle du service qui concrétise `base` (un seul par service)."""
+    from django.apps import apps
+
+    return next(modele for modele in apps.get_models() if issubclass(modele, base))
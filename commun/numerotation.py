@@ -0,0 +1,136 @@
+"""
+🔢 Numérotation des documents : DEC-2026-000123, BP-2026-10-000042…
+
+Le compteur repart à 1 à chaque période (l'année par défaut, le mois pour les
+bulletins) : chaque couple (préfixe, période) a le sien.
+
+Sur PostgreSQL, c'est une séquence `numero_<prefixe>_<periode>_seq` incrémentée
+de TAILLE_BLOC, créée à la première utilisation de la période : un seul nextval
+réserve un bloc entier de numéros, distribué ensuite par le processus sans autre
+requête. Une séquence n'est pas transactionnelle : un bloc réservé n'est jamais
+redonné, même après un rollback (quelques trous dans la numérotation, jamais de
+doublon).
+
+Ailleurs (SQLite des benchmarks), un compteur en table par (préfixe, période)
+est incrémenté dans la transaction courante.
+
+Dans les deux cas, un compteur créé pour une période déjà entamée démarre après
+le plus grand numéro existant (settings.NUMEROTATION : préfixe → modèle).
+"""
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import CompteurNumeroBase, modele_concret
+
+TAILLE_BLOC = 100
+LARGEUR = 6
+
+_blocs = {}  # (prefixe, periode) -> [prochain, dernier] du bloc en cours
+_verrou = threading.Lock()
+
+
+def nom_sequence(prefixe, periode):
+    return f"numero_{prefixe}_{periode}_seq".lower().replace('-', '_')
+
+
+def numeros(prefixe, nombre, periode=None):
+    """`nombre` numéros consécutifs pour ce processus, au format PREFIXE-periode-000123."""
+    if nombre <= 0:
+        return []
+    periode = str(periode if periode is not None else timezone.now().year)
+    if connection.vendor == 'postgresql':
+        valeurs = _valeurs_sequence(prefixe, periode, nombre)
+    else:
+        valeurs = _valeurs_compteur(prefixe, periode, nombre)
+    return [f"{prefixe}-{periode}-{valeur:0{LARGEUR}d}" for valeur in valeurs]
+
+
+def numero(prefixe, periode=None):
+    return numeros(prefixe, 1, periode)[0]
+
+
+def attribuer_numeros(objets, prefixe, periode=None):
+    """Numérote en une allocation les objets sans numero (avant un bulk_create)."""
+    sans_numero = [objet for objet in objets if not objet.numero]
+    for objet, valeur in zip(sans_numero, numeros(prefixe, len(sans_numero), periode)):
+        objet.numero = valeur
+    return objets
+
+
+def dernier_attribue(prefixe, periode):
+    """Plus grand numéro déjà attribué pour (préfixe, période), 0 si aucun."""
+    modele = apps.get_model(settings.NUMEROTATION[prefixe])
+    debut = f"{prefixe}-{periode}-"
+    # Tri sur la longueur d'abord : au-delà de 999999 le numéro s'allonge
+    dernier = (
+        modele.objects.filter(numero__startswith=debut)
+        .order_by(Length('numero').desc(), '-numero').values_list('numero', flat=True).first()
+    )
+    return int(dernier[len(debut):]) if dernier else 0
+
+
+def _valeurs_sequence(prefixe, periode, nombre):
+    cle = (prefixe, periode)
+    with _verrou:
+        bloc = _blocs.setdefault(cle, [1, 0])
+        pris = min(nombre, bloc[1] - bloc[0] + 1)
+        valeurs = list(range(bloc[0], bloc[0] + pris))
+        bloc[0] += pris
+
+        reste = nombre - pris
+        if reste:
+            for debut in _reserver_blocs(prefixe, periode, -(-reste // TAILLE_BLOC)):
+                pris = min(reste, TAILLE_BLOC)
+                valeurs.extend(range(debut, debut + pris))
+                reste -= pris
+                _blocs[cle] = [debut + pris, debut + TAILLE_BLOC - 1]
+        return valeurs
+
+
+def _reserver_blocs(prefixe, periode, nombre_blocs):
+    """Débuts de `nombre_blocs` blocs (un aller-retour), la séquence de la période créée au besoin."""
+    for tentative in range(2):
+        try:
+            # Point de sauvegarde : une séquence absente n'annule pas la transaction appelante
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT nextval(%s) FROM generate_series(1, %s)",
+                    [nom_sequence(prefixe, periode), nombre_blocs],
+                )
+                return sorted(ligne[0] for ligne in cursor.fetchall())
+        except DatabaseError:
+            if tentative:
+                raise
+            _creer_sequence(prefixe, periode)
+
+
+def _creer_sequence(prefixe, periode):
+    try:
+        # Un autre processus peut la créer au même moment : son erreur est ignorée, nextval est rejoué
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE SEQUENCE IF NOT EXISTS {connection.ops.quote_name(nom_sequence(prefixe, periode))} "
+                f"INCREMENT BY {TAILLE_BLOC} START WITH {dernier_attribue(prefixe, periode) + 1}"
+            )
+    except DatabaseError:
+        pass
+
+
+def _valeurs_compteur(prefixe, periode, nombre):
+    CompteurNumero = modele_concret(CompteurNumeroBase)
+
+    with transaction.atomic():
+        compteur = CompteurNumero.objects.select_for_update().filter(prefixe=prefixe, periode=periode).first()
+        if compteur is None:
+            compteur = CompteurNumero.objects.create(
+                prefixe=prefixe, periode=periode, valeur=dernier_attribue(prefixe, periode)
+            )
+        debut = compteur.valeur + 1
+        compteur.valeur += nombre
+        compteur.save(update_fields=['valeur'])
+    return range(debut, debut + nombre)
@@ -0,0 +1,125 @@
+"""
+🔔 Génération périodique des AlerteDecaissement.
+
+Chaque règle est une requête ensembliste sur les dossiers ouverts (non décidés,
+en attente côté finance), servie par les index partiels de DossierDecaissement,
+avec un NOT EXISTS contre les alertes non lues du même type : seuls les dossiers
+à alerter remontent, puis sont insérés en un bulk_create.
+
+Un filigrane (CurseurSynchronisation) limite chaque passe aux dossiers modifiés
+depuis la précédente et aux échéances entrées dans l'horizon depuis : le coût
+d'une passe dépend des changements, pas du nombre de dossiers ouverts.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import AlerteDecaissement, CurseurSynchronisation, DossierDecaissement, ProfilCoordinateur
+from .synchronisation import SEUIL_HAUT, SEUIL_URGENT
+
+CURSEUR_ALERTES = "cordo.alertes"
+
+# Alerte quand l'échéance de décision tombe dans cet horizon
+HORIZON_DATE_LIMITE = timedelta(hours=24)
+# Recouvrement entre deux passes : rattrape les lignes validées pendant la passe précédente
+RECOUVREMENT = timedelta(minutes=1)
+
+DOSSIERS_OUVERTS = Q(decision_prise=False, statut_finance='en_attente')
+
+
+def _sans_alerte_non_lue(dossiers, type_alerte):
+    """Anti-jointure : exclut les dossiers ayant déjà une alerte non lue de ce type."""
+    return dossiers.exclude(Exists(AlerteDecaissement.objects.filter(
+        dossier_decaissement=OuterRef('pk'), type_alerte=type_alerte, est_lue=False,
+    )))
+
+
+# ============================================================
+# 📏 Règles (une requête chacune)
+# ============================================================
+def _dates_limites(ouverts, filigrane, maintenant):
+    dossiers = ouverts.filter(date_limite_decision__lte=maintenant + HORIZON_DATE_LIMITE)
+    if filigrane is not None:
+        # Échéances entrées dans l'horizon depuis la passe précédente, ou dossiers modifiés
+        dossiers = dossiers.filter(
+            Q(date_limite_decision__gt=filigrane + HORIZON_DATE_LIMITE) | Q(updated_at__gt=filigrane)
+        )
+    for dossier in _sans_alerte_non_lue(dossiers, 'date_limite').values('id', 'numero', 'date_limite_decision'):
+        depassee = dossier['date_limite_decision'] <= maintenant
+        yield AlerteDecaissement(
+            dossier_decaissement_id=dossier['id'],
+            type_alerte='date_limite',
+            severite='critique' if depassee else 'avertissement',
+            message=(
+                f"Date limite de décision {'dépassée' if depassee else 'approchante'} pour le dossier "
+                f"{dossier['numero']} ({timezone.localtime(dossier['date_limite_decision']):%d/%m/%Y %H:%M})."
+            ),
+        )
+
+
+def _montants_eleves(ouverts, filigrane, maintenant):
+    dossiers = ouverts.filter(montant_demande__gte=SEUIL_HAUT)
+    if filigrane is not None:
+        dossiers = dossiers.filter(updated_at__gt=filigrane)
+    for dossier in _sans_alerte_non_lue(dossiers, 'montant_eleve').values('id', 'numero', 'montant_demande'):
+        yield AlerteDecaissement(
+            dossier_decaissement_id=dossier['id'],
+            type_alerte='montant_eleve',
+            severite='critique' if dossier['montant_demande'] >= SEUIL_URGENT else 'avertissement',
+            message=f"Montant élevé pour le dossier {dossier['numero']} : {dossier['montant_demande']} Ar.",
+        )
+
+
+def _coordinateurs_indisponibles(ouverts, filigrane, maintenant):
+    indisponibles = ProfilCoordinateur.objects.exclude(statut='actif')
+    dossiers = ouverts.filter(coordinateur__in=indisponibles.values('id'))
+    if filigrane is not None:
+        # Dossiers modifiés, ou coordinateur devenu indisponible depuis la passe précédente
+        dossiers = dossiers.filter(
+            Q(updated_at__gt=filigrane)
+            | Q(coordinateur__in=indisponibles.filter(updated_at__gt=filigrane).values('id'))
+        )
+    lignes = _sans_alerte_non_lue(dossiers, 'coordinateur_indisponible').values(
+        'id', 'numero', 'coordinateur__nom_complet', 'coordinateur__statut'
+    )
+    for dossier in lignes:
+        yield AlerteDecaissement(
+            dossier_decaissement_id=dossier['id'],
+            type_alerte='coordinateur_indisponible',
+            severite='avertissement',
+            message=(
+                f"Le coordinateur {dossier['coordinateur__nom_complet']} du dossier {dossier['numero']} "
+                f"est indisponible ({dossier['coordinateur__statut']}) : réaffectation à prévoir."
+            ),
+        )
+
+
+REGLES = [_dates_limites, _montants_eleves, _coordinateurs_indisponibles]
+
+
+# ============================================================
+# 🚀 Passe de génération
+# ============================================================
+def generer_alertes(maintenant=None):
+    """
+    Crée les alertes manquantes depuis la passe précédente.
+    Retourne le nombre d'alertes créées par type.
+    """
+    maintenant = maintenant or timezone.now()
+    with transaction.atomic():
+        curseur, _ = CurseurSynchronisation.objects.select_for_update().get_or_create(nom=CURSEUR_ALERTES)
+        filigrane = curseur.derniere_maj
+        ouverts = DossierDecaissement.objects.filter(DOSSIERS_OUVERTS).order_by()
+
+        alertes = [alerte for regle in REGLES for alerte in regle(ouverts, filigrane, maintenant)]
+        AlerteDecaissement.objects.bulk_create(alertes, batch_size=1000)
+
+        curseur.derniere_maj = maintenant - RECOUVREMENT
+        curseur.save(update_fields=['derniere_maj', 'derniere_execution'])
+
+    creees = {}
+    for alerte in alertes:
+        creees[alerte.type_alerte] = creees.get(alerte.type_alerte, 0) + 1
+    return creees
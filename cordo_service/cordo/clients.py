@@ -0,0 +1,58 @@
+"""
+🔌 Clients HTTP vers les autres services (appels internes, hors Kong).
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import jwt
+import requests
+from django.conf import settings
+
+
+def jeton_service(duree=timedelta(minutes=5)):
+    """JWT court signé avec JWT_SECRET, accepté par KongJWTAuthentication des autres services."""
+    payload = {
+        "iss": settings.JWT_ISSUER,
+        "sub": "cordo_service",
+        "username": "cordo_service",
+        "role": "service",
+        "exp": datetime.now(dt_timezone.utc) + duree,
+    }
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+class FinanceClient:
+    """Accès à finance_service ; une session HTTP réutilisée pour tous les lots."""
+
+    def __init__(self, base_url=None, timeout=30):
+        self.base_url = (base_url or settings.FINANCE_SERVICE_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, chemin, params=None):
+        response = self.session.get(
+            f"{self.base_url}{chemin}", params=params, timeout=self.timeout,
+            headers={"Authorization": f"Bearer {jeton_service()}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _post(self, chemin, donnees):
+        response = self.session.post(
+            f"{self.base_url}{chemin}", json=donnees, timeout=self.timeout,
+            headers={"Authorization": f"Bearer {jeton_service()}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def envoyer_decisions(self, decisions):
+        """Applique un lot de décisions ; retourne un résultat par décision."""
+        return self._post("/api/finance/demandes-decaissement/decisions/", {"decisions": decisions})["resultats"]
+
+    def demandes_modifiees(self, depuis=None, apres_id=None, limite=500):
+        """Page de DemandeDecaissement modifiées après le curseur (updated_at, id)."""
+        params = {"limit": limite}
+        if depuis is not None:
+            params["since"] = depuis.isoformat()
+            if apres_id is not None:
+                params["after_id"] = str(apres_id)
+        return self._get("/api/finance/demandes-decaissement/sync/", params)["results"]
@@ -0,0 +1,137 @@
+"""
+📤 Envoi par lots des décisions du coordinateur à finance_service.
+
+Chaque HistoriqueValidation 'approuve'/'rejete' crée une CommandeDecision dans la
+même transaction. `expedier_decisions()` envoie les commandes en attente par lots
+à l'endpoint `demandes-decaissement/decisions/` ; finance les applique en une
+transaction et déduplique sur l'id de la commande (clé d'idempotence).
+
+Un lot est réservé (statut 'en_cours') dans une transaction courte, envoyé hors
+transaction, puis ses résultats sont enregistrés : aucun verrou n'est tenu
+pendant l'appel HTTP. Une réservation plus vieille que DELAI_RESERVATION (worker
+arrêté en plein envoi) est reprise par le passage suivant.
+"""
+from datetime import timedelta
+
+import requests
+from django.db import transaction
+from django.db.models import Case, CharField, Q, Value, When
+from django.utils import timezone
+
+from .models import CommandeDecision, DossierDecaissement
+
+MAX_TENTATIVES = 5
+DELAI_RESERVATION = timedelta(minutes=5)
+# Réponses 4xx qui restent transitoires (délai dépassé, limitation de débit)
+STATUTS_HTTP_TRANSITOIRES = {408, 429}
+
+
+def expedier_decisions(client=None, taille_lot=500):
+    """
+    Envoie un lot de commandes en attente et retourne le nombre traité par finance.
+    En cas d'erreur réseau ou 5xx, les commandes repassent en attente (au plus
+    MAX_TENTATIVES envois) et l'exception est relancée ; un refus 4xx les met
+    en erreur définitivement.
+    """
+    if client is None:
+        from .clients import FinanceClient
+        client = FinanceClient()
+
+    commandes = _reserver(taille_lot)
+    if not commandes:
+        return 0
+
+    try:
+        resultats = client.envoyer_decisions([
+            {
+                'cle': str(commande.id),
+                'demande_id': str(commande.demande_decaissement_id),
+                'action': commande.action,
+                'coordinateur_id': str(commande.coordinateur_user_id),
+                'commentaire': commande.commentaire,
+            }
+            for commande in commandes
+        ])
+    except requests.HTTPError as e:
+        statut_http = e.response.status_code if e.response is not None else None
+        if statut_http and 400 <= statut_http < 500 and statut_http not in STATUTS_HTTP_TRANSITOIRES:
+            # Lot refusé par finance : le renvoyer tel quel échouerait de nouveau
+            _liberer(commandes, f"Refusé par finance ({statut_http}) : {e}", definitif=True)
+            return len(commandes)
+        _liberer(commandes, str(e))
+        raise
+    except requests.RequestException as e:
+        _liberer(commandes, str(e))
+        raise
+
+    with transaction.atomic():
+        _enregistrer_resultats(commandes, resultats)
+    return len(commandes)
+
+
+def _reserver(taille_lot):
+    """
+    Passe un lot de commandes en attente (ou de réservations expirées) à
+    'en_cours' et compte la tentative. Les commandes qui ont épuisé leurs
+    tentatives passent en erreur au lieu d'être renvoyées.
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        commandes = list(
+            CommandeDecision.objects.filter(
+                Q(statut='en_attente') | Q(statut='en_cours', reservee_le__lt=maintenant - DELAI_RESERVATION)
+            )
+            .order_by('created_at')
+            .select_for_update(skip_locked=True)[:taille_lot]
+        )
+        epuisees = [c for c in commandes if c.tentatives >= MAX_TENTATIVES]
+        for commande in epuisees:
+            commande.statut = 'erreur'
+            commande.detail = f"Abandon après {commande.tentatives} tentative(s) : {commande.detail}"
+            commande.traitee_le = maintenant
+        commandes = [c for c in commandes if c.tentatives < MAX_TENTATIVES]
+        for commande in commandes:
+            commande.statut = 'en_cours'
+            commande.reservee_le = maintenant
+            commande.tentatives += 1
+        CommandeDecision.objects.bulk_update(
+            epuisees + commandes, ['statut', 'detail', 'reservee_le', 'tentatives', 'traitee_le']
+        )
+    return commandes
+
+
+def _liberer(commandes, detail, definitif=False):
+    """Après un envoi échoué : retour en attente, ou erreur si refus définitif ou tentatives épuisées."""
+    maintenant = timezone.now()
+    for commande in commandes:
+        abandon = definitif or commande.tentatives >= MAX_TENTATIVES
+        commande.statut = 'erreur' if abandon else 'en_attente'
+        commande.detail = detail
+        commande.reservee_le = None
+        commande.traitee_le = maintenant if abandon else None
+    CommandeDecision.objects.bulk_update(commandes, ['statut', 'detail', 'reservee_le', 'traitee_le'])
+
+
+def _enregistrer_resultats(commandes, resultats):
+    par_cle = {str(resultat['cle']): resultat for resultat in resultats}
+    maintenant = timezone.now()
+    for commande in commandes:
+        resultat = par_cle[str(commande.id)]
+        commande.statut = resultat['resultat']
+        commande.detail = resultat['detail']
+        commande.depense_id = resultat['depense_id']
+        commande.reservee_le = None
+        commande.traitee_le = maintenant
+    CommandeDecision.objects.bulk_update(
+        commandes, ['statut', 'detail', 'depense_id', 'reservee_le', 'traitee_le']
+    )
+
+    # Statut finance des dossiers mis à jour tout de suite (la synchronisation le confirmera)
+    appliquees = [c for c in commandes if c.statut == 'appliquee']
+    if appliquees:
+        DossierDecaissement.objects.filter(
+            demande_decaissement_id__in=[c.demande_decaissement_id for c in appliquees]
+        ).update(statut_finance=Case(
+            *[When(demande_decaissement_id=c.demande_decaissement_id, then=Value(c.action)) for c in appliquees],
+            output_field=CharField(),
+        ))
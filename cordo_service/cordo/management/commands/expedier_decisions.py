@@ -0,0 +1,40 @@
+"""
+Envoi par lots des décisions du coordinateur à finance_service.
+
+    python manage.py expedier_decisions            # vide la file puis s'arrête
+    python manage.py expedier_decisions --follow   # worker permanent (docker-compose)
+"""
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from cordo.clients import FinanceClient
+from cordo.decisions import expedier_decisions
+
+
+class Command(BaseCommand):
+    help = "Applique côté finance les décisions enregistrées par les coordinateurs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--lot", type=int, default=500, help="Décisions par lot (défaut 500).")
+        parser.add_argument("--intervalle", type=float, default=2.0,
+                            help="Attente entre deux passes en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        client = FinanceClient()
+        while True:
+            try:
+                envoyees = expedier_decisions(client, options["lot"])
+            except requests.RequestException as e:
+                if not options["follow"]:
+                    raise
+                self.stderr.write(f"⚠️ finance_service injoignable : {e}")
+                envoyees = 0
+            if envoyees:
+                self.stdout.write(f"📤 {envoyees} décision(s) traitée(s) par finance")
+                continue
+            if not options["follow"]:
+                break
+            time.sleep(options["intervalle"])
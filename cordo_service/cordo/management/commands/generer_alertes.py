@@ -0,0 +1,31 @@
+"""
+Génération des alertes de décaissement (dates limites, montants élevés,
+coordinateurs indisponibles).
+
+    python manage.py generer_alertes            # une passe puis s'arrête (cron)
+    python manage.py generer_alertes --follow   # worker permanent (docker-compose)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from cordo.alertes import generer_alertes
+
+
+class Command(BaseCommand):
+    help = "Crée les alertes de décaissement manquantes depuis la passe précédente."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--intervalle", type=float, default=60.0,
+                            help="Attente entre deux passes en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        while True:
+            creees = generer_alertes()
+            if creees:
+                detail = ", ".join(f"{type_alerte}: {nombre}" for type_alerte, nombre in sorted(creees.items()))
+                self.stdout.write(f"🔔 {sum(creees.values())} alerte(s) créée(s) ({detail})")
+            if not options["follow"]:
+                break
+            time.sleep(options["intervalle"])
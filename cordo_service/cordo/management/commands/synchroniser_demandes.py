@@ -0,0 +1,42 @@
+"""
+Synchronisation des DemandeDecaissement de finance_service en DossierDecaissement.
+
+    python manage.py synchroniser_demandes            # rattrape le retard puis s'arrête
+    python manage.py synchroniser_demandes --follow   # worker permanent (docker-compose)
+"""
+import time
+
+import requests
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from cordo.synchronisation import synchroniser_demandes
+
+
+class Command(BaseCommand):
+    help = "Crée ou met à jour les dossiers de décaissement à partir des demandes finance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--lot", type=int, default=500, help="Demandes par lot (défaut 500).")
+        parser.add_argument("--intervalle", type=float, default=10.0,
+                            help="Attente entre deux passes en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                total = synchroniser_demandes(taille_lot=options["lot"])
+                if total:
+                    self.stdout.write(f"🔄 {total} dossier(s) synchronisé(s)")
+            except requests.RequestException as e:
+                if not options["follow"]:
+                    raise
+                self.stderr.write(f"⚠️ finance_service injoignable : {e}")
+            except ValidationError as e:
+                # Aucun coordinateur actif : les nouvelles demandes attendent la passe suivante
+                if not options["follow"]:
+                    raise
+                self.stderr.write(f"⚠️ {' '.join(e.messages)}")
+            if not options["follow"]:
+                break
+            time.sleep(options["intervalle"])
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cordo', '0002_curseurconsommateur_evenementoutbox_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurseurSynchronisation',
+            fields=[
+                ('nom', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('derniere_maj', models.DateTimeField(blank=True, null=True)),
+                ('dernier_id', models.UUIDField(blank=True, null=True)),
+                ('derniere_execution', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Curseur de synchronisation',
+                'verbose_name_plural': 'Curseurs de synchronisation',
+                'db_table': 'curseurs_synchronisation',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='dossierdecaissement',
+            name='dossiers_de_demande_ab0216_idx',
+        ),
+        migrations.AddField(
+            model_name='dossierdecaissement',
+            name='statut_finance',
+            field=models.CharField(choices=[('en_attente', 'En attente'), ('approuve', 'Approuvé'), ('rejete', 'Rejeté')], default='en_attente', help_text='Statut de la DemandeDecaissement côté finance (synchronisé)', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='dossierdecaissement',
+            name='demande_decaissement_id',
+            field=models.UUIDField(help_text='UUID de la DemandeDecaissement (depuis finance_service)', unique=True),
+        ),
+    ]
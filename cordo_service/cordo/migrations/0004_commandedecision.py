@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cordo', '0003_curseursynchronisation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandeDecision',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('demande_decaissement_id', models.UUIDField()),
+                ('action', models.CharField(max_length=20)),
+                ('coordinateur_user_id', models.UUIDField()),
+                ('commentaire', models.TextField(blank=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', "En cours d'envoi"), ('appliquee', 'Appliquée'), ('erreur', 'Erreur')], default='en_attente', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('detail', models.TextField(blank=True, help_text='Dernière erreur ou motif du refus finance')),
+                ('depense_id', models.UUIDField(blank=True, help_text='Dépense créée par finance', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reservee_le', models.DateTimeField(blank=True, help_text="Début de l'envoi en cours", null=True)),
+                ('traitee_le', models.DateTimeField(blank=True, null=True)),
+                ('historique_validation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='commande_finance', to='cordo.historiquevalidation')),
+            ],
+            options={
+                'verbose_name': 'Commande de décision',
+                'verbose_name_plural': 'Commandes de décision',
+                'db_table': 'commandes_decision',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('statut__in', ['en_attente', 'en_cours'])), fields=['created_at'], name='commande_decision_attente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cordo', '0004_commandedecision'),
+    ]
+
+    operations = [
+        # Séquences PostgreSQL par (préfixe, période) créées à la première utilisation (commun/numerotation.py)
+        migrations.CreateModel(
+            name='CompteurNumero',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefixe', models.CharField(max_length=20)),
+                ('periode', models.CharField(max_length=20)),
+                ('valeur', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'compteurs_numero',
+                'abstract': False,
+                'unique_together': {('prefixe', 'periode')},
+            },
+        ),
+    ]
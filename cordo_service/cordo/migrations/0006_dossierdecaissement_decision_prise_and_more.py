@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:41
+
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Figés ici (règle de DossierDecaissement.score à la date de la migration) : la
+# migration ne doit pas dépendre du modèle courant
+AVANCE_PRIORITE = {
+    'urgente': timedelta(days=2),
+    'haute': timedelta(days=1),
+    'normale': timedelta(0),
+    'basse': timedelta(days=-1),
+}
+MONTANT_REFERENCE = Decimal('100000')
+AVANCE_PAR_ORDRE_DE_GRANDEUR = timedelta(hours=6)
+AVANCE_MONTANT_MAX = timedelta(days=1)
+
+
+def score(dossier):
+    avance = AVANCE_PRIORITE.get(dossier.priorite, timedelta(0))
+    montant = Decimal(dossier.montant_demande)
+    if montant > MONTANT_REFERENCE:
+        ordres = math.log10(montant / MONTANT_REFERENCE)
+        avance += min(AVANCE_PAR_ORDRE_DE_GRANDEUR * ordres, AVANCE_MONTANT_MAX)
+    return int((dossier.date_limite_decision - avance).timestamp())
+
+
+def initialiser_file(apps, schema_editor):
+    """Marque les dossiers déjà décidés et calcule le score des dossiers en attente."""
+    Dossier = apps.get_model('cordo', 'DossierDecaissement')
+    Dossier.objects.filter(historique_validations__action__in=['approuve', 'rejete']).update(decision_prise=True)
+
+    a_jour = []
+    for dossier in Dossier.objects.filter(statut_finance='en_attente', decision_prise=False).iterator():
+        dossier.score_file = score(dossier)
+        a_jour.append(dossier)
+    Dossier.objects.bulk_update(a_jour, ['score_file'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cordo', '0005_numerotation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dossierdecaissement',
+            name='decision_prise',
+            field=models.BooleanField(default=False, help_text='Décision enregistrée, en attente de finance'),
+        ),
+        migrations.AddField(
+            model_name='dossierdecaissement',
+            name='reserve_jusqu_a',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dossierdecaissement',
+            name='reserve_par',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='dossiers_reserves', to='cordo.profilcoordinateur'),
+        ),
+        migrations.AddField(
+            model_name='dossierdecaissement',
+            name='score_file',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='Échéance effective (epoch, secondes) ; plus petit = plus urgent, NULL = hors file', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='dossierdecaissement',
+            index=models.Index(condition=models.Q(('score_file__isnull', False)), fields=['score_file'], name='dossier_file_idx'),
+        ),
+        migrations.RunPython(initialiser_file, migrations.RunPython.noop),
+    ]
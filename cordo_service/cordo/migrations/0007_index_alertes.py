@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cordo', '0006_dossierdecaissement_decision_prise_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alertedecaissement',
+            index=models.Index(condition=models.Q(('est_lue', False)), fields=['dossier_decaissement', 'type_alerte'], name='alerte_non_lue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dossierdecaissement',
+            index=models.Index(condition=models.Q(('decision_prise', False), ('statut_finance', 'en_attente')), fields=['date_limite_decision'], name='dossier_ouvert_limite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dossierdecaissement',
+            index=models.Index(condition=models.Q(('decision_prise', False), ('statut_finance', 'en_attente')), fields=['updated_at'], name='dossier_ouvert_maj_idx'),
+        ),
+    ]
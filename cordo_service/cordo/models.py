@@ -1,8 +1,20 @@
+import math
 import uuid
-from django.db import models
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django.utils import timezone
 
+from commun.models import (
+    CompteurNumeroBase, CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase,
+)
+from commun.events import publier_evenement
+from commun.numerotation import numero
+from .regles import invalider as invalider_regles
+
 # ============================================================
 # 👤 Profil du Coordinateur
 # ============================================================
@@ -54,11 +66,18 @@ class DossierDecaissement(models.Model):
         ('urgente', 'Urgente'),
     ]
 
+    STATUT_FINANCE_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('approuve', 'Approuvé'),
+        ('rejete', 'Rejeté'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     numero = models.CharField(max_length=100, unique=True, blank=True)
     
     # Référence vers la demande de décaissement du service finance
     demande_decaissement_id = models.UUIDField(
+        unique=True,
         help_text="UUID de la DemandeDecaissement (depuis finance_service)"
     )
     
@@ -80,6 +99,10 @@ class DossierDecaissement(models.Model):
     demandeur_finance_id = models.UUIDField(
         help_text="UUID du responsable finance (depuis auth_service)"
     )
+    statut_finance = models.CharField(
+        max_length=20, choices=STATUT_FINANCE_CHOICES, default='en_attente',
+        help_text="Statut de la DemandeDecaissement côté finance (synchronisé)"
+    )
     
     date_reception = models.DateTimeField(auto_now_add=True)
     date_limite_decision = models.DateTimeField(
@@ -88,10 +111,37 @@ class DossierDecaissement(models.Model):
     
     # Notes du coordinateur
     notes_interne = models.TextField(blank=True, help_text="Notes internes du coordinateur")
+
+    # File de travail des coordinateurs (voir score et reserver)
+    decision_prise = models.BooleanField(default=False, help_text="Décision enregistrée, en attente de finance")
+    score_file = models.BigIntegerField(
+        null=True, blank=True, editable=False,
+        help_text="Échéance effective (epoch, secondes) ; plus petit = plus urgent, NULL = hors file"
+    )
+    reserve_par = models.ForeignKey(
+        ProfilCoordinateur,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='dossiers_reserves'
+    )
+    reserve_jusqu_a = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Avance sur l'échéance selon la priorité et le montant (voir score)
+    AVANCE_PRIORITE = {
+        'urgente': timedelta(days=2),
+        'haute': timedelta(days=1),
+        'normale': timedelta(0),
+        'basse': timedelta(days=-1),
+    }
+    MONTANT_REFERENCE = Decimal('100000')
+    AVANCE_PAR_ORDRE_DE_GRANDEUR = timedelta(hours=6)
+    AVANCE_MONTANT_MAX = timedelta(days=1)
+    DUREE_RESERVATION = timedelta(minutes=30)
+
     class Meta:
         db_table = 'dossiers_decaissement'
         verbose_name = 'Dossier de Décaissement'
@@ -99,17 +149,93 @@ class DossierDecaissement(models.Model):
         ordering = ['-date_reception']
         indexes = [
             models.Index(fields=['coordinateur', '-date_reception']),
-            models.Index(fields=['demande_decaissement_id']),
+            models.Index(fields=['score_file'], name='dossier_file_idx', condition=Q(score_file__isnull=False)),
+            # Règles de génération des alertes (voir alertes.py), sur les seuls dossiers ouverts
+            models.Index(fields=['date_limite_decision'], name='dossier_ouvert_limite_idx',
+                         condition=Q(decision_prise=False, statut_finance='en_attente')),
+            models.Index(fields=['updated_at'], name='dossier_ouvert_maj_idx',
+                         condition=Q(decision_prise=False, statut_finance='en_attente')),
         ]
 
     def save(self, *args, **kwargs):
         if not self.numero:
-            self.numero = f"DOS-{uuid.uuid4().hex[:8].upper()}"
+            self.numero = numero('DOS')
+        self.score_file = self.score()
+        if 'update_fields' in kwargs and kwargs['update_fields'] is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'score_file'}
         super().save(*args, **kwargs)
 
+    def score(self):
+        """
+        Rang dans la file : échéance avancée selon la priorité et le montant
+        (6 h par ordre de grandeur au-delà de 100 000 Ar, 1 jour au plus).
+        Indépendant de l'heure courante, donc indexable : trier par score revient
+        à trier par temps restant pondéré. None si le dossier n'attend plus de décision.
+        """
+        if self.decision_prise or self.statut_finance != 'en_attente':
+            return None
+        avance = self.AVANCE_PRIORITE.get(self.priorite, timedelta(0))
+        montant = Decimal(self.montant_demande)
+        if montant > self.MONTANT_REFERENCE:
+            ordres = math.log10(montant / self.MONTANT_REFERENCE)
+            avance += min(self.AVANCE_PAR_ORDRE_DE_GRANDEUR * ordres, self.AVANCE_MONTANT_MAX)
+        return int((self.date_limite_decision - avance).timestamp())
+
+    @classmethod
+    def reserver(cls, coordinateur, nombre):
+        """
+        Réserve pour `coordinateur` les `nombre` dossiers les plus urgents de la
+        file (ses réservations en cours comprises) et les lui assigne. Les lignes
+        verrouillées par un autre coordinateur sont sautées (SKIP LOCKED) : des
+        appels simultanés ne se bloquent pas et ne reçoivent jamais le même dossier.
+        """
+        maintenant = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                cls.objects.filter(score_file__isnull=False)
+                .filter(
+                    Q(reserve_jusqu_a__isnull=True) | Q(reserve_jusqu_a__lt=maintenant)
+                    | Q(reserve_par=coordinateur)
+                )
+                .order_by('score_file', 'id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:nombre]
+            )
+            cls.objects.filter(id__in=ids).update(
+                reserve_par=coordinateur,
+                reserve_jusqu_a=maintenant + cls.DUREE_RESERVATION,
+                coordinateur=coordinateur,
+                updated_at=maintenant,
+            )
+        return ids
+
+    def liberer(self):
+        """Rend le dossier à la file."""
+        self.reserve_par = None
+        self.reserve_jusqu_a = None
+        self.save(update_fields=['reserve_par', 'reserve_jusqu_a', 'updated_at'])
+
     def __str__(self):
         return f"{self.numero} - {self.montant_demande} Ar"
 
+# ============================================================
+# 🔄 Curseur de synchronisation avec finance_service
+# ============================================================
+class CurseurSynchronisation(models.Model):
+    """High-water mark (updated_at, id) d'une synchronisation incrémentale."""
+    nom = models.CharField(max_length=100, primary_key=True)
+    derniere_maj = models.DateTimeField(null=True, blank=True)
+    dernier_id = models.UUIDField(null=True, blank=True)
+    derniere_execution = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'curseurs_synchronisation'
+        verbose_name = 'Curseur de synchronisation'
+        verbose_name_plural = 'Curseurs de synchronisation'
+
+    def __str__(self):
+        return f"{self.nom} @ {self.derniere_maj}"
+
 # ============================================================
 # ✅ Historique des Validations (Approbations/Rejets)
 # ============================================================
@@ -170,9 +296,90 @@ class HistoriqueValidation(models.Model):
         verbose_name_plural = 'Historiques de Validations'
         ordering = ['-date_validation']
 
+    def save(self, *args, **kwargs):
+        if not (self._state.adding and self.action in ('approuve', 'rejete')):
+            return super().save(*args, **kwargs)
+
+        # Décision du coordinateur : mise en file pour finance et diffusée sur le bus
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            dossier = self.dossier_decaissement
+            # Le dossier sort de la file de travail
+            DossierDecaissement.objects.filter(pk=dossier.pk).update(
+                decision_prise=True, score_file=None, reserve_par=None, reserve_jusqu_a=None,
+                updated_at=timezone.now(),
+            )
+            CommandeDecision.objects.create(
+                historique_validation=self,
+                demande_decaissement_id=dossier.demande_decaissement_id,
+                action=self.action,
+                coordinateur_user_id=self.coordinateur.user_id,
+                commentaire=self.commentaire or self.raison_rejet,
+            )
+            publier_evenement('cordo.decision_enregistree', self, {
+                'dossier_id': dossier.id,
+                'dossier_numero': dossier.numero,
+                'demande_decaissement_id': dossier.demande_decaissement_id,
+                'action': self.action,
+                'montant_approuve': self.montant_approuve,
+                'coordinateur_user_id': self.coordinateur.user_id,
+                'commentaire': self.commentaire or self.raison_rejet,
+            })
+
     def __str__(self):
         return f"{self.dossier_decaissement.numero} - {self.action} - {self.date_validation.strftime('%d/%m/%Y')}"
 
+# ============================================================
+# 📤 Commandes de décision à appliquer côté finance
+# ============================================================
+class CommandeDecision(models.Model):
+    """
+    Décision du coordinateur en attente d'envoi à finance_service. L'id sert de
+    clé d'idempotence : un lot renvoyé après une erreur réseau n'est appliqué
+    qu'une fois par finance.
+    """
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', "En cours d'envoi"),
+        ('appliquee', 'Appliquée'),
+        ('erreur', 'Erreur'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    historique_validation = models.OneToOneField(
+        HistoriqueValidation,
+        on_delete=models.CASCADE,
+        related_name='commande_finance'
+    )
+    demande_decaissement_id = models.UUIDField()
+    action = models.CharField(max_length=20)
+    coordinateur_user_id = models.UUIDField()
+    commentaire = models.TextField(blank=True)
+
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    tentatives = models.PositiveIntegerField(default=0)
+    detail = models.TextField(blank=True, help_text="Dernière erreur ou motif du refus finance")
+    depense_id = models.UUIDField(null=True, blank=True, help_text="Dépense créée par finance")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    reservee_le = models.DateTimeField(null=True, blank=True, help_text="Début de l'envoi en cours")
+    traitee_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'commandes_decision'
+        verbose_name = 'Commande de décision'
+        verbose_name_plural = 'Commandes de décision'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['created_at'], name='commande_decision_attente_idx',
+                condition=models.Q(statut__in=['en_attente', 'en_cours']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.demande_decaissement_id} ({self.statut})"
+
 # ============================================================
 # 📊 Statistiques et Rapports
 # ============================================================
@@ -273,6 +480,16 @@ class ModeleDecision(models.Model):
     def __str__(self):
         return self.nom
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Index des suggestions reconstruit au prochain appel (voir regles.py)
+        transaction.on_commit(invalider_regles)
+
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        transaction.on_commit(invalider_regles)
+        return resultat
+
 # ============================================================
 # 🔔 Notifications et Alertes
 # ============================================================
@@ -312,6 +529,11 @@ class AlerteDecaissement(models.Model):
         verbose_name = 'Alerte de Décaissement'
         verbose_name_plural = 'Alertes de Décaissements'
         ordering = ['-created_at']
+        indexes = [
+            # Anti-jointure de déduplication des alertes générées
+            models.Index(fields=['dossier_decaissement', 'type_alerte'], name='alerte_non_lue_idx',
+                         condition=Q(est_lue=False)),
+        ]
 
     def marquer_comme_lue(self):
         """Marque l'alerte comme lue."""
@@ -345,3 +567,24 @@ class Vue_DemandesPendantes(models.Model):
         db_table = 'vue_demandes_pendantes'
         verbose_name = 'Vue Demandes Pendantes'
         verbose_name_plural = 'Vue Demandes Pendantes'
+
+
+# ============================================================
+# 🔢 Compteurs de numérotation (hors PostgreSQL, voir commun/numerotation.py)
+# ============================================================
+class CompteurNumero(CompteurNumeroBase):
+    pass
+
+# ============================================================
+# 📨 Outbox transactionnelle et bus d'événements (voir commun/events.py)
+# ============================================================
+class EvenementOutbox(EvenementOutboxBase):
+    pass
+
+
+class EvenementConsomme(EvenementConsommeBase):
+    pass
+
+
+class CurseurConsommateur(CurseurConsommateurBase):
+    pass
@@ -0,0 +1,140 @@
+"""
+🧠 Suggestion de décision à partir des ModeleDecision actifs.
+
+Les modèles actifs sont compilés en un index d'intervalles en mémoire : pour
+chaque type de décaissement, les bornes montant_min / montant_max triées
+découpent l'axe des montants en segments élémentaires, et le meilleur modèle de
+chaque segment est calculé une fois pour toutes. Une suggestion coûte alors une
+recherche dichotomique (bisect), sans requête SQL.
+
+Un type vide est un joker : ses modèles s'appliquent à tous les types, après les
+modèles propres au type. À égalité, l'intervalle le plus étroit l'emporte.
+
+L'index est reconstruit dès qu'un modèle est enregistré ou supprimé dans ce
+processus, et au plus tard VERIFICATION_SECONDES après une modification faite
+par un autre processus (signature count + max(updated_at)).
+"""
+import threading
+import time
+from bisect import bisect_left
+from decimal import Decimal
+
+from django.db.models import Count, Max
+
+VERIFICATION_SECONDES = 10
+JOKER = ''
+
+_moteur = None
+_verifie_le = 0.0
+_verrou = threading.Lock()
+
+
+def _type(valeur):
+    return (valeur or '').strip().lower()
+
+
+class IndexIntervalles:
+    """Meilleur modèle par segment élémentaire de l'axe des montants."""
+
+    def __init__(self, modeles):
+        # Bornes incluses ; None = non bornée
+        self.bornes = sorted({
+            borne for modele in modeles
+            for borne in (modele.montant_min, modele.montant_max) if borne is not None
+        })
+        # Segment 2i : entre bornes[i-1] et bornes[i] (exclues) ; segment 2i+1 : bornes[i] exactement
+        self.meilleurs = []
+        for segment in range(2 * len(self.bornes) + 1):
+            i = segment // 2
+            if segment % 2:
+                bas = haut = self.bornes[i]
+            else:
+                bas = self.bornes[i - 1] if i > 0 else None
+                haut = self.bornes[i] if i < len(self.bornes) else None
+            candidats = [m for m in modeles if _couvre(m, bas, haut)]
+            self.meilleurs.append(min(candidats, key=_rang) if candidats else None)
+
+    def chercher(self, montant):
+        i = bisect_left(self.bornes, montant)
+        if i < len(self.bornes) and self.bornes[i] == montant:
+            return self.meilleurs[2 * i + 1]
+        return self.meilleurs[2 * i]
+
+
+def _couvre(modele, bas, haut):
+    """
+    Le modèle contient-il tout le segment ] bas, haut [ (ou le point bas == haut) ?
+    Aucune borne ne tombe à l'intérieur d'un segment : comparer ses extrémités suffit.
+    """
+    if modele.montant_min is not None and (bas is None or modele.montant_min > bas):
+        return False
+    if modele.montant_max is not None and (haut is None or modele.montant_max < haut):
+        return False
+    return True
+
+
+def _rang(modele):
+    joker = _type(modele.type_decaissement) == JOKER
+    if modele.montant_min is None or modele.montant_max is None:
+        largeur = Decimal('Infinity')
+    else:
+        largeur = modele.montant_max - modele.montant_min
+    return (joker, largeur, modele.nom)
+
+
+class MoteurRegles:
+    def __init__(self, modeles, signature=None):
+        self.signature = signature
+        jokers = [m for m in modeles if _type(m.type_decaissement) == JOKER]
+        types = {_type(m.type_decaissement) for m in modeles} - {JOKER}
+        self.index = {
+            type_: IndexIntervalles([m for m in modeles if _type(m.type_decaissement) == type_] + jokers)
+            for type_ in types
+        }
+        self.index[JOKER] = IndexIntervalles(jokers)
+
+    def modele(self, type_decaissement, montant):
+        index = self.index.get(_type(type_decaissement), self.index[JOKER])
+        return index.chercher(Decimal(montant))
+
+    def suggerer(self, type_decaissement, montant):
+        modele = self.modele(type_decaissement, montant)
+        if modele is None:
+            return None
+        return {
+            'modele_id': modele.id,
+            'modele': modele.nom,
+            'decision': modele.decision_defaut,
+            'commentaire': modele.commentaire_template,
+        }
+
+
+# ============================================================
+# ♻️ Moteur partagé du processus
+# ============================================================
+def _signature():
+    from .models import ModeleDecision
+    agregat = ModeleDecision.objects.aggregate(nombre=Count('id'), derniere=Max('updated_at'))
+    return agregat['nombre'], agregat['derniere']
+
+
+def moteur():
+    """Moteur à jour des modèles actifs (reconstruit seulement si les modèles ont changé)."""
+    global _moteur, _verifie_le
+    from .models import ModeleDecision
+
+    with _verrou:
+        if _moteur is not None and time.monotonic() - _verifie_le < VERIFICATION_SECONDES:
+            return _moteur
+        signature = _signature()
+        if _moteur is None or _moteur.signature != signature:
+            _moteur = MoteurRegles(list(ModeleDecision.objects.filter(est_actif=True)), signature)
+        _verifie_le = time.monotonic()
+        return _moteur
+
+
+def invalider():
+    """Force la reconstruction au prochain appel (modèle enregistré ou supprimé)."""
+    global _moteur
+    with _verrou:
+        _moteur = None
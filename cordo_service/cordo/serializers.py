@@ -8,6 +8,7 @@ from .models import (
     AlerteDecaissement,
     Vue_DemandesPendantes
 )
+from .regles import moteur
 
 # ============================================================
 # HistoriqueValidation Serializer
@@ -42,11 +43,21 @@ class DossierDecaissementSerializer(serializers.ModelSerializer):
     
     historique_validations = HistoriqueValidationSerializer(many=True, read_only=True)
     alertes = AlerteDecaissementSerializer(many=True, read_only=True)
+    suggestion = serializers.SerializerMethodField()
 
     class Meta:
         model = DossierDecaissement
         fields = '__all__'
-        read_only_fields = ['id', 'numero', 'date_reception', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'numero', 'date_reception', 'decision_prise', 'score_file',
+            'reserve_par', 'reserve_jusqu_a', 'created_at', 'updated_at'
+        ]
+
+    def get_suggestion(self, obj):
+        """Décision suggérée par le ModeleDecision actif le plus spécifique (index en mémoire)."""
+        if obj.decision_prise:
+            return None
+        return moteur().suggerer(obj.type_decaissement, obj.montant_demande)
 
 # ============================================================
 # StatistiquesValidation Serializer
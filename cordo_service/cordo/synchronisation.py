@@ -0,0 +1,181 @@
+"""
+🔄 Réplication des DemandeDecaissement de finance_service en DossierDecaissement.
+
+Les demandes nouvelles ou modifiées sont lues par pages triées (updated_at, id)
+à partir du dernier curseur enregistré, puis chaque page est écrite en une seule
+requête INSERT … ON CONFLICT (demande_decaissement_id) DO UPDATE. Le curseur est
+avancé dans la même transaction que la page : une synchronisation interrompue
+reprend exactement où elle s'était arrêtée.
+"""
+import heapq
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
+
+from commun.numerotation import numeros
+from .models import CurseurSynchronisation, DossierDecaissement, ProfilCoordinateur
+
+CURSEUR_DEMANDES = "finance.demandes_decaissement"
+
+# ============================================================
+# ⚖️ Règles de priorité et délais de décision
+# ============================================================
+SEUIL_URGENT = Decimal('50000000')
+SEUIL_HAUT = Decimal('10000000')
+SEUIL_BAS = Decimal('100000')
+TYPES_URGENTS = {'salaire'}
+
+DELAIS_DECISION = {
+    'urgente': timedelta(days=1),
+    'haute': timedelta(days=2),
+    'normale': timedelta(days=3),
+    'basse': timedelta(days=5),
+}
+
+# Champs rafraîchis quand la demande change côté finance ; la priorité, le délai
+# et le coordinateur restent ceux fixés à la création du dossier.
+CHAMPS_SYNCHRONISES = [
+    'type_decaissement', 'montant_demande', 'justification',
+    'demandeur_finance_id', 'statut_finance', 'score_file', 'updated_at',
+]
+
+
+def calculer_priorite(type_decaissement, montant):
+    if type_decaissement in TYPES_URGENTS or montant >= SEUIL_URGENT:
+        return 'urgente'
+    if montant >= SEUIL_HAUT:
+        return 'haute'
+    if montant < SEUIL_BAS:
+        return 'basse'
+    return 'normale'
+
+
+def _date(valeur):
+    return parse_datetime(valeur) if isinstance(valeur, str) else valeur
+
+
+def _repartiteur():
+    """
+    Tas (charge, id) des coordinateurs actifs : chaque nouveau dossier va au
+    coordinateur ayant le moins de dossiers en attente.
+    """
+    coordinateurs = ProfilCoordinateur.objects.filter(
+        statut='actif', peut_valider_decaissement=True
+    ).annotate(
+        charge=Count('dossiers_decaissement', filter=Q(dossiers_decaissement__statut_finance='en_attente'))
+    ).values_list('charge', 'id')
+    tas = list(coordinateurs)
+    if not tas:
+        raise ValidationError("Aucun coordinateur actif pour recevoir les dossiers.")
+    heapq.heapify(tas)
+    return tas
+
+
+# ============================================================
+# 📥 Upsert d'un lot de demandes
+# ============================================================
+def upserter_dossiers(demandes):
+    """
+    Crée ou met à jour les dossiers d'un lot de demandes finance (dicts de
+    l'export `demandes-decaissement/sync/`). Les demandes déjà traitées par la
+    finance ne créent pas de dossier, mais mettent à jour un dossier existant.
+    Retourne le nombre de dossiers écrits.
+    """
+    if not demandes:
+        return 0
+    existants = {
+        dossier['demande_decaissement_id']: dossier
+        for dossier in DossierDecaissement.objects.filter(
+            demande_decaissement_id__in=[d['id'] for d in demandes]
+        ).values('demande_decaissement_id', 'coordinateur_id', 'priorite', 'date_limite_decision', 'decision_prise')
+    }
+    a_ecrire = [
+        d for d in demandes
+        if d['statut'] == 'en_attente' or uuid.UUID(str(d['id'])) in existants
+    ]
+    if not a_ecrire:
+        return 0
+
+    # Le répartiteur (et un coordinateur actif) n'est requis que pour les nouveaux dossiers
+    nb_nouveaux = sum(uuid.UUID(str(d['id'])) not in existants for d in a_ecrire)
+    tas = _repartiteur() if nb_nouveaux else []
+    nouveaux = iter(numeros('DOS', nb_nouveaux))
+    dossiers = []
+    for demande in a_ecrire:
+        montant = Decimal(str(demande['montant_demande']))
+        existant = existants.get(uuid.UUID(str(demande['id'])))
+
+        if existant:
+            # Ligne mise à jour via ON CONFLICT : ni le coordinateur ni le numéro
+            # (valeur provisoire jamais insérée) ne sont modifiés
+            coordinateur_id = existant['coordinateur_id']
+            numero = f"DOS-{demande['id']}"
+            priorite = existant['priorite']
+            date_limite = existant['date_limite_decision']
+            decision_prise = existant['decision_prise']
+        else:
+            charge, coordinateur_id = heapq.heappop(tas)
+            heapq.heappush(tas, (charge + 1, coordinateur_id))
+            numero = next(nouveaux)
+            priorite = calculer_priorite(demande['code_type'], montant)
+            date_limite = _date(demande['date_demande']) + DELAIS_DECISION[priorite]
+            decision_prise = False
+
+        dossier = DossierDecaissement(
+            numero=numero,
+            demande_decaissement_id=demande['id'],
+            coordinateur_id=coordinateur_id,
+            priorite=priorite,
+            type_decaissement=demande['code_type'],
+            montant_demande=montant,
+            justification=demande['justification'],
+            demandeur_finance_id=demande['demandeur_finance_id'],
+            statut_finance=demande['statut'],
+            date_limite_decision=date_limite,
+            decision_prise=decision_prise,
+        )
+        dossier.score_file = dossier.score()
+        dossiers.append(dossier)
+
+    DossierDecaissement.objects.bulk_create(
+        dossiers,
+        update_conflicts=True,
+        unique_fields=['demande_decaissement_id'],
+        update_fields=CHAMPS_SYNCHRONISES,
+    )
+    return len(dossiers)
+
+
+# ============================================================
+# 🔁 Synchronisation incrémentale
+# ============================================================
+def synchroniser_demandes(client=None, taille_lot=500, max_lots=None):
+    """
+    Tire les demandes modifiées depuis le dernier curseur, lot par lot.
+    Retourne le nombre de dossiers créés ou mis à jour.
+    """
+    if client is None:
+        from .clients import FinanceClient
+        client = FinanceClient()
+
+    curseur, _ = CurseurSynchronisation.objects.get_or_create(nom=CURSEUR_DEMANDES)
+    total = lots = 0
+    while max_lots is None or lots < max_lots:
+        page = client.demandes_modifiees(curseur.derniere_maj, curseur.dernier_id, taille_lot)
+        if not page:
+            break
+        with transaction.atomic():
+            total += upserter_dossiers(page)
+            derniere = page[-1]
+            curseur.derniere_maj = _date(derniere['updated_at'])
+            curseur.dernier_id = derniere['id']
+            curseur.save()
+        lots += 1
+        if len(page) < taille_lot:
+            break
+    return total
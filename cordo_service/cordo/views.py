@@ -1,6 +1,7 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import (
     ProfilCoordinateur,
@@ -20,6 +21,7 @@ from .serializers import (
     AlerteDecaissementSerializer,
     VueDemandesPendantesSerializer
 )
+from .regles import moteur
 
 # ============================================================
 # ProfilCoordinateur ViewSet
@@ -37,14 +39,76 @@ class ProfilCoordinateurViewSet(viewsets.ModelViewSet):
 # DossierDecaissement ViewSet
 # ============================================================
 class DossierDecaissementViewSet(viewsets.ModelViewSet):
-    queryset = DossierDecaissement.objects.select_related('coordinateur').prefetch_related('historique_validations', 'alertes')
+    queryset = DossierDecaissement.objects.select_related('coordinateur').prefetch_related(
+        'historique_validations__coordinateur', 'alertes'
+    )
     serializer_class = DossierDecaissementSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['priorite', 'type_decaissement', 'coordinateur']
     search_fields = ['numero', 'type_decaissement', 'justification']
-    ordering_fields = ['date_reception', 'montant_demande']
+    ordering_fields = ['date_reception', 'montant_demande', 'score_file']
     ordering = ['-date_reception']
 
+    FILE_NOMBRE_MAX = 100
+
+    def _coordinateur_connecte(self, request):
+        try:
+            return ProfilCoordinateur.objects.filter(
+                user_id=request.user.id, statut='actif', peut_valider_decaissement=True
+            ).first()
+        except (ValueError, DjangoValidationError):
+            return None
+
+    @action(detail=False, methods=['post'])
+    def file(self, request):
+        """
+        Réserve et retourne les prochains dossiers à traiter par le coordinateur
+        connecté, du plus urgent au moins urgent (`nombre`, 10 par défaut).
+        """
+        coordinateur = self._coordinateur_connecte(request)
+        if coordinateur is None:
+            return Response({'detail': "Aucun profil coordinateur actif pour cet utilisateur."},
+                            status=status.HTTP_403_FORBIDDEN)
+        try:
+            nombre = min(int(request.data.get('nombre', request.query_params.get('nombre', 10))), self.FILE_NOMBRE_MAX)
+        except (TypeError, ValueError):
+            return Response({'detail': 'nombre invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = DossierDecaissement.reserver(coordinateur, nombre)
+        dossiers = self.get_queryset().filter(id__in=ids).order_by('score_file', 'id')
+        serializer = self.get_serializer(dossiers, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def suggestions(self, request):
+        """
+        Suggestions pour tout l'arriéré non décidé (filtres de la liste acceptés) :
+        une requête pour les dossiers, puis évaluation en mémoire.
+        """
+        dossiers = (
+            self.filter_queryset(DossierDecaissement.objects.filter(decision_prise=False, statut_finance='en_attente'))
+            .values_list('id', 'numero', 'type_decaissement', 'montant_demande')
+        )
+        regles = moteur()
+        return Response([
+            {
+                'dossier_id': pk,
+                'numero': numero,
+                'suggestion': regles.suggerer(type_decaissement, montant),
+            }
+            for pk, numero, type_decaissement, montant in dossiers
+        ])
+
+    @action(detail=True, methods=['post'])
+    def liberer(self, request, pk=None):
+        """Rend à la file un dossier réservé par le coordinateur connecté."""
+        dossier = self.get_object()
+        coordinateur = self._coordinateur_connecte(request)
+        if coordinateur is None or dossier.reserve_par_id != coordinateur.id:
+            return Response({'detail': "Ce dossier n'est pas réservé par vous."}, status=status.HTTP_400_BAD_REQUEST)
+        dossier.liberer()
+        return Response(self.get_serializer(dossier).data)
+
 # ============================================================
 # HistoriqueValidation ViewSet
 # ============================================================
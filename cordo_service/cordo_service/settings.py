@@ -2,9 +2,15 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Paquet commun aux services (commun/) : copié dans /app par le Dockerfile,
+# à la racine du dépôt en développement
+if not (BASE_DIR / "commun").is_dir():
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = config("SECRET_KEY", default="cordo_service_secret_key_123")
 DEBUG = config("DEBUG", default=True, cast=bool)
 
@@ -12,6 +18,7 @@ ALLOWED_HOSTS = config("DJANGO_ALLOWED_HOSTS", default="localhost").split(",")
 
 INSTALLED_APPS = [
     "cordo",
+    "commun",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -70,6 +77,24 @@ DATABASES = {
     }
 }
 
+# Bus d'événements inter-services (outbox + relais, voir commun/events.py).
+# Base partagée par tous les services ; par défaut sur le même serveur que DB_HOST,
+# créée si besoin au démarrage (manage.py preparer_bus, entrypoint.sh).
+DATABASES["event_bus"] = {
+    "ENGINE": "django.db.backends.postgresql",
+    "NAME": config("EVENT_BUS_DB_NAME", default="event_bus_db"),
+    "USER": config("EVENT_BUS_DB_USER", default=DATABASES["default"]["USER"]),
+    "PASSWORD": config("EVENT_BUS_DB_PASSWORD", default=DATABASES["default"]["PASSWORD"]),
+    "HOST": config("EVENT_BUS_DB_HOST", default=DATABASES["default"]["HOST"]),
+    "PORT": config("EVENT_BUS_DB_PORT", default=DATABASES["default"]["PORT"]),
+}
+EVENT_BUS_DATABASE = "event_bus"
+EVENT_BROKER = config("EVENT_BROKER", default="commun.events.TableQueueBroker")
+EVENT_SERVICE = "cordo_service"
+
+# Numérotation des documents (voir commun/numerotation.py) : préfixe → modèle numéroté
+NUMEROTATION = {'DOS': 'cordo.DossierDecaissement'}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "cordo.authentication.KongJWTAuthentication",
@@ -90,6 +115,7 @@ JWT_ISSUER = "auth-service"
 
 AUTH_SERVICE_URL = config("AUTH_SERVICE_URL", default="http://auth_service:8000")
 RH_SERVICE_URL = config("RH_SERVICE_URL", default="http://rh_service:8000")
+FINANCE_SERVICE_URL = config("FINANCE_SERVICE_URL", default="http://finance_service:8000")
 
 LANGUAGE_CODE = "fr-fr"
 TIME_ZONE = "Indian/Antananarivo"
@@ -0,0 +1,44 @@
+"""
+🔌 Clients HTTP vers les autres services (appels internes, hors Kong).
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import jwt
+import requests
+from django.conf import settings
+
+
+def jeton_service(duree=timedelta(minutes=5)):
+    """JWT court signé avec JWT_SECRET, accepté par KongJWTAuthentication des autres services."""
+    payload = {
+        "iss": settings.JWT_ISSUER,
+        "sub": "finance_service",
+        "username": "finance_service",
+        "role": "service",
+        "exp": datetime.now(dt_timezone.utc) + duree,
+    }
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+class RHClient:
+    """Accès à rh_service ; une session HTTP réutilisée pour toutes les pages."""
+
+    def __init__(self, base_url=None, timeout=30):
+        self.base_url = (base_url or settings.RH_SERVICE_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, chemin, params=None):
+        response = self.session.get(
+            f"{self.base_url}{chemin}", params=params, timeout=self.timeout,
+            headers={"Authorization": f"Bearer {jeton_service()}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def salaires(self, mois, annee, apres=None, limite=500):
+        """Page {results, next, total} des salaires des contrats actifs du mois."""
+        params = {"mois": mois, "annee": annee, "limit": limite}
+        if apres is not None:
+            params["after"] = str(apres)
+        return self._get("/api/rh/contrats/salaires/", params)
@@ -0,0 +1,44 @@
+"""
+📥 Réactions de finance_service aux événements des autres services.
+"""
+from commun.events import consommateur
+from commun.numerotation import attribuer_numeros
+from .models import ValidationDemande
+
+
+@consommateur('stock.demande_achat_creee')
+def creer_validation_achat(message):
+    """Une demande d'achat du stock arrive en validation finance."""
+    payload = message['payload']
+    if ValidationDemande.objects.filter(
+        service_origine='stock_service', demande_origine_id=message['aggregate_id']
+    ).exists():
+        return
+    ValidationDemande.objects.create(
+        type_demande='achat_stock',
+        demande_origine_id=message['aggregate_id'],
+        service_origine='stock_service',
+        montant=payload['montant_estime'],
+        description=f"Demande d'achat {payload['numero']} : {payload['justification']}",
+    )
+
+
+@consommateur('rh.charges_a_valider')
+def creer_validations_charges(message):
+    """Un lot de charges récurrentes rh (loyers, électricité) : une validation par charge, en un bulk_create."""
+    charges = message['payload']['charges']
+    existantes = {
+        str(pk) for pk in ValidationDemande.objects.filter(
+            service_origine='rh_service', demande_origine_id__in=[charge['id'] for charge in charges]
+        ).values_list('demande_origine_id', flat=True)
+    }
+    ValidationDemande.objects.bulk_create(attribuer_numeros([
+        ValidationDemande(
+            type_demande=charge['type_demande'],
+            demande_origine_id=charge['id'],
+            service_origine='rh_service',
+            montant=charge['montant'],
+            description=charge['description'],
+        )
+        for charge in charges if str(charge['id']) not in existantes
+    ], 'VAL'))
@@ -0,0 +1,32 @@
+"""
+Traitement des lancements de paie créés par POST /bulletins-paie/runs/.
+
+    python manage.py executer_paie            # traite les lancements en cours puis s'arrête
+    python manage.py executer_paie --follow   # worker permanent (docker-compose)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from finance.clients import RHClient
+from finance.paie import executer_lancements
+
+
+class Command(BaseCommand):
+    help = "Génère par pages les bulletins des lancements de paie en cours."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--lot", type=int, default=500, help="Employés par page (défaut 500).")
+        parser.add_argument("--intervalle", type=float, default=5.0,
+                            help="Attente entre deux passes en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        client = RHClient()
+        while True:
+            traites = executer_lancements(client, options["lot"])
+            if traites:
+                self.stdout.write(f"🏭 {traites} lancement(s) de paie traité(s)")
+            if not options["follow"]:
+                break
+            time.sleep(options["intervalle"])
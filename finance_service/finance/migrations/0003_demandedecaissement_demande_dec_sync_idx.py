@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_curseurconsommateur_evenementoutbox_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demandedecaissement',
+            index=models.Index(fields=['updated_at', 'id'], name='demande_dec_sync_idx'),
+        ),
+    ]
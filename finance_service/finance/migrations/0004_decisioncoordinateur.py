@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_demandedecaissement_demande_dec_sync_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DecisionCoordinateur',
+            fields=[
+                ('cle_idempotence', models.UUIDField(primary_key=True, serialize=False)),
+                ('demande_decaissement_id', models.UUIDField()),
+                ('action', models.CharField(choices=[('approuve', 'Approuvé'), ('rejete', 'Rejeté')], max_length=20)),
+                ('coordinateur_id', models.UUIDField()),
+                ('resultat', models.CharField(choices=[('appliquee', 'Appliquée'), ('erreur', 'Erreur')], max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('depense_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Décision du coordinateur',
+                'verbose_name_plural': 'Décisions du coordinateur',
+                'db_table': 'decisions_coordinateur',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:29
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_decisioncoordinateur'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LancementPaie',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mois', models.IntegerField(help_text='Mois de paie (1-12)')),
+                ('annee', models.IntegerField(help_text='Année de paie')),
+                ('statut', models.CharField(choices=[('en_cours', 'En cours'), ('termine', 'Terminé'), ('erreur', 'Erreur')], default='en_cours', max_length=20)),
+                ('responsable_finance_id', models.UUIDField(help_text='UUID du responsable finance (depuis auth_service)')),
+                ('curseur_employer_id', models.UUIDField(blank=True, null=True)),
+                ('pages_traitees', models.IntegerField(default=0)),
+                ('total_employes', models.IntegerField(blank=True, null=True)),
+                ('bulletins_crees', models.IntegerField(default=0)),
+                ('bulletins_existants', models.IntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('erreur', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('termine_le', models.DateTimeField(blank=True, null=True)),
+                ('demande_decaissement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='lancements_paie', to='finance.demandedecaissement')),
+            ],
+            options={
+                'verbose_name': 'Lancement de Paie',
+                'verbose_name_plural': 'Lancements de Paie',
+                'db_table': 'lancements_paie',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lancementpaie',
+            constraint=models.UniqueConstraint(condition=models.Q(('statut', 'en_cours')), fields=('mois', 'annee'), name='lancement_paie_unique_en_cours'),
+        ),
+        migrations.AlterField(
+            model_name='demandedecaissement',
+            name='statut',
+            field=models.CharField(choices=[('en_preparation', 'En préparation'), ('en_attente', 'En attente'), ('approuve', 'Approuvé'), ('rejete', 'Rejeté')], default='en_attente', max_length=20),
+        ),
+    ]
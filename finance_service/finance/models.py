@@ -1,9 +1,16 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
 
+from commun.models import (
+    CompteurNumeroBase, CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase,
+)
+from commun.events import publier_evenement, publier_evenements
+from commun.numerotation import attribuer_numeros, numero
+from .rapports import invalider
+
 # ============================================================
 # 📋 Types de demande de décaissement
 # ============================================================
@@ -38,10 +45,12 @@ class TypeDecaissement(models.Model):
 # ============================================================
 class DemandeDecaissement(models.Model):
     STATUT_CHOICES = [
+        ('en_preparation', 'En préparation'),
         ('en_attente', 'En attente'),
         ('approuve', 'Approuvé'),
         ('rejete', 'Rejeté'),
     ]
+    EN_PREPARATION = "Cette demande est encore en préparation (lancement de paie en cours)."
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     numero = models.CharField(max_length=100, unique=True, blank=True)
@@ -91,14 +100,21 @@ class DemandeDecaissement(models.Model):
         verbose_name = 'Demande de Décaissement'
         verbose_name_plural = 'Demandes de Décaissement'
         ordering = ['-date_demande']
+        indexes = [
+            # Curseur de synchronisation vers cordo_service (voir DemandeDecaissementViewSet.sync)
+            models.Index(fields=['updated_at', 'id'], name='demande_dec_sync_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.numero:
-            self.numero = f"DEC-{uuid.uuid4().hex[:8].upper()}"
+            self.numero = numero('DEC')
         super().save(*args, **kwargs)
+        invalider('delais_approbation', self.date_demande)
 
     def approuver(self, coordinateur_id: uuid.UUID, commentaire: str = ''):
         """Approuve la demande par le coordinateur et crée une dépense."""
+        if self.statut == 'en_preparation':
+            raise ValidationError(self.EN_PREPARATION)
         if self.statut != 'en_attente':
             raise ValidationError("Cette demande a déjà été traitée.")
         
@@ -106,13 +122,18 @@ class DemandeDecaissement(models.Model):
         self.validateur_coordinateur_id = coordinateur_id
         self.date_validation = timezone.now()
         self.commentaire_validation = commentaire
-        self.save()
-        
-        # Création automatique de la dépense
-        self._creer_depense(self.demandeur_finance_id)
+
+        with transaction.atomic():
+            self.save()
+
+            # Création automatique de la dépense (sauf paie : dépenses déjà créées par le lancement)
+            depense = None if self.depenses.exists() else self._creer_depense(self.demandeur_finance_id)
+            self._publier_decision('finance.decaissement_approuve', depense_id=depense.id if depense else None)
 
     def rejeter(self, coordinateur_id: uuid.UUID, commentaire: str = ''):
         """Rejette la demande par le coordinateur."""
+        if self.statut == 'en_preparation':
+            raise ValidationError(self.EN_PREPARATION)
         if self.statut != 'en_attente':
             raise ValidationError("Cette demande a déjà été traitée.")
         
@@ -120,20 +141,132 @@ class DemandeDecaissement(models.Model):
         self.validateur_coordinateur_id = coordinateur_id
         self.date_validation = timezone.now()
         self.commentaire_validation = commentaire
-        self.save()
+
+        with transaction.atomic():
+            self.save()
+            self._publier_decision('finance.decaissement_rejete')
+
+    @classmethod
+    def appliquer_decisions(cls, decisions):
+        """
+        Applique en une transaction un lot de décisions du coordinateur
+        ({cle, demande_id, action, coordinateur_id, commentaire}). Les dépenses
+        des approbations sont créées avec bulk_create. Une clé déjà reçue renvoie
+        le résultat enregistré (rejoue=True) sans rien réappliquer, y compris
+        quand le même lot est rejoué en parallèle. Retourne un résultat par
+        décision, dans l'ordre reçu.
+        """
+        with transaction.atomic():
+            connues = DecisionCoordinateur.objects.in_bulk([d['cle'] for d in decisions])
+            demandes = cls.objects.select_for_update().in_bulk(
+                [d['demande_id'] for d in decisions if d['cle'] not in connues]
+            )
+            # Demandes de paie : les dépenses par employé existent déjà
+            avec_depenses = set(
+                Depense.objects.filter(demande_decaissement_id__in=list(demandes))
+                .values_list('demande_decaissement_id', flat=True).distinct()
+            )
+            maintenant = timezone.now()
+            modifiees, depenses, evenements, nouvelles = [], [], [], {}
+
+            for decision in decisions:
+                if decision['cle'] in connues or decision['cle'] in nouvelles:
+                    continue
+                demande = demandes.get(decision['demande_id'])
+                depense = None
+                if demande is None:
+                    detail = "Demande de décaissement introuvable."
+                elif demande.statut == 'en_preparation':
+                    detail = cls.EN_PREPARATION
+                elif demande.statut != 'en_attente':
+                    detail = "Cette demande a déjà été traitée."
+                else:
+                    detail = ''
+                    demande.statut = decision['action']
+                    demande.validateur_coordinateur_id = decision['coordinateur_id']
+                    demande.date_validation = maintenant
+                    demande.commentaire_validation = decision.get('commentaire', '')
+                    demande.updated_at = maintenant
+                    modifiees.append(demande)
+                    if demande.statut == 'approuve':
+                        if demande.id not in avec_depenses:
+                            depense = demande.nouvelle_depense(demande.demandeur_finance_id)
+                            depenses.append(depense)
+                        evenements.append(('finance.decaissement_approuve', demande,
+                                           demande.payload_decision(depense_id=depense.id if depense else None)))
+                    else:
+                        evenements.append(('finance.decaissement_rejete', demande, demande.payload_decision()))
+
+                nouvelles[decision['cle']] = DecisionCoordinateur(
+                    cle_idempotence=decision['cle'],
+                    demande_decaissement_id=decision['demande_id'],
+                    action=decision['action'],
+                    coordinateur_id=decision['coordinateur_id'],
+                    resultat='erreur' if detail else 'appliquee',
+                    detail=detail,
+                    depense_id=depense.id if depense else None,
+                )
+
+            for demande in modifiees:
+                invalider('delais_approbation', demande.date_demande)
+            cls.objects.bulk_update(modifiees, [
+                'statut', 'validateur_coordinateur_id', 'date_validation',
+                'commentaire_validation', 'updated_at',
+            ])
+            Depense.objects.bulk_create(attribuer_numeros(depenses, 'DEP'))
+            # Un rejeu concurrent a pu enregistrer les mêmes clés entre-temps (ses
+            # demandes, verrouillées avant nous, sont alors vues comme déjà traitées) :
+            # les conflits sont ignorés et le résultat enregistré est relu
+            DecisionCoordinateur.objects.bulk_create(nouvelles.values(), ignore_conflicts=True)
+            enregistrees = DecisionCoordinateur.objects.in_bulk(list(nouvelles)) if nouvelles else {}
+            publier_evenements(evenements)
+
+        return [
+            {
+                'cle': decision['cle'],
+                'demande_id': enregistrement.demande_decaissement_id,
+                'resultat': enregistrement.resultat,
+                'detail': enregistrement.detail,
+                'depense_id': enregistrement.depense_id,
+                'rejoue': decision['cle'] in connues or enregistrement.created_at != nouvelles[decision['cle']].created_at,
+            }
+            for decision in decisions
+            for enregistrement in [connues.get(decision['cle']) or enregistrees[decision['cle']]]
+        ]
+
+    def _publier_decision(self, type_evenement, **extra):
+        publier_evenement(type_evenement, self, self.payload_decision(**extra))
+
+    def payload_decision(self, **extra):
+        """Contenu des événements finance.decaissement_approuve / _rejete."""
+        return {
+            'numero': self.numero,
+            'statut': self.statut,
+            'montant_demande': self.montant_demande,
+            'validateur_coordinateur_id': self.validateur_coordinateur_id,
+            'commentaire': self.commentaire_validation,
+            'demande_rh_id': self.demande_rh_id,
+            'demande_stock_id': self.demande_stock_id,
+            **extra,
+        }
 
     def _creer_depense(self, responsable_finance_id: uuid.UUID):
         """Crée automatiquement une dépense après validation du coordinateur."""
-        depense = Depense.objects.create(
+        depense = self.nouvelle_depense(responsable_finance_id)
+        depense.save()
+        return depense
+
+    def nouvelle_depense(self, responsable_finance_id: uuid.UUID):
+        """Dépense (non enregistrée) issue de l'approbation ; utilisable avec bulk_create."""
+        return Depense(
             demande_decaissement=self,
-            type_depense=self.type_decaissement,
+            type_depense_id=self.type_decaissement_id,
             montant=self.montant_demande,
             description=self.justification,
             responsable_finance_id=responsable_finance_id,
             demande_rh_id=self.demande_rh_id,
             demande_stock_id=self.demande_stock_id,
         )
-        return depense
 
     def __str__(self):
         return f"{self.numero} - {self.montant_demande} Ar ({self.statut})"
@@ -204,8 +337,13 @@ class Depense(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.numero:
-            self.numero = f"DEP-{uuid.uuid4().hex[:8].upper()}"
+            self.numero = numero('DEP')
         super().save(*args, **kwargs)
+        invalider('decaissements', self.date_creation)
+
+    def delete(self, *args, **kwargs):
+        invalider('decaissements', self.date_creation)
+        return super().delete(*args, **kwargs)
 
     def marquer_payee(self):
         """Marque la dépense comme payée."""
@@ -277,9 +415,13 @@ class BulletinPaie(models.Model):
         ordering = ['-annee', '-mois']
         unique_together = [['employer_id', 'mois', 'annee']]
 
+    @staticmethod
+    def periode_numero(mois, annee):
+        return f"{annee}-{mois:02d}"
+
     def save(self, *args, **kwargs):
         if not self.numero:
-            self.numero = f"BP-{self.annee}-{self.mois:02d}-{uuid.uuid4().hex[:6].upper()}"
+            self.numero = numero('BP', self.periode_numero(self.mois, self.annee))
         
         # Calcul automatique du salaire net
         self.salaire_net = self.salaire_base + self.primes - self.retenues
@@ -298,6 +440,72 @@ class BulletinPaie(models.Model):
     def __str__(self):
         return f"{self.numero} - {self.mois}/{self.annee}"
 
+# ============================================================
+# 🏭 Lancement de paie (génération des bulletins d'un mois par lots)
+# ============================================================
+class LancementPaie(models.Model):
+    STATUT_CHOICES = [
+        ('en_cours', 'En cours'),
+        ('termine', 'Terminé'),
+        ('erreur', 'Erreur'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    mois = models.IntegerField(help_text="Mois de paie (1-12)")
+    annee = models.IntegerField(help_text="Année de paie")
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_cours')
+
+    responsable_finance_id = models.UUIDField(
+        help_text="UUID du responsable finance (depuis auth_service)"
+    )
+    # Demande 'salaire' regroupant les dépenses du lancement : 'en_preparation' pendant
+    # le lancement, soumise au coordinateur (montant total) quand il se termine
+    demande_decaissement = models.ForeignKey(
+        DemandeDecaissement,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='lancements_paie'
+    )
+
+    # Reprise : dernier employer_id traité (pages rh triées par employer_id)
+    curseur_employer_id = models.UUIDField(null=True, blank=True)
+    pages_traitees = models.IntegerField(default=0)
+    total_employes = models.IntegerField(null=True, blank=True)
+    bulletins_crees = models.IntegerField(default=0)
+    bulletins_existants = models.IntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    erreur = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    termine_le = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'lancements_paie'
+        verbose_name = 'Lancement de Paie'
+        verbose_name_plural = 'Lancements de Paie'
+        ordering = ['-created_at']
+        constraints = [
+            # Un seul lancement actif par mois
+            models.UniqueConstraint(
+                fields=['mois', 'annee'],
+                condition=models.Q(statut='en_cours'),
+                name='lancement_paie_unique_en_cours',
+            ),
+        ]
+
+    @property
+    def progression(self):
+        """Pourcentage d'employés traités (None tant que le total est inconnu)."""
+        if not self.total_employes:
+            return 100.0 if self.statut == 'termine' else None
+        traites = self.bulletins_crees + self.bulletins_existants
+        return round(min(traites / self.total_employes, 1) * 100, 1)
+
+    def __str__(self):
+        return f"Paie {self.mois:02d}/{self.annee} ({self.statut})"
+
 # ============================================================
 # 🧾 Validation des Demandes RH/Stock par Finance
 # ============================================================
@@ -355,7 +563,7 @@ class ValidationDemande(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.numero:
-            self.numero = f"VAL-{uuid.uuid4().hex[:8].upper()}"
+            self.numero = numero('VAL')
         super().save(*args, **kwargs)
 
     def approuver(self, responsable_finance_id: uuid.UUID, commentaire: str = ''):
@@ -367,7 +575,10 @@ class ValidationDemande(models.Model):
         self.validateur_finance_id = responsable_finance_id
         self.date_validation = timezone.now()
         self.commentaire_validation = commentaire
-        self.save()
+
+        with transaction.atomic():
+            self.save()
+            self._publier_decision()
 
     def rejeter(self, responsable_finance_id: uuid.UUID, commentaire: str = ''):
         """Rejette la demande RH/Stock."""
@@ -378,7 +589,78 @@ class ValidationDemande(models.Model):
         self.validateur_finance_id = responsable_finance_id
         self.date_validation = timezone.now()
         self.commentaire_validation = commentaire
-        self.save()
+
+        with transaction.atomic():
+            self.save()
+            self._publier_decision()
+
+    def _publier_decision(self):
+        """Informe le service d'origine (rh/stock) de la décision finance."""
+        publier_evenement('finance.validation_traitee', self, {
+            'type_demande': self.type_demande,
+            'demande_origine_id': self.demande_origine_id,
+            'service_origine': self.service_origine,
+            'statut': self.statut,
+            'validateur_finance_id': self.validateur_finance_id,
+            'commentaire': self.commentaire_validation,
+        })
 
     def __str__(self):
         return f"{self.numero} - {self.type_demande} ({self.statut})"
+
+
+# ============================================================
+# 🗳️ Décisions du coordinateur reçues par lots (idempotence)
+# ============================================================
+class DecisionCoordinateur(models.Model):
+    """
+    Décision envoyée par cordo_service, identifiée par sa clé d'idempotence :
+    un lot rejoué renvoie le résultat enregistré au lieu de réappliquer.
+    """
+    ACTION_CHOICES = [
+        ('approuve', 'Approuvé'),
+        ('rejete', 'Rejeté'),
+    ]
+    RESULTAT_CHOICES = [
+        ('appliquee', 'Appliquée'),
+        ('erreur', 'Erreur'),
+    ]
+
+    cle_idempotence = models.UUIDField(primary_key=True)
+    demande_decaissement_id = models.UUIDField()
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    coordinateur_id = models.UUIDField()
+    resultat = models.CharField(max_length=20, choices=RESULTAT_CHOICES)
+    detail = models.TextField(blank=True)
+    depense_id = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'decisions_coordinateur'
+        verbose_name = 'Décision du coordinateur'
+        verbose_name_plural = 'Décisions du coordinateur'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.cle_idempotence} - {self.action} ({self.resultat})"
+
+
+# ============================================================
+# 🔢 Compteurs de numérotation (hors PostgreSQL, voir commun/numerotation.py)
+# ============================================================
+class CompteurNumero(CompteurNumeroBase):
+    pass
+
+# ============================================================
+# 📨 Outbox transactionnelle et bus d'événements (voir commun/events.py)
+# ============================================================
+class EvenementOutbox(EvenementOutboxBase):
+    pass
+
+
+class EvenementConsomme(EvenementConsommeBase):
+    pass
+
+
+class CurseurConsommateur(CurseurConsommateurBase):
+    pass
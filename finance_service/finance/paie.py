@@ -0,0 +1,190 @@
+"""
+🏭 Génération de la paie mensuelle par lots.
+
+Un LancementPaie tire les salaires des contrats actifs depuis rh_service par pages
+triées par employer_id. Chaque page est calculée en une passe puis écrite en une
+transaction : dépenses salaire et bulletins en bulk_create, compteurs et curseur
+du lancement mis à jour avec elles. Un lancement interrompu reprend après le
+dernier employé traité ; les bulletins déjà présents pour le mois
+(unicité employer_id, mois, annee) sont comptés et jamais recréés.
+
+L'API ne fait que créer (ou remettre en cours) le lancement ; les pages sont
+traitées par le worker `manage.py executer_paie`. La demande 'salaire' reste
+'en_preparation' pendant le lancement : ni la synchronisation cordo ni un
+coordinateur ne la voient avant qu'elle soit soumise, montant complet, à la fin.
+"""
+import uuid
+from decimal import Decimal
+
+import requests
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from commun.numerotation import attribuer_numeros
+from .models import BulletinPaie, DemandeDecaissement, Depense, LancementPaie, TypeDecaissement
+
+
+# ============================================================
+# 🧮 Calcul des montants d'une page
+# ============================================================
+def calculer_bulletins(lignes):
+    """
+    Montants de paie d'une page de salaires rh : salaire du contrat, sans prime
+    ni retenue (comme un bulletin saisi à la main ; elles s'ajustent sur le bulletin).
+    Retourne une liste de dicts {employer_id, salaire_base, primes, retenues, salaire_net}.
+    """
+    calculs = []
+    for ligne in lignes:
+        salaire_base = Decimal(str(ligne['salaire']))
+        calculs.append({
+            'employer_id': uuid.UUID(str(ligne['employer_id'])),
+            'salaire_base': salaire_base,
+            'primes': Decimal('0.00'),
+            'retenues': Decimal('0.00'),
+            'salaire_net': salaire_base,
+        })
+    return calculs
+
+
+# ============================================================
+# 🚀 Création et exécution d'un lancement
+# ============================================================
+def creer_lancement(mois, annee, responsable_finance_id):
+    """Crée le lancement du mois et sa demande 'salaire' (en préparation) ; le worker le traitera."""
+    type_salaire = TypeDecaissement.objects.filter(type_decaissement='salaire').order_by('nom').first()
+    if type_salaire is None:
+        raise ValidationError("Aucun type de décaissement 'salaire' n'est configuré.")
+    if LancementPaie.objects.filter(mois=mois, annee=annee).exclude(statut='termine').exists():
+        raise ValidationError("Un lancement de paie non terminé existe déjà pour ce mois : reprenez-le.")
+
+    with transaction.atomic():
+        demande = DemandeDecaissement.objects.create(
+            type_decaissement=type_salaire,
+            demandeur_finance_id=responsable_finance_id,
+            montant_demande=Decimal('0.00'),
+            justification=f"Paie {mois:02d}/{annee}",
+            statut='en_preparation',
+        )
+        return LancementPaie.objects.create(
+            mois=mois,
+            annee=annee,
+            responsable_finance_id=responsable_finance_id,
+            demande_decaissement=demande,
+        )
+
+
+def executer_lancements(client=None, taille_lot=500, max_pages=None):
+    """Une passe du worker : traite les lancements en cours, du plus ancien au plus récent. Retourne leur nombre."""
+    lancements = list(LancementPaie.objects.filter(statut='en_cours').order_by('created_at'))
+    for lancement in lancements:
+        executer_lancement(lancement, client, taille_lot, max_pages)
+    return len(lancements)
+
+
+def executer_lancement(lancement, client=None, taille_lot=500, max_pages=None):
+    """
+    Traite les pages restantes d'un lancement en cours (reprise depuis son curseur).
+    Une erreur rh_service passe le lancement en 'erreur' sans perdre les pages
+    déjà écrites ; `reprendre` le remet en cours.
+    """
+    if lancement.statut != 'en_cours':
+        raise ValidationError("Ce lancement de paie n'est pas en cours.")
+    if client is None:
+        from .clients import RHClient
+        client = RHClient()
+
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        curseur = lancement.curseur_employer_id
+        try:
+            page = client.salaires(lancement.mois, lancement.annee, curseur, taille_lot)
+        except requests.RequestException as e:
+            lancement.statut = 'erreur'
+            lancement.erreur = str(e)
+            lancement.save(update_fields=['statut', 'erreur', 'updated_at'])
+            return lancement
+
+        with transaction.atomic():
+            # Un autre worker a pu écrire cette page entre-temps : on repart de son curseur
+            lancement = LancementPaie.objects.select_for_update().get(pk=lancement.pk)
+            if lancement.statut != 'en_cours':
+                return lancement
+            if lancement.curseur_employer_id != curseur:
+                continue
+            _ecrire_page(lancement, page)
+            pages += 1
+            if page['next'] is None:
+                _terminer(lancement)
+                break
+    return lancement
+
+
+def _terminer(lancement):
+    """Clôt le lancement et soumet sa demande 'salaire' au coordinateur avec le montant total."""
+    demande = lancement.demande_decaissement
+    if not lancement.bulletins_crees:
+        # Rien à payer : pas de demande vide envoyée au coordinateur
+        lancement.demande_decaissement = None
+    lancement.statut = 'termine'
+    lancement.termine_le = timezone.now()
+    lancement.save(update_fields=['statut', 'termine_le', 'demande_decaissement', 'updated_at'])
+    if demande is None:
+        return
+    if lancement.demande_decaissement is None:
+        demande.delete()
+        return
+    demande.statut = 'en_attente'
+    demande.montant_demande = lancement.montant_total
+    # Délai de décision compté à partir de la soumission
+    demande.date_demande = lancement.termine_le
+    demande.save(update_fields=['statut', 'montant_demande', 'date_demande', 'updated_at'])
+
+
+def _ecrire_page(lancement, page):
+    calculs = calculer_bulletins(page['results'])
+    existants = set(
+        BulletinPaie.objects.filter(
+            mois=lancement.mois, annee=lancement.annee,
+            employer_id__in=[c['employer_id'] for c in calculs],
+        ).values_list('employer_id', flat=True)
+    )
+    a_creer = [c for c in calculs if c['employer_id'] not in existants]
+
+    demande = lancement.demande_decaissement
+    depenses, bulletins = [], []
+    for calcul in a_creer:
+        depense = Depense(
+            demande_decaissement=demande,
+            type_depense_id=demande.type_decaissement_id,
+            montant=calcul['salaire_net'],
+            description=f"Salaire {lancement.mois:02d}/{lancement.annee}",
+            employer_id=calcul['employer_id'],
+            responsable_finance_id=lancement.responsable_finance_id,
+        )
+        depenses.append(depense)
+        bulletins.append(BulletinPaie(
+            depense=depense,
+            responsable_finance_id=lancement.responsable_finance_id,
+            mois=lancement.mois,
+            annee=lancement.annee,
+            **calcul,
+        ))
+    Depense.objects.bulk_create(attribuer_numeros(depenses, 'DEP'))
+    BulletinPaie.objects.bulk_create(attribuer_numeros(
+        bulletins, 'BP', BulletinPaie.periode_numero(lancement.mois, lancement.annee)
+    ))
+
+    montant_page = sum((c['salaire_net'] for c in a_creer), Decimal('0.00'))
+    if page.get('total') is not None:
+        lancement.total_employes = page['total']
+    if page['results']:
+        lancement.curseur_employer_id = uuid.UUID(str(page['results'][-1]['employer_id']))
+    lancement.pages_traitees += 1
+    lancement.bulletins_crees += len(a_creer)
+    lancement.bulletins_existants += len(existants)
+    lancement.montant_total += montant_page
+    lancement.save(update_fields=[
+        'total_employes', 'curseur_employer_id', 'pages_traitees', 'bulletins_crees',
+        'bulletins_existants', 'montant_total', 'updated_at',
+    ])
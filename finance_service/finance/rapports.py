@@ -0,0 +1,278 @@
+"""
+📊 Rapports finance calculés en SQL groupé (date_trunc via Trunc).
+
+Chaque rapport périodique est découpé en périodes (jour, semaine, mois, année).
+Les périodes clôturées sont mises en cache, une entrée par période ; seules les
+périodes absentes du cache et la période en cours sont recalculées, en une
+requête. Une modification qui touche une période clôturée (dépense payée ou
+annulée, décision sur une demande) supprime l'entrée correspondante au commit.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+GRANULARITES = {
+    'jour': 'day',
+    'semaine': 'week',
+    'mois': 'month',
+    'annee': 'year',
+}
+CACHE_TIMEOUT = 7 * 24 * 3600
+CACHE_PREFIXE = 'finance:rapport'
+
+# Bornes (exclues) des tranches de délai d'approbation
+TRANCHES_DELAI = [
+    ('moins_1h', timedelta(hours=1)),
+    ('moins_24h', timedelta(days=1)),
+    ('moins_3j', timedelta(days=3)),
+    ('moins_7j', timedelta(days=7)),
+]
+TRANCHES_ANCIENNETE = [
+    ('moins_7j', timedelta(days=7)),
+    ('moins_30j', timedelta(days=30)),
+]
+
+
+# ============================================================
+# 🗓️ Périodes
+# ============================================================
+def debut_periode(granularite, jour):
+    if granularite == 'jour':
+        return jour
+    if granularite == 'semaine':
+        return jour - timedelta(days=jour.weekday())
+    if granularite == 'mois':
+        return jour.replace(day=1)
+    return jour.replace(month=1, day=1)
+
+
+def periode_suivante(granularite, debut):
+    if granularite == 'jour':
+        return debut + timedelta(days=1)
+    if granularite == 'semaine':
+        return debut + timedelta(days=7)
+    if granularite == 'mois':
+        return date(debut.year + debut.month // 12, debut.month % 12 + 1, 1)
+    return date(debut.year + 1, 1, 1)
+
+
+def periodes(granularite, debut, fin):
+    """Débuts des périodes couvrant [debut, fin]."""
+    courante, resultat = debut_periode(granularite, debut), []
+    while courante <= fin:
+        resultat.append(courante)
+        courante = periode_suivante(granularite, courante)
+    return resultat
+
+
+def _instant(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def _cle(rapport, granularite, debut):
+    return f"{CACHE_PREFIXE}:{rapport}:{granularite}:{debut.isoformat()}"
+
+
+def _rapport_periodique(rapport, granularite, debut, fin, calculer):
+    """
+    Assemble un rapport période par période. `calculer(debut, fin_exclue)` retourne
+    {début de période: données} pour les périodes ayant des lignes.
+    """
+    aujourd_hui = timezone.localdate()
+    debuts = periodes(granularite, debut, fin)
+    cloturees = {d for d in debuts if periode_suivante(granularite, d) <= aujourd_hui}
+
+    en_cache = cache.get_many([_cle(rapport, granularite, d) for d in cloturees])
+    donnees = {d: en_cache[_cle(rapport, granularite, d)] for d in cloturees if _cle(rapport, granularite, d) in en_cache}
+    manquantes = [d for d in debuts if d not in donnees]
+
+    if manquantes:
+        calculees = calculer(manquantes[0], periode_suivante(granularite, manquantes[-1]))
+        for d in manquantes:
+            donnees[d] = calculees.get(d)
+        cache.set_many(
+            {_cle(rapport, granularite, d): donnees[d] for d in manquantes if d in cloturees},
+            CACHE_TIMEOUT,
+        )
+
+    return [
+        {'periode': d, 'cloturee': d in cloturees, **(donnees[d] or {})}
+        for d in debuts
+    ]
+
+
+def invalider(rapport, instant):
+    """Supprime au commit les entrées de cache des périodes clôturées contenant `instant`."""
+    if instant is None:
+        return
+    jour = timezone.localtime(instant).date() if isinstance(instant, datetime) else instant
+    aujourd_hui = timezone.localdate()
+    cles = [
+        _cle(rapport, granularite, debut_periode(granularite, jour))
+        for granularite in GRANULARITES
+        if periode_suivante(granularite, debut_periode(granularite, jour)) <= aujourd_hui
+    ]
+    if cles:
+        transaction.on_commit(lambda: cache.delete_many(cles))
+
+
+# ============================================================
+# 💸 Décaissements par période, statut et type
+# ============================================================
+def rapport_decaissements(granularite, debut, fin, statut=None, type_depense_id=None):
+    from .models import Depense
+
+    def calculer(debut_calcul, fin_calcul):
+        lignes = (
+            Depense.objects.filter(
+                date_creation__gte=_instant(debut_calcul), date_creation__lt=_instant(fin_calcul)
+            )
+            .annotate(periode=Trunc('date_creation', GRANULARITES[granularite]))
+            .values('periode', 'statut', 'type_depense_id', 'type_depense__nom')
+            .annotate(montant=Sum('montant'), nombre=Count('id'))
+            .order_by('periode', 'statut', 'type_depense__nom')
+        )
+        resultat = {}
+        for ligne in lignes:
+            jour = ligne['periode'].date() if isinstance(ligne['periode'], datetime) else ligne['periode']
+            resultat.setdefault(jour, {'lignes': []})['lignes'].append({
+                'statut': ligne['statut'],
+                'type_depense_id': str(ligne['type_depense_id']),
+                'type_depense': ligne['type_depense__nom'],
+                'montant': _texte(ligne['montant']),
+                'nombre': ligne['nombre'],
+            })
+        return resultat
+
+    resultat = []
+    for periode in _rapport_periodique('decaissements', granularite, debut, fin, calculer):
+        lignes = [
+            ligne for ligne in periode.get('lignes', [])
+            if (statut is None or ligne['statut'] == statut)
+            and (type_depense_id is None or ligne['type_depense_id'] == str(type_depense_id))
+        ]
+        resultat.append({
+            'periode': periode['periode'],
+            'cloturee': periode['cloturee'],
+            'lignes': lignes,
+            'montant_total': _texte(sum((Decimal(ligne['montant']) for ligne in lignes), Decimal('0.00'))),
+            'nombre_total': sum(ligne['nombre'] for ligne in lignes),
+        })
+    return resultat
+
+
+# ============================================================
+# ⏱️ Délais d'approbation des demandes (par période de dépôt)
+# ============================================================
+def rapport_delais_approbation(granularite, debut, fin):
+    from .models import DemandeDecaissement
+
+    def calculer(debut_calcul, fin_calcul):
+        traitees = Q(date_validation__isnull=False)
+        tranches = {}
+        precedente = None
+        for nom, borne in TRANCHES_DELAI:
+            filtre = traitees & Q(delai__lt=borne)
+            if precedente is not None:
+                filtre &= Q(delai__gte=precedente)
+            tranches[nom] = Count('id', filter=filtre)
+            precedente = borne
+        tranches['plus_7j'] = Count('id', filter=traitees & Q(delai__gte=precedente))
+
+        lignes = (
+            DemandeDecaissement.objects.filter(
+                date_demande__gte=_instant(debut_calcul), date_demande__lt=_instant(fin_calcul)
+            )
+            .annotate(
+                periode=Trunc('date_demande', GRANULARITES[granularite]),
+                delai=ExpressionWrapper(F('date_validation') - F('date_demande'), output_field=DurationField()),
+            )
+            .values('periode')
+            .annotate(
+                nombre=Count('id'),
+                en_attente=Count('id', filter=Q(statut='en_attente')),
+                approuvees=Count('id', filter=Q(statut='approuve')),
+                rejetees=Count('id', filter=Q(statut='rejete')),
+                delai_moyen=Avg('delai', filter=traitees),
+                delai_max=Max('delai', filter=traitees),
+                **tranches,
+            )
+            .order_by('periode')
+        )
+        resultat = {}
+        for ligne in lignes:
+            periode = ligne.pop('periode')
+            jour = periode.date() if isinstance(periode, datetime) else periode
+            for champ in ('delai_moyen', 'delai_max'):
+                ligne[f"{champ}_heures"] = _heures(ligne.pop(champ))
+            ligne['repartition'] = {nom: ligne.pop(nom) for nom in [*dict(TRANCHES_DELAI), 'plus_7j']}
+            resultat[jour] = ligne
+        return resultat
+
+    return _rapport_periodique('delais_approbation', granularite, debut, fin, calculer)
+
+
+def _texte(montant):
+    """Montant en texte à 2 décimales (SQLite peut renvoyer un entier pour Sum)."""
+    return f"{Decimal(montant or 0):.2f}"
+
+
+def _heures(duree):
+    return None if duree is None else round(duree.total_seconds() / 3600, 2)
+
+
+# ============================================================
+# ⚠️ Exposition en attente (état courant, non mis en cache)
+# ============================================================
+def rapport_exposition():
+    from .models import DemandeDecaissement, Depense
+
+    maintenant = timezone.now()
+    anciennete = {}
+    precedente = None
+    for nom, borne in TRANCHES_ANCIENNETE:
+        filtre = Q(date_demande__gt=maintenant - borne)
+        if precedente is not None:
+            filtre &= Q(date_demande__lte=maintenant - precedente)
+        anciennete[nom] = Sum('montant_demande', filter=filtre)
+        precedente = borne
+    anciennete['plus_30j'] = Sum('montant_demande', filter=Q(date_demande__lte=maintenant - precedente))
+
+    demandes = (
+        DemandeDecaissement.objects.filter(statut='en_attente')
+        .values('type_decaissement__type_decaissement')
+        .annotate(montant=Sum('montant_demande'), nombre=Count('id'), **anciennete)
+        .order_by('type_decaissement__type_decaissement')
+    )
+    depenses = (
+        Depense.objects.filter(statut='en_attente')
+        .values('type_depense__type_decaissement')
+        .annotate(montant=Sum('montant'), nombre=Count('id'))
+        .order_by('type_depense__type_decaissement')
+    )
+
+    return {
+        'demandes_en_attente': [
+            {
+                'type_decaissement': ligne['type_decaissement__type_decaissement'],
+                'montant': _texte(ligne['montant']),
+                'nombre': ligne['nombre'],
+                'anciennete': {nom: _texte(ligne[nom]) for nom in [*dict(TRANCHES_ANCIENNETE), 'plus_30j']},
+            }
+            for ligne in demandes
+        ],
+        'depenses_a_payer': [
+            {
+                'type_decaissement': ligne['type_depense__type_decaissement'],
+                'montant': _texte(ligne['montant']),
+                'nombre': ligne['nombre'],
+            }
+            for ligne in depenses
+        ],
+        'calcule_le': maintenant,
+    }
@@ -4,7 +4,9 @@ from .models import (
     DemandeDecaissement,
     Depense,
     BulletinPaie,
-    ValidationDemande
+    ValidationDemande,
+    DecisionCoordinateur,
+    LancementPaie
 )
 
 
@@ -96,6 +98,108 @@ class BulletinPaieSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'numero', 'salaire_net', 'date_generation', 'date_validation', 'created_at', 'updated_at']
 
 
+# =========================
+# Serializers compacts (mode ?mode=compact : références en IDs, objets dans "included")
+# =========================
+class DemandeDecaissementCompactSerializer(serializers.ModelSerializer):
+    type_decaissement_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = DemandeDecaissement
+        fields = [
+            'id', 'numero', 'type_decaissement_id',
+            'demandeur_finance_id', 'validateur_coordinateur_id',
+            'montant_demande', 'justification', 'statut',
+            'date_demande', 'date_validation', 'commentaire_validation',
+            'demande_rh_id', 'demande_stock_id',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class DepenseCompactSerializer(serializers.ModelSerializer):
+    type_depense_id = serializers.UUIDField(read_only=True)
+    demande_decaissement_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = Depense
+        fields = [
+            'id', 'numero', 'demande_decaissement_id', 'type_depense_id',
+            'montant', 'description', 'statut',
+            'employer_id', 'demande_rh_id', 'demande_stock_id',
+            'date_creation', 'date_paiement', 'responsable_finance_id',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class BulletinPaieCompactSerializer(serializers.ModelSerializer):
+    depense_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = BulletinPaie
+        fields = [
+            'id', 'numero', 'employer_id', 'depense_id',
+            'mois', 'annee', 'salaire_base', 'primes', 'retenues', 'salaire_net',
+            'statut', 'date_generation', 'date_validation',
+            'responsable_finance_id', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+def references_incluses(depenses):
+    """
+    Objets référencés par une liste de dépenses (relations déjà chargées par
+    select_related), chacun émis une seule fois : {"types_decaissement": {id: …},
+    "demandes_decaissement": {id: …}}.
+    """
+    types, demandes = {}, {}
+    for depense in depenses:
+        demande = depense.demande_decaissement
+        for type_decaissement in (depense.type_depense, demande.type_decaissement):
+            if type_decaissement.pk not in types:
+                types[type_decaissement.pk] = type_decaissement
+        if demande.pk not in demandes:
+            demandes[demande.pk] = demande
+    return {
+        'types_decaissement': {
+            str(pk): donnees for pk, donnees in zip(types, TypeDecaissementSerializer(types.values(), many=True).data)
+        },
+        'demandes_decaissement': {
+            str(pk): donnees
+            for pk, donnees in zip(demandes, DemandeDecaissementCompactSerializer(demandes.values(), many=True).data)
+        },
+    }
+
+
+# =========================
+# Serializer LancementPaie
+# =========================
+class LancementPaieSerializer(serializers.ModelSerializer):
+    progression = serializers.FloatField(read_only=True)
+    responsable_finance_id = serializers.UUIDField(required=False)
+
+    class Meta:
+        model = LancementPaie
+        fields = [
+            'id', 'mois', 'annee', 'statut', 'responsable_finance_id',
+            'demande_decaissement', 'curseur_employer_id', 'pages_traitees',
+            'total_employes', 'bulletins_crees', 'bulletins_existants',
+            'montant_total', 'progression', 'erreur',
+            'created_at', 'updated_at', 'termine_le'
+        ]
+        read_only_fields = [
+            'id', 'statut', 'demande_decaissement', 'curseur_employer_id', 'pages_traitees',
+            'total_employes', 'bulletins_crees', 'bulletins_existants',
+            'montant_total', 'erreur', 'created_at', 'updated_at', 'termine_le'
+        ]
+
+    def validate_mois(self, value):
+        if not 1 <= value <= 12:
+            raise serializers.ValidationError("Le mois doit être compris entre 1 et 12.")
+        return value
+
+
 # =========================
 # Serializer ValidationDemande
 # =========================
@@ -109,3 +213,14 @@ class ValidationDemandeSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'numero', 'date_reception', 'date_validation', 'created_at', 'updated_at']
+
+
+# =========================
+# Serializer des décisions du coordinateur (lot envoyé par cordo_service)
+# =========================
+class DecisionCoordinateurSerializer(serializers.Serializer):
+    cle = serializers.UUIDField(help_text="Clé d'idempotence de la décision")
+    demande_id = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=DecisionCoordinateur.ACTION_CHOICES)
+    coordinateur_id = serializers.UUIDField()
+    commentaire = serializers.CharField(required=False, allow_blank=True, default='')
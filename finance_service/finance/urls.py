@@ -5,7 +5,9 @@ from .views import (
     DemandeDecaissementViewSet,
     DepenseViewSet,
     BulletinPaieViewSet,
-    ValidationDemandeViewSet
+    ValidationDemandeViewSet,
+    LancementPaieViewSet,
+    RapportViewSet
 )
 
 # Création du router
@@ -13,7 +15,9 @@ router = DefaultRouter()
 router.register(r'types-decaissement', TypeDecaissementViewSet, basename='type-decaissement')
 router.register(r'demandes-decaissement', DemandeDecaissementViewSet, basename='demande-decaissement')
 router.register(r'depenses', DepenseViewSet, basename='depense')
+router.register(r'bulletins-paie/runs', LancementPaieViewSet, basename='lancement-paie')
 router.register(r'bulletins-paie', BulletinPaieViewSet, basename='bulletin-paie')
+router.register(r'reports', RapportViewSet, basename='rapport')
 router.register(r'validations-demandes', ValidationDemandeViewSet, basename='validation-demande')
 
 # Inclusion des routes dans l'URLconf
@@ -1,4 +1,11 @@
-from rest_framework import viewsets, status
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.core.exceptions import ValidationError
+from rest_framework import mixins, viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -8,14 +15,24 @@ from .models import (
     DemandeDecaissement,
     Depense,
     BulletinPaie,
-    ValidationDemande
+    ValidationDemande,
+    LancementPaie
 )
 from .serializers import (
     TypeDecaissementSerializer,
     DemandeDecaissementSerializer,
     DepenseSerializer,
     BulletinPaieSerializer,
-    ValidationDemandeSerializer
+    ValidationDemandeSerializer,
+    DecisionCoordinateurSerializer,
+    LancementPaieSerializer,
+    DepenseCompactSerializer,
+    BulletinPaieCompactSerializer,
+    references_incluses
+)
+from .paie import creer_lancement
+from .rapports import (
+    GRANULARITES, periodes, rapport_decaissements, rapport_delais_approbation, rapport_exposition
 )
 
 
@@ -36,6 +53,10 @@ class DemandeDecaissementViewSet(viewsets.ModelViewSet):
     serializer_class = DemandeDecaissementSerializer
     permission_classes = [IsAuthenticated]
 
+    # Délai avant qu'une modification soit exportée vers cordo_service (voir sync)
+    SYNC_MARGE_SECONDES = 5
+    DECISIONS_MAX_PAR_LOT = 1000
+
     @action(detail=True, methods=['post'])
     def approuver(self, request, pk=None):
         demande = self.get_object()
@@ -61,14 +82,89 @@ class DemandeDecaissementViewSet(viewsets.ModelViewSet):
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+    @action(detail=False, methods=['post'])
+    def decisions(self, request):
+        """
+        Applique un lot de décisions du coordinateur envoyé par cordo_service, en une
+        transaction. Corps : {"decisions": [{cle, demande_id, action, coordinateur_id, commentaire}]}.
+        Réservé au jeton de service de cordo (role 'service') : lui seul atteste le coordinateur_id.
+        """
+        if getattr(request.user, 'role', None) != 'service':
+            return Response({'detail': 'Réservé à cordo_service.'}, status=status.HTTP_403_FORBIDDEN)
+        decisions = request.data.get('decisions')
+        if not isinstance(decisions, list) or not decisions:
+            return Response({'detail': 'decisions doit être une liste non vide.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(decisions) > self.DECISIONS_MAX_PAR_LOT:
+            return Response(
+                {'detail': f'Au plus {self.DECISIONS_MAX_PAR_LOT} décisions par lot.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = DecisionCoordinateurSerializer(data=decisions, many=True)
+        serializer.is_valid(raise_exception=True)
+        resultats = DemandeDecaissement.appliquer_decisions(serializer.validated_data)
+        return Response({'resultats': resultats})
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Export incrémental pour cordo_service : demandes modifiées après le curseur
+        (`since`, `after_id`), triées par (updated_at, id). Les modifications des
+        dernières secondes sont différées pour ne pas dépasser une transaction
+        encore en cours.
+        """
+        try:
+            limite = min(int(request.query_params.get('limit', 500)), 5000)
+        except ValueError:
+            return Response({'detail': 'limit invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = DemandeDecaissement.objects.filter(
+            updated_at__lte=timezone.now() - timedelta(seconds=self.SYNC_MARGE_SECONDES)
+        )
+        since = request.query_params.get('since')
+        if since:
+            depuis = parse_datetime(since)
+            if depuis is None:
+                return Response({'detail': 'since invalide.'}, status=status.HTTP_400_BAD_REQUEST)
+            after_id = request.query_params.get('after_id')
+            curseur = Q(updated_at__gt=depuis)
+            if after_id:
+                curseur |= Q(updated_at=depuis, id__gt=after_id)
+            queryset = queryset.filter(curseur)
+
+        demandes = list(
+            queryset.order_by('updated_at', 'id')
+            .annotate(code_type=F('type_decaissement__type_decaissement'))
+            .values(
+                'id', 'numero', 'code_type', 'montant_demande', 'justification',
+                'demandeur_finance_id', 'statut', 'date_demande', 'updated_at',
+            )[:limite]
+        )
+        for demande in demandes:
+            # Montant transmis en chaîne : pas d'arrondi flottant dans le JSON
+            demande['montant_demande'] = str(demande['montant_demande'])
+        return Response({'results': demandes, 'count': len(demandes)})
+
+
 # =======================================
 # ViewSet Depense
 # =======================================
 class DepenseViewSet(viewsets.ModelViewSet):
-    queryset = Depense.objects.all().order_by('-date_creation')
+    queryset = Depense.objects.select_related(
+        'type_depense', 'demande_decaissement__type_decaissement'
+    ).order_by('-date_creation')
     serializer_class = DepenseSerializer
     permission_classes = [IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        """`?mode=compact` : lignes à plat (IDs) et références émises une fois dans `included`."""
+        if request.query_params.get('mode') != 'compact':
+            return super().list(request, *args, **kwargs)
+        depenses = list(self.filter_queryset(self.get_queryset()))
+        return Response({
+            'results': DepenseCompactSerializer(depenses, many=True).data,
+            'included': references_incluses(depenses),
+        })
+
     @action(detail=True, methods=['post'])
     def marquer_payee(self, request, pk=None):
         depense = self.get_object()
@@ -94,10 +190,29 @@ class DepenseViewSet(viewsets.ModelViewSet):
 # ViewSet BulletinPaie
 # =======================================
 class BulletinPaieViewSet(viewsets.ModelViewSet):
-    queryset = BulletinPaie.objects.all().order_by('-annee', '-mois')
+    queryset = BulletinPaie.objects.select_related(
+        'depense__type_depense', 'depense__demande_decaissement__type_decaissement'
+    ).order_by('-annee', '-mois')
     serializer_class = BulletinPaieSerializer
     permission_classes = [IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        """`?mode=compact` : bulletins à plat, dépenses et références dans `included`."""
+        if request.query_params.get('mode') != 'compact':
+            return super().list(request, *args, **kwargs)
+        bulletins = list(self.filter_queryset(self.get_queryset()))
+        depenses = list({bulletin.depense_id: bulletin.depense for bulletin in bulletins}.values())
+        return Response({
+            'results': BulletinPaieCompactSerializer(bulletins, many=True).data,
+            'included': {
+                'depenses': {
+                    str(depense.pk): donnees
+                    for depense, donnees in zip(depenses, DepenseCompactSerializer(depenses, many=True).data)
+                },
+                **references_incluses(depenses),
+            },
+        })
+
     @action(detail=True, methods=['post'])
     def valider(self, request, pk=None):
         bulletin = self.get_object()
@@ -109,6 +224,50 @@ class BulletinPaieViewSet(viewsets.ModelViewSet):
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+# =======================================
+# ViewSet LancementPaie (/bulletins-paie/runs/)
+# =======================================
+class LancementPaieViewSet(mixins.CreateModelMixin,
+                           mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    queryset = LancementPaie.objects.all().order_by('-created_at')
+    serializer_class = LancementPaieSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        """
+        Lance la paie d'un mois : {mois, annee, responsable_finance_id?}. Les pages
+        sont traitées par le worker executer_paie ; suivre l'avancement sur runs/{id}/.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        donnees = serializer.validated_data
+        try:
+            lancement = creer_lancement(
+                donnees['mois'], donnees['annee'],
+                donnees.get('responsable_finance_id') or request.user.id,
+            )
+        except ValidationError as e:
+            return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(lancement).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def reprendre(self, request, pk=None):
+        """Reprend un lancement interrompu après le dernier employé traité."""
+        lancement = self.get_object()
+        if lancement.statut == 'termine':
+            return Response({'detail': 'Ce lancement de paie est déjà terminé.'}, status=status.HTTP_400_BAD_REQUEST)
+        lancement.statut = 'en_cours'
+        lancement.erreur = ''
+        try:
+            lancement.save(update_fields=['statut', 'erreur', 'updated_at'])
+        except IntegrityError:
+            return Response({'detail': 'Un autre lancement est en cours pour ce mois.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(lancement).data, status=status.HTTP_202_ACCEPTED)
+
+
 # =======================================
 # ViewSet ValidationDemande
 # =======================================
@@ -140,3 +299,57 @@ class ValidationDemandeViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         except Exception as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# =======================================
+# ViewSet Rapports (/reports/)
+# =======================================
+class RapportViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    PERIODES_MAX = 400
+
+    def _parametres_periode(self, request):
+        """granularite (jour|semaine|mois|annee), debut, fin (AAAA-MM-JJ) ; 12 derniers mois par défaut."""
+        granularite = request.query_params.get('granularite', 'mois')
+        if granularite not in GRANULARITES:
+            raise ValueError(f"granularite doit valoir {', '.join(GRANULARITES)}.")
+        try:
+            fin = parse_date(request.query_params['fin']) if 'fin' in request.query_params else timezone.localdate()
+            debut = parse_date(request.query_params['debut']) if 'debut' in request.query_params else fin - timedelta(days=365)
+        except ValueError:
+            debut = fin = None
+        if debut is None or fin is None or debut > fin:
+            raise ValueError("debut et fin doivent être des dates AAAA-MM-JJ avec debut <= fin.")
+        if len(periodes(granularite, debut, fin)) > self.PERIODES_MAX:
+            raise ValueError(f"Au plus {self.PERIODES_MAX} périodes par rapport.")
+        return granularite, debut, fin
+
+    @action(detail=False, methods=['get'])
+    def decaissements(self, request):
+        """Dépenses par période de création, statut et type (`?statut=&type_depense=`)."""
+        try:
+            granularite, debut, fin = self._parametres_periode(request)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        resultats = rapport_decaissements(
+            granularite, debut, fin,
+            statut=request.query_params.get('statut'),
+            type_depense_id=request.query_params.get('type_depense'),
+        )
+        return Response({'granularite': granularite, 'debut': debut, 'fin': fin, 'periodes': resultats})
+
+    @action(detail=False, methods=['get'], url_path='delais-approbation')
+    def delais_approbation(self, request):
+        """Répartition des délais de décision du coordinateur, par période de dépôt des demandes."""
+        try:
+            granularite, debut, fin = self._parametres_periode(request)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        resultats = rapport_delais_approbation(granularite, debut, fin)
+        return Response({'granularite': granularite, 'debut': debut, 'fin': fin, 'periodes': resultats})
+
+    @action(detail=False, methods=['get'])
+    def exposition(self, request):
+        """Montants en attente : demandes non décidées (par ancienneté) et dépenses à payer."""
+        return Response(rapport_exposition())
@@ -2,9 +2,15 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Paquet commun aux services (commun/) : copié dans /app par le Dockerfile,
+# à la racine du dépôt en développement
+if not (BASE_DIR / "commun").is_dir():
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = config("SECRET_KEY", default="finance_service_secret_key_123")
 DEBUG = config("DEBUG", default=True, cast=bool)
 
@@ -12,6 +18,7 @@ ALLOWED_HOSTS = config("DJANGO_ALLOWED_HOSTS", default="localhost").split(",")
 
 INSTALLED_APPS = [
     "finance",
+    "commun",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -70,6 +77,38 @@ DATABASES = {
     }
 }
 
+# Bus d'événements inter-services (outbox + relais, voir commun/events.py).
+# Base partagée par tous les services ; par défaut sur le même serveur que DB_HOST,
+# créée si besoin au démarrage (manage.py preparer_bus, entrypoint.sh).
+DATABASES["event_bus"] = {
+    "ENGINE": "django.db.backends.postgresql",
+    "NAME": config("EVENT_BUS_DB_NAME", default="event_bus_db"),
+    "USER": config("EVENT_BUS_DB_USER", default=DATABASES["default"]["USER"]),
+    "PASSWORD": config("EVENT_BUS_DB_PASSWORD", default=DATABASES["default"]["PASSWORD"]),
+    "HOST": config("EVENT_BUS_DB_HOST", default=DATABASES["default"]["HOST"]),
+    "PORT": config("EVENT_BUS_DB_PORT", default=DATABASES["default"]["PORT"]),
+}
+EVENT_BUS_DATABASE = "event_bus"
+EVENT_BROKER = config("EVENT_BROKER", default="commun.events.TableQueueBroker")
+EVENT_SERVICE = "finance_service"
+
+# Numérotation des documents (voir commun/numerotation.py) : préfixe → modèle numéroté
+NUMEROTATION = {
+    'DEC': 'finance.DemandeDecaissement',
+    'DEP': 'finance.Depense',
+    'BP': 'finance.BulletinPaie',
+    'VAL': 'finance.ValidationDemande',
+}
+
+# Cache partagé par tous les workers (rapports des périodes clôturées, voir finance/rapports.py).
+# Table créée par `manage.py createcachetable` au démarrage du conteneur.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": config("CACHE_LOCATION", default="finance_cache"),
+    }
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "finance.authentication.KongJWTAuthentication",
@@ -0,0 +1,77 @@
+"""
+⏳ Fin des affectations temporaires échues.
+
+Les affectations temporaires actives dont la date_fin est passée sont prises par
+lots, dans l'ordre de l'index (type_affectation, status_affectation, date_fin),
+et verrouillées en SKIP LOCKED : deux passes concurrentes se partagent le
+travail sans se bloquer. Pour chaque lot, l'ancien district et l'ancienne
+fonction sont rendus aux employés en un seul UPDATE … FROM, puis les
+affectations sont clôturées en un UPDATE ; l'outbox reçoit les événements
+rh.employe_modifie en un bulk_create.
+
+Une affectation clôturée sort du périmètre de l'index : chaque passe ne traite
+que les affectations échues depuis la précédente.
+"""
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Affectation, Employer
+
+
+def _affectations_echues(aujourd_hui):
+    return Affectation.objects.filter(
+        type_affectation='temporaire', status_affectation='active', date_fin__lte=aujourd_hui
+    )
+
+
+def _restaurer_postes(ids, maintenant):
+    """Rend aux employés leur poste d'avant l'affectation (un seul UPDATE)."""
+    employes, affectations = Employer._meta.db_table, Affectation._meta.db_table
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {employes} AS e "
+                f"SET district_id = a.ancien_district_id, fonction_id = a.ancienne_fonction_id, updated_at = %s "
+                f"FROM {affectations} AS a "
+                f"WHERE a.employer_id = e.id AND a.id = ANY(%s::uuid[])",
+                [maintenant, [str(pk) for pk in ids]],
+            )
+        return
+    # Autres bases (SQLite des benchmarks) : sous-requêtes corrélées, toujours une requête
+    affectation = Affectation.objects.filter(pk__in=ids, employer=OuterRef('pk'))
+    Employer.objects.filter(affectations__pk__in=ids).update(
+        district_id=Subquery(affectation.values('ancien_district_id')[:1]),
+        fonction_id=Subquery(affectation.values('ancienne_fonction_id')[:1]),
+        updated_at=maintenant,
+    )
+
+
+def expirer_lot(aujourd_hui=None, taille_lot=1000):
+    """Clôture un lot d'affectations échues ; retourne le nombre clôturé."""
+    aujourd_hui = aujourd_hui or timezone.localdate()
+    maintenant = timezone.now()
+    with transaction.atomic():
+        lot = list(
+            _affectations_echues(aujourd_hui)
+            .order_by('date_fin')
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'employer_id')[:taille_lot]
+        )
+        if not lot:
+            return 0
+        ids = [pk for pk, _ in lot]
+        _restaurer_postes(ids, maintenant)
+        Affectation.objects.filter(pk__in=ids).update(status_affectation='terminee', updated_at=maintenant)
+        Employer.publier_modifications({employer_id for _, employer_id in lot})
+    return len(lot)
+
+
+def expirer_affectations(aujourd_hui=None, taille_lot=1000):
+    """Clôture toutes les affectations temporaires échues ; retourne leur nombre."""
+    total = 0
+    while True:
+        traitees = expirer_lot(aujourd_hui, taille_lot)
+        total += traitees
+        if traitees < taille_lot:
+            return total
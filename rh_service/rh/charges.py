@@ -0,0 +1,153 @@
+"""
+🔁 Charges récurrentes : loyers et électricité, chaque mois.
+
+Location.date_echeance est la première échéance du loyer ; les suivantes
+tombent le même jour des mois suivants (fin de mois si le jour n'existe pas).
+Les compteurs d'électricité suivent l'échéance de leur location.
+
+Une passe du planificateur (planifier_charges) :
+
+1. matérialise en Charge toutes les échéances de l'horizon (du début du mois
+   courant à aujourd'hui + horizon) : deux requêtes jointes sur les locations
+   et compteurs échus avant la fin de l'horizon (index location_echeance_idx),
+   les références déjà présentes relues sur la plage (index charge_echeance_idx),
+   un bulk_create pour les nouvelles ;
+2. transmet à finance les charges non encore envoyées dans un seul LotCharges :
+   un événement rh.charges_a_valider, une ValidationDemande par charge côté
+   finance.
+
+Référence LOY-/ELE-AAAAMMJJ-<id> unique, reprise par le paiement qui règle la
+charge (Payement.charge, voir paiements.py) : relancer une passe sur une
+période déjà traitée ne crée ni charge ni envoi.
+"""
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from commun.events import publier_evenement
+from .models import Charge, Electricite, Location, LotCharges, Payement
+from .paiements import reference_echeance
+
+HORIZON_JOURS = 31
+PREFIXES = {'location': 'LOY', 'electricite': 'ELE'}
+
+
+def ajouter_mois(jour, mois, ancrage=None):
+    """`jour` + `mois` mois, au jour `ancrage` (par défaut celui de `jour`) borné à la fin du mois."""
+    annee, mois = divmod(jour.month - 1 + mois, 12)
+    annee, mois = jour.year + annee, mois + 1
+    return date(annee, mois, min(ancrage or jour.day, calendar.monthrange(annee, mois)[1]))
+
+
+def echeances(premiere, debut, fin):
+    """Échéances mensuelles à partir de `premiere` comprises entre `debut` et `fin`."""
+    rang = max(0, (debut.year - premiere.year) * 12 + debut.month - premiere.month - 1)
+    jour = ajouter_mois(premiere, rang)
+    while jour <= fin:
+        if jour >= debut:
+            yield jour
+        rang += 1
+        jour = ajouter_mois(premiere, rang)
+
+
+def _sources(fin):
+    """(type, objet_id, montant, première échéance) des loyers et compteurs échus avant `fin`."""
+    for pk, montant, premiere in (
+        Location.objects.filter(date_echeance__lte=fin, montant__gt=0).values_list('id', 'montant', 'date_echeance')
+    ):
+        yield 'location', pk, montant, premiere
+    for pk, montant, premiere in (
+        Electricite.objects.filter(location__date_echeance__lte=fin, montant__gt=0)
+        .values_list('id', 'montant', 'location__date_echeance')
+    ):
+        yield 'electricite', pk, montant, premiere
+
+
+def charges_dues(debut, fin):
+    """Charges (non enregistrées) de toutes les échéances entre `debut` et `fin`."""
+    return [
+        Charge(
+            reference=reference_echeance(PREFIXES[type_charge], jour, pk), type_charge=type_charge,
+            **{f'{type_charge}_id': pk}, echeance=jour, montant=montant,
+        )
+        for type_charge, pk, montant, premiere in _sources(fin)
+        for jour in echeances(premiere, debut, fin)
+    ]
+
+
+def enregistrer_charges(nouvelles):
+    """
+    Crée les charges `nouvelles` et leur rattache les paiements de même
+    référence générés avant elles.
+    """
+    # ignore_conflicts : deux planificateurs concurrents ne doublent aucune charge
+    Charge.objects.bulk_create(nouvelles, batch_size=500, ignore_conflicts=True)
+    if nouvelles:
+        Payement.objects.filter(
+            reference__in=[charge.reference for charge in nouvelles], charge__isnull=True
+        ).update(charge_id=Subquery(Charge.objects.filter(reference=OuterRef('reference')).values('pk')[:1]))
+
+
+def materialiser_charges(debut, fin):
+    """Crée les charges dues entre `debut` et `fin` qui n'existent pas encore. Retourne leur nombre."""
+    charges = charges_dues(debut, fin)
+    if not charges:
+        return 0
+    existantes = set(Charge.objects.filter(echeance__range=(debut, fin)).values_list('reference', flat=True))
+    nouvelles = [charge for charge in charges if charge.reference not in existantes]
+    enregistrer_charges(nouvelles)
+    return len(nouvelles)
+
+
+def transmettre_charges():
+    """Envoie à finance, en un lot et un événement, les charges pas encore transmises. Retourne le lot ou None."""
+    with transaction.atomic():
+        a_transmettre = list(
+            Charge.objects.filter(lot__isnull=True).select_for_update(skip_locked=True)
+            .select_related('location', 'electricite__location').order_by('echeance')
+        )
+        if not a_transmettre:
+            return None
+        lot = LotCharges.objects.create(
+            debut=a_transmettre[0].echeance, fin=a_transmettre[-1].echeance, nombre=len(a_transmettre),
+            montant_total=sum((charge.montant for charge in a_transmettre), Decimal('0.00')),
+        )
+        Charge.objects.filter(pk__in=[charge.pk for charge in a_transmettre]).update(
+            lot=lot, updated_at=timezone.now()
+        )
+        publier_evenement('rh.charges_a_valider', lot, {
+            'charges': [
+                {
+                    'id': charge.pk,
+                    'reference': charge.reference,
+                    'type_demande': charge.type_charge,
+                    'montant': charge.montant,
+                    'echeance': charge.echeance,
+                    'description': _description(charge),
+                }
+                for charge in a_transmettre
+            ],
+        })
+    return lot
+
+
+def _description(charge):
+    if charge.type_charge == 'location':
+        libelle = f"Loyer {charge.location.nom}"
+    else:
+        libelle = f"Électricité compteur {charge.electricite.numero_compteur} ({charge.electricite.location.nom})"
+    return f"{libelle} - échéance du {charge.echeance:%d/%m/%Y} ({charge.reference})"
+
+
+def planifier_charges(aujourd_hui=None, horizon=HORIZON_JOURS):
+    """Une passe du planificateur. Retourne {'creees', 'transmises', 'lot'}."""
+    aujourd_hui = aujourd_hui or timezone.localdate()
+    debut, fin = aujourd_hui.replace(day=1), aujourd_hui + timedelta(days=horizon)
+    with transaction.atomic():
+        creees = materialiser_charges(debut, fin)
+    lot = transmettre_charges()
+    return {'creees': creees, 'transmises': lot.nombre if lot else 0, 'lot': lot.pk if lot else None}
@@ -0,0 +1,141 @@
+"""
+🕰️ Chronologie d'un employé : affectations, contrats, congés et paiements.
+
+Chaque source est lue en une requête values_list triée du plus récent au plus
+ancien et limitée à une page ; heapq.merge fusionne les quatre flux déjà triés.
+Les événements sont compacts (identifiants et libellés, sans l'employé, cité
+une seule fois en tête de réponse).
+
+Pagination par curseur sur le flux fusionné : la clé de tri (instant, type, id)
+du dernier événement rendu. Chaque source ne relit que ce qui vient après,
+par une condition servie par ses index (employer_id, date), quel que soit le
+nombre de pages déjà parcourues.
+"""
+import base64
+import heapq
+import json
+import uuid
+from datetime import datetime, time
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+TAILLE_DEFAUT = 50
+TAILLE_MAX = 200
+
+# Rang de chaque type dans la clé de tri (départage des événements simultanés)
+TYPES = ('affectation', 'conge', 'contrat', 'paiement')
+
+
+class CurseurInvalide(ValueError):
+    pass
+
+
+def encoder_curseur(cle):
+    instant, rang, pk = cle
+    brut = json.dumps([instant.isoformat(), rang, pk]).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
+    try:
+        instant, rang, pk = json.loads(base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)))
+        instant = parse_datetime(instant)
+        uuid.UUID(pk)
+    except (ValueError, TypeError):
+        raise CurseurInvalide("Curseur invalide.")
+    if instant is None or rang not in range(len(TYPES)):
+        raise CurseurInvalide("Curseur invalide.")
+    return instant, rang, pk
+
+
+def _instant(valeur):
+    """Datetime aware ; une date compte pour minuit (heure locale)."""
+    if isinstance(valeur, datetime):
+        return valeur
+    return timezone.make_aware(datetime.combine(valeur, time.min))
+
+
+def _apres(champ, rang, curseur, champ_date):
+    """
+    Condition « strictement après le curseur » dans l'ordre décroissant
+    (instant, rang, id), pour une source de rang `rang` triée sur `champ`.
+    """
+    instant, rang_curseur, pk = curseur
+    if champ_date:
+        # Source à la journée : instant = minuit local de la date
+        local = timezone.localtime(instant)
+        if local.time() != time.min:
+            return Q(**{f'{champ}__lte': local.date()})
+        instant = local.date()
+    avant = Q(**{f'{champ}__lt': instant})
+    if rang < rang_curseur:
+        return avant | Q(**{champ: instant})
+    if rang == rang_curseur:
+        return avant | Q(**{champ: instant, 'pk__lt': uuid.UUID(pk)})
+    return avant
+
+
+def _source(type_, queryset, champ, champs, evenement, curseur, limite, champ_date=False):
+    rang = TYPES.index(type_)
+    if curseur:
+        queryset = queryset.filter(_apres(champ, rang, curseur, champ_date))
+    lignes = queryset.order_by(f'-{champ}', '-pk').values_list('pk', champ, *champs)[:limite]
+    for pk, date_, *valeurs in lignes:
+        yield (_instant(date_), rang, str(pk)), {'type': type_, 'id': pk, 'date': date_, **evenement(*valeurs)}
+
+
+def chronologie(employer_id, curseur=None, taille=TAILLE_DEFAUT, types=TYPES):
+    """
+    Page de la chronologie : {'evenements': [...], 'suivant': curseur | None}.
+    Une requête par type demandé.
+    """
+    from .models import Affectation, Conge, Contrat, Payement
+
+    taille = max(1, min(taille, TAILLE_MAX))
+    curseur = decoder_curseur(curseur) if curseur else None
+    limite = taille + 1
+
+    sources = {
+        'affectation': lambda: _source(
+            'affectation', Affectation.objects.filter(employer_id=employer_id), 'date_creation_affectation',
+            ('type_affectation', 'status_affectation', 'date_fin', 'ancien_district__name',
+             'nouveau_district__name', 'ancienne_fonction__nom_fonction', 'nouveau_fonction__nom_fonction'),
+            lambda type_a, statut, fin, d_avant, d_apres, f_avant, f_apres: {
+                'type_affectation': type_a, 'statut': statut, 'date_fin': fin,
+                'district': [d_avant, d_apres], 'fonction': [f_avant, f_apres],
+            },
+            curseur, limite,
+        ),
+        'conge': lambda: _source(
+            'conge', Conge.objects.filter(employer_id=employer_id), 'date_debut',
+            ('date_fin', 'nombre_jours', 'status_conge', 'type_conge__nom'),
+            lambda fin, jours, statut, type_c: {
+                'date_fin': fin, 'nombre_jours': jours, 'statut': statut, 'type_conge': type_c,
+            },
+            curseur, limite, champ_date=True,
+        ),
+        'contrat': lambda: _source(
+            'contrat', Contrat.objects.filter(employer_id=employer_id), 'date_debut_contrat',
+            ('date_fin_contrat', 'status_contrat', 'nature_contrat', 'type_contrat__nom_type', 'salaire'),
+            lambda fin, statut, nature, type_c, salaire: {
+                'date_fin': fin, 'statut': statut, 'nature_contrat': nature, 'type_contrat': type_c,
+                'salaire': salaire,
+            },
+            curseur, limite, champ_date=True,
+        ),
+        'paiement': lambda: _source(
+            'paiement', Payement.objects.filter(contrat__employer_id=employer_id), 'date_payement',
+            ('reference', 'montant', 'status', 'contrat_id'),
+            lambda reference, montant, statut, contrat_id: {
+                'reference': reference, 'montant': montant, 'statut': statut, 'contrat_id': contrat_id,
+            },
+            curseur, limite,
+        ),
+    }
+    flux = heapq.merge(*(sources[type_]() for type_ in TYPES if type_ in types), key=lambda e: e[0], reverse=True)
+    page = list(islice(flux, limite))
+    suivant = encoder_curseur(page[taille - 1][0]) if len(page) > taille else None
+    return {'evenements': [evenement for _, evenement in page[:taille]], 'suivant': suivant}
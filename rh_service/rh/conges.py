@@ -0,0 +1,271 @@
+"""
+🌴 Cycle de vie des congés approuvés.
+
+Une passe, en une transaction et quelques requêtes ensemblistes servies par
+l'index (status_conge, date_debut, date_fin) :
+
+1. les congés approuvés dont la date_fin est passée deviennent 'termine' ;
+2. leurs employés repassent 'actif', sauf si un autre congé approuvé les couvre
+   encore aujourd'hui ;
+3. les employés 'actif' couverts aujourd'hui par un congé approuvé passent 'conge'.
+
+Seuls les congés approuvés en cours ou échus entrent dans le périmètre : le
+coût d'une passe suit le nombre de congés qui changent d'état, pas la taille
+de l'historique.
+
+Les décisions et imports par lots (changer_statut_lot, importer_csv) valident
+tous les chevauchements avec les congés approuvés ou terminés en une requête
+par plage de dates, écrivent en
+bulk_update / bulk_create puis rejouent ce cycle pour les seuls employés touchés.
+Le passage 'approuve' → 'termine' ne change pas les soldes (soldes.py) : les
+deux statuts sont décomptés.
+"""
+import csv
+import io
+import uuid
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import soldes
+from .models import Conge, Employer, TypeConge, violation_exclusion
+
+# Statuts de départ autorisés pour chaque décision par lot
+TRANSITIONS = {
+    'approuve': {'en_attente'},
+    'refuse': {'en_attente'},
+    'annule': {'en_attente', 'approuve'},
+}
+
+
+def _conges_en_cours(aujourd_hui):
+    return Conge.objects.filter(status_conge='approuve', date_debut__lte=aujourd_hui, date_fin__gte=aujourd_hui)
+
+
+def traiter_conges(aujourd_hui=None, employer_ids=None):
+    """
+    Applique le cycle de vie des congés. `employer_ids` restreint la passe à
+    quelques employés (après une approbation ou une annulation).
+    Retourne {'termines', 'retours', 'departs'}.
+    """
+    aujourd_hui = aujourd_hui or timezone.localdate()
+    maintenant = timezone.now()
+    with transaction.atomic():
+        echus = Conge.objects.filter(status_conge='approuve', date_fin__lt=aujourd_hui)
+        en_cours = _conges_en_cours(aujourd_hui)
+        if employer_ids is not None:
+            echus = echus.filter(employer_id__in=employer_ids)
+            en_cours = en_cours.filter(employer_id__in=employer_ids)
+
+        # 1. Congés échus → 'termine'
+        termines = list(echus.order_by().select_for_update(skip_locked=True).values_list('id', 'employer_id'))
+        if termines:
+            Conge.objects.filter(pk__in=[pk for pk, _ in termines]).update(
+                status_conge='termine', updated_at=maintenant
+            )
+
+        # 2. Retour 'actif' des employés en congé qui ne sont plus couverts
+        concernes = {employer_id for _, employer_id in termines} | set(employer_ids or ())
+        retours = list(
+            Employer.objects.filter(pk__in=concernes, status_employer='conge')
+            .exclude(Exists(_conges_en_cours(aujourd_hui).filter(employer=OuterRef('pk'))))
+            .values_list('id', flat=True)
+        ) if concernes else []
+        if retours:
+            Employer.objects.filter(pk__in=retours).update(status_employer='actif', updated_at=maintenant)
+
+        # 3. Départ en congé des employés actifs couverts aujourd'hui
+        departs = list(
+            Employer.objects.filter(status_employer='actif', pk__in=en_cours.values('employer_id'))
+            .values_list('id', flat=True)
+        )
+        if departs:
+            Employer.objects.filter(pk__in=departs).update(status_employer='conge', updated_at=maintenant)
+
+        if retours or departs:
+            Employer.publier_modifications([*retours, *departs])
+
+    return {'termines': len(termines), 'retours': len(retours), 'departs': len(departs)}
+
+
+# ============================================================
+# 📦 Décisions et imports par lots
+# ============================================================
+def _chevauchements(candidats, exclure=(), entre_eux=True):
+    """
+    Candidats (objets Conge) qui chevaucheraient un congé approuvé ou terminé, ou
+    (si `entre_eux`) un candidat retenu avant eux (ordre de date_debut). Une
+    requête : les congés décomptés des employés concernés sur la plage
+    [plus petit début, plus grande fin].
+    """
+    if not candidats:
+        return set()
+    occupes = {}
+    existants = Conge.objects.filter(
+        status_conge__in=soldes.STATUTS_COMPTES,
+        employer_id__in={c.employer_id for c in candidats},
+        date_debut__lte=max(c.date_fin for c in candidats),
+        date_fin__gte=min(c.date_debut for c in candidats),
+    ).exclude(pk__in=list(exclure)).values_list('employer_id', 'date_debut', 'date_fin')
+    for employer_id, debut, fin in existants:
+        occupes.setdefault(employer_id, []).append((debut, fin))
+
+    refuses = set()
+    for conge in sorted(candidats, key=lambda c: c.date_debut):
+        periodes = occupes.setdefault(conge.employer_id, [])
+        if any(debut <= conge.date_fin and fin >= conge.date_debut for debut, fin in periodes):
+            refuses.add(id(conge))
+        elif entre_eux:
+            periodes.append((conge.date_debut, conge.date_fin))
+    return refuses
+
+
+def _uuid(valeur):
+    try:
+        return uuid.UUID(str(valeur))
+    except (TypeError, ValueError):
+        return None
+
+
+def changer_statut_lot(ids, statut):
+    """
+    Applique `statut` ('approuve', 'refuse', 'annule') à une liste de congés.
+    Retourne un résultat par identifiant, dans l'ordre reçu :
+    {'id', 'resultat': 'ok' | 'erreur', 'detail'?}.
+    """
+    maintenant = timezone.now()
+    cles = [_uuid(pk) for pk in ids]
+    with transaction.atomic():
+        conges = {
+            conge.pk: conge for conge in
+            Conge.objects.filter(pk__in=[cle for cle in cles if cle]).select_for_update()
+        }
+        erreurs, eligibles = {}, []
+        for cle in dict.fromkeys(cles):
+            conge = conges.get(cle)
+            if conge is None:
+                continue
+            if conge.status_conge not in TRANSITIONS[statut]:
+                erreurs[cle] = f"Congé '{conge.status_conge}' : passage à '{statut}' impossible."
+            else:
+                eligibles.append(conge)
+
+        if statut == 'approuve':
+            refuses = _chevauchements(eligibles, exclure=[c.pk for c in eligibles])
+            for conge in eligibles:
+                if id(conge) in refuses:
+                    erreurs[conge.pk] = Conge.MESSAGE_CHEVAUCHEMENT
+            eligibles = [c for c in eligibles if id(c) not in refuses]
+
+        mouvements = []
+        for conge in eligibles:
+            avant = conge.contribution_solde()
+            conge.status_conge = statut
+            conge.updated_at = maintenant
+            mouvements.append(soldes.difference(avant, conge.contribution_solde()))
+        with violation_exclusion('conge_sans_chevauchement', ValidationError(Conge.MESSAGE_CHEVAUCHEMENT)):
+            Conge.objects.bulk_update(eligibles, ['status_conge', 'updated_at'], batch_size=500)
+        soldes.appliquer(soldes.cumuler(*mouvements))
+        if eligibles:
+            traiter_conges(employer_ids={c.employer_id for c in eligibles})
+
+    resultats = []
+    for pk, cle in zip(ids, cles):
+        if cle not in conges:
+            resultats.append({'id': pk, 'resultat': 'erreur', 'detail': 'Congé introuvable.'})
+        elif cle in erreurs:
+            resultats.append({'id': pk, 'resultat': 'erreur', 'detail': erreurs[cle]})
+        else:
+            resultats.append({'id': pk, 'resultat': 'ok', 'status_conge': conges[cle].status_conge})
+    return resultats
+
+
+def _date(valeur):
+    try:
+        return parse_date(valeur or '')
+    except ValueError:
+        return None
+
+
+def importer_csv(fichier, approuver=False):
+    """
+    Crée les congés d'un CSV (séparateur , ou ;) : employer_id ou email,
+    type_conge (nom ou id), date_debut, date_fin ou nombre_jours, motif.
+    Les lignes invalides sont rapportées et ignorées ; les autres sont créées en
+    un bulk_create, 'en_attente' ou directement 'approuve' si `approuver`.
+    Retourne un résultat par ligne de données.
+    """
+    texte = fichier.read()
+    if isinstance(texte, bytes):
+        texte = texte.decode('utf-8-sig')
+    separateur = ';' if texte.split('\n', 1)[0].count(';') > texte.split('\n', 1)[0].count(',') else ','
+    lignes = list(csv.DictReader(io.StringIO(texte), delimiter=separateur))
+
+    # Références résolues en deux requêtes pour tout le fichier
+    ids = {_uuid(l.get('employer_id')) for l in lignes} - {None}
+    emails = {(l.get('email') or '').strip().lower() for l in lignes} - {''}
+    employes = list(Employer.objects.filter(Q(pk__in=ids) | Q(email__in=emails)).values_list('id', 'email'))
+    par_id = {pk: pk for pk, _ in employes}
+    par_email = {email.lower(): pk for pk, email in employes}
+    types = list(TypeConge.objects.all())
+    types_par_cle = {**{t.nom.lower(): t for t in types}, **{str(t.pk): t for t in types}}
+
+    aujourd_hui = timezone.localdate()
+    resultats, valides = [], []
+    for numero, ligne in enumerate(lignes, start=2):
+        ligne = {cle: (valeur or '').strip() for cle, valeur in ligne.items() if cle}
+        employer_id = par_id.get(_uuid(ligne.get('employer_id'))) or par_email.get(ligne.get('email', '').lower())
+        type_conge = types_par_cle.get(ligne.get('type_conge', '').lower())
+        debut, fin = _date(ligne.get('date_debut')), _date(ligne.get('date_fin'))
+        if debut and not fin and (ligne.get('nombre_jours') or '').isdigit():
+            fin = debut + timedelta(days=int(ligne['nombre_jours']) - 1)
+
+        erreur = None
+        if employer_id is None:
+            erreur = "Employé introuvable (employer_id ou email)."
+        elif type_conge is None:
+            erreur = "Type de congé introuvable."
+        elif not debut or not fin:
+            erreur = "date_debut et date_fin (ou nombre_jours) sont requis au format AAAA-MM-JJ."
+        elif debut > fin:
+            erreur = "La date de début ne peut pas être après la date de fin."
+        elif not approuver and debut < aujourd_hui:
+            erreur = "La date de début ne peut pas être dans le passé."
+        elif (fin - debut).days + 1 > type_conge.nombre_jours_max:
+            erreur = f"Le nombre de jours dépasse le maximum autorisé pour ce type de congé ({type_conge.nombre_jours_max})."
+        elif not ligne.get('motif'):
+            erreur = "Le motif est requis."
+        if erreur:
+            resultats.append({'ligne': numero, 'resultat': 'erreur', 'detail': erreur})
+            continue
+
+        conge = Conge(
+            employer_id=employer_id, type_conge=type_conge, date_debut=debut, date_fin=fin,
+            nombre_jours=(fin - debut).days + 1, motif=ligne['motif'],
+            status_conge='approuve' if approuver else 'en_attente',
+        )
+        valides.append(conge)
+        resultats.append({'ligne': numero, 'resultat': 'cree', 'conge': conge})
+
+    with transaction.atomic():
+        # Congés en attente : seuls les congés décomptés comptent (règle de Conge.clean)
+        refuses = _chevauchements(valides, entre_eux=approuver)
+        for resultat in resultats:
+            if resultat.get('conge') is not None and id(resultat['conge']) in refuses:
+                resultat.update(resultat='erreur', detail=Conge.MESSAGE_CHEVAUCHEMENT, conge=None)
+        valides = [c for c in valides if id(c) not in refuses]
+        with violation_exclusion('conge_sans_chevauchement', ValidationError(Conge.MESSAGE_CHEVAUCHEMENT)):
+            Conge.objects.bulk_create(valides, batch_size=500)
+        soldes.appliquer(soldes.cumuler(*(conge.contribution_solde() for conge in valides)))
+        if approuver and valides:
+            traiter_conges(employer_ids={c.employer_id for c in valides})
+
+    for resultat in resultats:
+        conge = resultat.pop('conge', None)
+        if conge is not None:
+            resultat['id'] = conge.pk
+    return resultats
@@ -0,0 +1,75 @@
+"""
+🧾 Totaux et statuts des demandes calculés en SQL.
+
+- Montant : somme des achats (montant × nombre). Sous PostgreSQL, colonne
+  Demande.total_achats tenue à jour par trigger sur rh_achat (migration 0019),
+  ajustée par un seul UPDATE groupé par instruction : lire le total d'une
+  demande de plusieurs milliers d'achats ne coûte rien. Ailleurs, sous-requête
+  agrégée.
+- Statut : décompte des paiements liés (complétés, échoués) en agrégats
+  conditionnels ; recalculer_statuts() met à jour autant de demandes que voulu
+  en un seul UPDATE.
+
+Une liste annotée par avec_totaux() coûte une requête, quel que soit le nombre
+de demandes, d'achats ou de paiements.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import (
+    Case, Count, DecimalField, Exists, F, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+CHAMP_MONTANT = DecimalField(max_digits=14, decimal_places=2)
+MONTANT_ACHATS = Sum(F('montant') * F('nombre'), output_field=CHAMP_MONTANT)
+
+
+def statut_selon_paiements(total, completes, echoues):
+    """Règle de Demande.update_status : tous complétés → approuvée, un échec → refusée."""
+    if total and completes == total:
+        return 'approuve'
+    if echoues:
+        return 'refuse'
+    return 'en_cours'
+
+
+def expression_montant():
+    """Total des achats de la demande courante (colonne maintenue par trigger sous PostgreSQL)."""
+    if connection.vendor == 'postgresql':
+        return F('total_achats')
+    from .models import Achat
+
+    sous_total = (
+        Achat.objects.filter(demande_id=OuterRef('pk')).order_by()
+        .values('demande_id').annotate(total=MONTANT_ACHATS).values('total')
+    )
+    return Coalesce(Subquery(sous_total, output_field=CHAMP_MONTANT), Value(Decimal('0.00')),
+                    output_field=CHAMP_MONTANT)
+
+
+def avec_totaux(queryset):
+    """Annote montant, nb_payements, nb_payements_completes et nb_payements_echoues."""
+    return queryset.annotate(
+        montant=expression_montant(),
+        nb_payements=Count('payements'),
+        nb_payements_completes=Count('payements', filter=Q(payements__status='complete')),
+        nb_payements_echoues=Count('payements', filter=Q(payements__status='echoue')),
+    )
+
+
+def recalculer_statuts(queryset):
+    """Statut de chaque demande du queryset selon ses paiements, en un UPDATE. Retourne le nombre de lignes."""
+    from .models import Demande
+
+    liens = Demande.payements.through.objects.filter(demande_id=OuterRef('pk'))
+    return queryset.update(
+        status=Case(
+            When(~Exists(liens), then=Value('en_cours')),
+            When(~Exists(liens.exclude(payement__status='complete')), then=Value('approuve')),
+            When(Exists(liens.filter(payement__status='echoue')), then=Value('refuse')),
+            default=Value('en_cours'),
+        ),
+        updated_at=timezone.now(),
+    )
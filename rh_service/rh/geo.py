@@ -0,0 +1,93 @@
+"""
+🗺️ Arbre géographique District → Commune → Fokontany.
+
+L'arbre complet (ou le sous-arbre d'un district ou d'une commune) est construit
+en trois requêtes plates values_list, assemblé en une passe par dictionnaires,
+puis mis en cache déjà sérialisé et compressé en gzip avec son ETag : une
+requête servie depuis le cache ne sérialise ni ne compresse rien.
+
+Invalidation : toute écriture sur District, Commune ou Fokontany change la
+version de l'arbre au commit (models.py) ; les entrées des versions
+précédentes ne sont plus lues et expirent d'elles-mêmes.
+"""
+import gzip
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_TIMEOUT = 24 * 3600
+CACHE_PREFIXE = 'rh:geo'
+CLE_VERSION = f'{CACHE_PREFIXE}:version'
+
+
+def construire_arbre(district_id=None, commune_id=None):
+    """
+    Liste des districts avec leurs communes et fokontany, restreinte à un
+    district ou à une commune. Trois requêtes, une passe d'assemblage.
+    """
+    from .models import Commune, District, Fokontany
+
+    districts = District.objects.order_by('name')
+    communes = Commune.objects.order_by('name')
+    fokontanies = Fokontany.objects.order_by('name')
+    if commune_id:
+        districts = districts.filter(communes__id=commune_id)
+        communes = communes.filter(pk=commune_id)
+        fokontanies = fokontanies.filter(commune_id=commune_id)
+    elif district_id:
+        districts = districts.filter(pk=district_id)
+        communes = communes.filter(district_id=district_id)
+        fokontanies = fokontanies.filter(commune__district_id=district_id)
+
+    arbre, par_district, par_commune = [], {}, {}
+    for pk, name, code, region in districts.values_list('id', 'name', 'code', 'region'):
+        district = {'id': str(pk), 'name': name, 'code': code, 'region': region, 'communes': []}
+        par_district[pk] = district
+        arbre.append(district)
+    for pk, name, code, parent in communes.values_list('id', 'name', 'code', 'district_id'):
+        commune = {'id': str(pk), 'name': name, 'code': code, 'fokontanies': []}
+        par_commune[pk] = commune
+        par_district[parent]['communes'].append(commune)
+    for pk, name, code, parent in fokontanies.values_list('id', 'name', 'code', 'commune_id'):
+        par_commune[parent]['fokontanies'].append({'id': str(pk), 'name': name, 'code': code})
+    return arbre
+
+
+def _version():
+    version = cache.get(CLE_VERSION)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add : deux workers qui initialisent en même temps retiennent la même version
+        cache.add(CLE_VERSION, version, None)
+        version = cache.get(CLE_VERSION, version)
+    return version
+
+
+def arbre_compresse(district_id=None, commune_id=None):
+    """
+    (etag, corps gzip) de l'arbre demandé, depuis le cache ou reconstruit.
+    None si le district ou la commune n'existe pas.
+    """
+    # Version lue avant les requêtes : un arbre calculé pendant une écriture est
+    # rangé sous l'ancienne version, déjà abandonnée au commit
+    cle = f"{CACHE_PREFIXE}:{_version()}:{'c:' + str(commune_id) if commune_id else 'd:' + str(district_id or '*')}"
+    entree = cache.get(cle)
+    if entree is None:
+        arbre = construire_arbre(district_id, commune_id)
+        if (district_id or commune_id) and not arbre:
+            return None
+        contenu = json.dumps({'districts': arbre}, ensure_ascii=False, separators=(',', ':')).encode()
+        entree = (
+            f'"{hashlib.sha256(contenu).hexdigest()[:32]}"',
+            gzip.compress(contenu, compresslevel=6, mtime=0),
+        )
+        cache.set(cle, entree, CACHE_TIMEOUT)
+    return entree
+
+
+def invalider():
+    """Nouvelle version de l'arbre au commit de la transaction courante."""
+    transaction.on_commit(lambda: cache.set(CLE_VERSION, uuid.uuid4().hex, None))
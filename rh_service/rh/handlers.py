@@ -0,0 +1,20 @@
+"""
+📥 Réactions de rh_service aux événements des autres services.
+"""
+from django.utils import timezone
+
+from commun.events import consommateur
+from .models import Charge
+
+# Décision finance (ValidationDemande.statut) → statut de la charge
+STATUTS_CHARGE = {'approuve': 'approuve', 'rejete': 'rejete'}
+
+
+@consommateur('finance.validation_traitee')
+def appliquer_decision_charge(message):
+    """Décision de finance sur une charge récurrente (loyer, électricité) envoyée par charges.py."""
+    payload = message['payload']
+    statut = STATUTS_CHARGE.get(payload['statut'])
+    if payload['service_origine'] != 'rh_service' or statut is None:
+        return
+    Charge.objects.filter(pk=payload['demande_origine_id']).update(statut=statut, updated_at=timezone.now())
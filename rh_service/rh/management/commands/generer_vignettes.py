@@ -0,0 +1,31 @@
+"""
+Génère les vignettes WebP/JPEG des photos d'employés en attente (voir rh/medias.py).
+
+    python manage.py generer_vignettes            # vide la file puis s'arrête
+    python manage.py generer_vignettes --follow   # worker permanent (docker-compose)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from rh.medias import traiter_vignettes
+
+
+class Command(BaseCommand):
+    help = "Génère les vignettes des photos de profil en attente."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--lot", type=int, default=50, help="Employés par lot (défaut 50).")
+        parser.add_argument("--intervalle", type=float, default=5.0,
+                            help="Attente quand la file est vide en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        while True:
+            traites = traiter_vignettes(taille_lot=options["lot"])
+            if traites:
+                self.stdout.write(f"🖼️ Vignettes générées pour {traites} employé(s)")
+            elif not options["follow"]:
+                break
+            else:
+                time.sleep(options["intervalle"])
@@ -0,0 +1,77 @@
+"""
+Copie les médias rh d'un stockage à l'autre (ex. disque local → bucket S3),
+en parallèle et en gardant les noms : aucune ligne de la base n'est réécrite.
+
+    python manage.py migrer_medias local s3 --threads 16
+    python manage.py migrer_medias local s3 --supprimer-source
+
+Relançable : les objets déjà présents à destination sont ignorés. Basculer
+ensuite RH_MEDIA_STORAGE sur la destination.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rh.medias import construire_stockage
+from rh.models import Conge, Employer
+
+
+def noms_medias():
+    """Tous les fichiers référencés : photos, vignettes, CV, justificatifs."""
+    noms = set()
+    for photo, cv, vignettes in Employer.objects.values_list('photo_profil', 'cv', 'photo_vignettes').iterator():
+        noms.update((photo, cv))
+        for formats in (vignettes or {}).values():
+            noms.update(formats.values())
+    noms.update(Conge.objects.exclude(justificatif='').values_list('justificatif', flat=True).iterator())
+    return sorted(nom for nom in noms if nom)
+
+
+def copier(source, destination, nom, supprimer_source):
+    if destination.exists(nom):
+        return 'present'
+    try:
+        with source.open(nom, 'rb') as fichier:
+            # _save direct : le nom d'origine est conservé (pas de ré-adressage par contenu)
+            destination._save(nom, fichier)
+    except FileNotFoundError:
+        return 'absent'
+    if supprimer_source:
+        source.delete(nom)
+    return 'copie'
+
+
+class Command(BaseCommand):
+    help = "Copie les médias rh d'un stockage (local, s3) vers un autre, en parallèle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", choices=["local", "s3"])
+        parser.add_argument("destination", choices=["local", "s3"])
+        parser.add_argument("--threads", type=int, default=8, help="Copies simultanées (défaut 8).")
+        parser.add_argument("--supprimer-source", action="store_true",
+                            help="Supprime chaque fichier de la source une fois copié.")
+
+    def handle(self, *args, **options):
+        if options["source"] == options["destination"]:
+            raise CommandError("La source et la destination doivent différer.")
+        source = construire_stockage(options["source"])
+        destination = construire_stockage(options["destination"])
+        noms = noms_medias()
+        self.stdout.write(f"📦 {len(noms)} fichier(s) référencé(s)")
+
+        bilan = {'copie': 0, 'present': 0, 'absent': 0, 'erreur': 0}
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executeur:
+            taches = {
+                executeur.submit(copier, source, destination, nom, options["supprimer_source"]): nom
+                for nom in noms
+            }
+            for tache in as_completed(taches):
+                try:
+                    bilan[tache.result()] += 1
+                except OSError as e:
+                    bilan['erreur'] += 1
+                    self.stderr.write(f"❌ {taches[tache]} : {e}")
+        self.stdout.write(
+            f"✅ {bilan['copie']} copié(s), {bilan['present']} déjà présent(s), "
+            f"{bilan['absent']} introuvable(s) à la source, {bilan['erreur']} erreur(s)"
+        )
@@ -0,0 +1,37 @@
+"""
+Recalcule le registre des soldes de congés depuis l'historique.
+
+    python manage.py reconstruire_soldes_conges                 # année en cours
+    python manage.py reconstruire_soldes_conges --annee 2025
+    python manage.py reconstruire_soldes_conges --toutes        # toutes les années ayant des congés
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from rh.models import Conge
+from rh.soldes import STATUTS_COMPTES, reconstruire
+
+
+class Command(BaseCommand):
+    help = "Recalcule les soldes de congés (une agrégation groupée par année)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--annee", type=int, help="Année à recalculer (défaut : année en cours).")
+        parser.add_argument("--toutes", action="store_true", help="Recalcule toutes les années.")
+
+    def handle(self, *args, **options):
+        if options["toutes"]:
+            bornes = Conge.objects.filter(status_conge__in=STATUTS_COMPTES).aggregate(
+                debut=Min('date_debut'), fin=Max('date_fin')
+            )
+            if bornes['debut'] is None:
+                self.stdout.write("Aucun congé décompté.")
+                return
+            annees = range(bornes['debut'].year, bornes['fin'].year + 1)
+        else:
+            annees = [options["annee"] or timezone.localdate().year]
+
+        for annee in annees:
+            lignes = reconstruire(annee)
+            self.stdout.write(f"📒 {annee} : {lignes} solde(s) recalculé(s)")
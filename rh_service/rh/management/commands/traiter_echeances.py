@@ -0,0 +1,53 @@
+"""
+Traitements d'échéances rh : fin des affectations temporaires échues, cycle
+de vie des congés approuvés (départs, fins de congé, retours), charges
+récurrentes (loyers, électricité) transmises à finance et purge des
+téléversements abandonnés.
+
+    python manage.py traiter_echeances            # une passe puis s'arrête (cron nocturne)
+    python manage.py traiter_echeances --follow   # worker permanent (docker-compose)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from rh.affectations import expirer_affectations
+from rh.charges import HORIZON_JOURS, planifier_charges
+from rh.conges import traiter_conges
+from rh.televersements import purger_televersements
+
+
+class Command(BaseCommand):
+    help = "Clôture les affectations temporaires échues et applique le cycle de vie des congés."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follow", action="store_true", help="Tourne en continu.")
+        parser.add_argument("--lot", type=int, default=1000, help="Lignes par lot (défaut 1000).")
+        parser.add_argument("--horizon", type=int, default=HORIZON_JOURS,
+                            help=f"Jours d'échéances de charges à matérialiser (défaut {HORIZON_JOURS}).")
+        parser.add_argument("--intervalle", type=float, default=3600.0,
+                            help="Attente entre deux passes en mode --follow (secondes).")
+
+    def handle(self, *args, **options):
+        while True:
+            affectations = expirer_affectations(taille_lot=options["lot"])
+            if affectations:
+                self.stdout.write(f"⏳ {affectations} affectation(s) temporaire(s) clôturée(s)")
+            conges = traiter_conges()
+            if any(conges.values()):
+                self.stdout.write(
+                    f"🌴 {conges['termines']} congé(s) terminé(s), {conges['retours']} retour(s), "
+                    f"{conges['departs']} départ(s) en congé"
+                )
+            charges = planifier_charges(horizon=options["horizon"])
+            if charges["creees"] or charges["transmises"]:
+                self.stdout.write(
+                    f"🔁 {charges['creees']} charge(s) récurrente(s) créée(s), "
+                    f"{charges['transmises']} transmise(s) à finance"
+                )
+            purges = purger_televersements()
+            if purges:
+                self.stdout.write(f"📥 {purges} téléversement(s) abandonné(s) supprimé(s)")
+            if not options["follow"]:
+                break
+            time.sleep(options["intervalle"])
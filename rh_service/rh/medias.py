@@ -0,0 +1,352 @@
+"""
+🖼️ Médias rh : stockage adressé par contenu, vignettes et diffusion.
+
+- Stockage : un fichier est rangé sous <dossier>/<sha256[:2]>/<sha256><ext>. Un
+  fichier renvoyé à l'identique réutilise l'existant au lieu d'être réécrit, et
+  le nom sert d'ETag (le contenu d'un nom ne change jamais).
+- Vignettes : générées hors requête par `traiter_vignettes` (commande
+  generer_vignettes), en WebP et JPEG, carrées, aux tailles de VIGNETTES.
+- Diffusion : MediaView répond en 304 sur If-None-Match, délègue l'envoi des
+  octets au proxy (X-Accel-Redirect) si MEDIA_ACCEL_REDIRECT est défini, sinon
+  sert le fichier elle-même avec prise en charge de Range.
+- Backends (RH_MEDIA_STORAGE) : 'local' sur MEDIA_ROOT, ou 's3' (stockage_s3.py)
+  dont les URL présignées mènent directement au bucket. Les URL locales sont
+  signées de la même façon (expire, signature) : un lien se suffit à lui-même.
+"""
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import posixpath
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.deconstruct import deconstructible
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+TAILLE_BLOC = 64 * 1024
+VIGNETTES = {'petite': 64, 'moyenne': 256}
+FORMATS_VIGNETTE = {'webp': ('WEBP', {'quality': 80, 'method': 4}), 'jpeg': ('JPEG', {'quality': 82, 'progressive': True})}
+DOSSIER_VIGNETTES = 'vignettes'
+DOSSIERS_MEDIAS = ('photos_profil/', 'cv_employes/', 'justificatifs_conge/', f'{DOSSIER_VIGNETTES}/')
+
+
+def empreinte(contenu):
+    """sha256 hexadécimal d'un fichier, lu par blocs (mémoire constante)."""
+    sha = hashlib.sha256()
+    if hasattr(contenu, 'seek'):
+        contenu.seek(0)
+    for bloc in contenu.chunks(TAILLE_BLOC) if hasattr(contenu, 'chunks') else iter(lambda: contenu.read(TAILLE_BLOC), b''):
+        sha.update(bloc)
+    if hasattr(contenu, 'seek'):
+        contenu.seek(0)
+    return sha.hexdigest()
+
+
+def nom_adresse(dossier, sha, extension):
+    return posixpath.join(dossier, sha[:2], f"{sha}{extension.lower()}")
+
+
+def sha_du_nom(nom):
+    """Empreinte portée par un nom adressé par contenu, None pour un ancien fichier."""
+    base = posixpath.splitext(posixpath.basename(nom or ''))[0].split('_')[0]
+    return base if len(base) == 64 and all(c in '0123456789abcdef' for c in base) else None
+
+
+# ============================================================
+# 💾 Stockage adressé par contenu
+# ============================================================
+class AdresseContenuMixin:
+    """À combiner avec un Storage Django : save() range le fichier sous son empreinte."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = ContentFile(content.read(), name=name)
+        dossier = posixpath.dirname(name.replace('\\', '/'))
+        sha = getattr(content, 'sha256', None) or empreinte(content)
+        nom = nom_adresse(dossier, sha, os.path.splitext(name)[1])
+        if self.exists(nom):
+            return nom
+        return super().save(nom, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Même nom = même contenu : écraser une course entre deux envois identiques est sans effet
+        return name
+
+    def enregistrer_tel_quel(self, name, content):
+        """Écrit `content` sous `name`, sans adressage par contenu (morceaux de téléversement)."""
+        return self._save(name, content)
+
+
+def fenetre_signature(duree):
+    """
+    (debut, expiration) en secondes epoch d'un lien signé valable au moins duree/2 :
+    la signature ne change qu'une fois par demi-durée, l'URL reste en cache navigateur.
+    """
+    fenetre = max(duree // 2, 1)
+    maintenant = int(time.time())
+    debut = maintenant - maintenant % fenetre
+    return debut, debut + duree
+
+
+def _signature_locale(nom, expire):
+    return salted_hmac('rh.medias', f"{nom}:{expire}", algorithm='sha256').hexdigest()
+
+
+def verifier_signature(nom, expire, signature):
+    """Vrai si (expire, signature) est un lien signé encore valable pour ce média."""
+    try:
+        expire = int(expire)
+    except (TypeError, ValueError):
+        return False
+    return expire >= time.time() and constant_time_compare(signature or '', _signature_locale(nom, expire))
+
+
+@deconstructible
+class StockageMediasLocal(AdresseContenuMixin, FileSystemStorage):
+    """
+    Stockage disque (MEDIA_ROOT) ; les URL passent par MediaView (RH_MEDIA_URL),
+    signées comme des URL présignées S3 pour permettre un <img src> sans jeton.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('base_url', getattr(settings, 'RH_MEDIA_URL', '/api/rh/medias/'))
+        super().__init__(**kwargs)
+
+    def url(self, name):
+        _, expire = fenetre_signature(getattr(settings, 'RH_MEDIA_URL_EXPIRATION', 3600))
+        nom = posixpath.normpath(name)
+        return f"{super().url(name)}?expire={expire}&signature={_signature_locale(nom, expire)}"
+
+    def _save(self, name, content):
+        # Écriture dans un temporaire puis os.replace : un lecteur ne voit jamais
+        # un fichier partiel, et deux envois concurrents du même contenu ne se gênent pas
+        chemin = self.path(name)
+        dossier = os.path.dirname(chemin)
+        os.makedirs(dossier, exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            # Fichier de transit d'un téléversement (televersements.py) : simple renommage
+            try:
+                os.replace(content.temporary_file_path(), chemin)
+                os.chmod(chemin, self.file_permissions_mode or 0o644)
+                return name
+            except OSError:
+                pass  # Autre volume : copie ci-dessous
+        fd, temporaire = tempfile.mkstemp(dir=dossier, prefix='.envoi-')
+        try:
+            with os.fdopen(fd, 'wb') as sortie:
+                for bloc in content.chunks(TAILLE_BLOC):
+                    sortie.write(bloc)
+            os.chmod(temporaire, self.file_permissions_mode or 0o644)
+            os.replace(temporaire, chemin)
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.unlink(temporaire)
+            raise
+        return name
+
+
+def construire_stockage(nom):
+    """Backend de médias : 'local' (MEDIA_ROOT) ou 's3' (bucket S3 compatible)."""
+    if nom == 's3':
+        from .stockage_s3 import StockageS3
+        return StockageS3()
+    if nom == 'local':
+        return StockageMediasLocal()
+    raise ValueError(f"Stockage de médias inconnu : {nom}")
+
+
+_stockage = None
+
+
+def stockage_medias():
+    """Stockage des FileField rh, choisi par RH_MEDIA_STORAGE (callable : non figé dans les migrations)."""
+    global _stockage
+    if _stockage is None:
+        _stockage = construire_stockage(getattr(settings, 'RH_MEDIA_STORAGE', 'local'))
+    return _stockage
+
+
+# ============================================================
+# 🖼️ Vignettes
+# ============================================================
+def nom_vignette(nom_source, taille, format_):
+    sha = sha_du_nom(nom_source) or hashlib.sha256(nom_source.encode()).hexdigest()
+    extension = 'jpg' if format_ == 'jpeg' else format_
+    return posixpath.join(DOSSIER_VIGNETTES, sha[:2], f"{sha}_{VIGNETTES[taille]}.{extension}")
+
+
+def generer_vignettes(nom_source):
+    """
+    Crée (si absentes) les vignettes d'une photo ; retourne {taille: {format: nom}}.
+    Une image illisible ne produit aucune vignette.
+    """
+    stockage = stockage_medias()
+    noms = {
+        taille: {format_: nom_vignette(nom_source, taille, format_) for format_ in FORMATS_VIGNETTE}
+        for taille in VIGNETTES
+    }
+    if all(stockage.exists(nom) for formats in noms.values() for nom in formats.values()):
+        return noms
+    try:
+        with stockage.open(nom_source, 'rb') as fichier:
+            image = ImageOps.exif_transpose(Image.open(fichier))
+            image = image.convert('RGB')
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+        logger.warning("Vignettes impossibles pour %s : %s", nom_source, e)
+        return {}
+    for taille, cote in VIGNETTES.items():
+        vignette = ImageOps.fit(image, (cote, cote), Image.LANCZOS)
+        for format_, (format_pil, options) in FORMATS_VIGNETTE.items():
+            if stockage.exists(noms[taille][format_]):
+                continue
+            tampon = io.BytesIO()
+            vignette.save(tampon, format_pil, **options)
+            # Nom déjà définitif : enregistré tel quel, hors adressage par contenu
+            super(AdresseContenuMixin, stockage).save(noms[taille][format_], ContentFile(tampon.getvalue()))
+    return noms
+
+
+def traiter_vignettes(taille_lot=50):
+    """
+    Génère les vignettes d'un lot d'employés en attente (SKIP LOCKED : plusieurs
+    workers possibles). Retourne le nombre d'employés traités.
+    """
+    from .models import Employer
+
+    with transaction.atomic():
+        employes = list(
+            Employer.objects.filter(vignettes_a_generer=True)
+            .select_for_update(skip_locked=True)
+            .only('id', 'photo_profil', 'photo_vignettes', 'vignettes_a_generer')[:taille_lot]
+        )
+        for employe in employes:
+            employe.photo_vignettes = generer_vignettes(employe.photo_profil.name) if employe.photo_profil else {}
+            employe.vignettes_a_generer = False
+        # bulk_update : pas d'événement rh.employe_modifie pour un simple dérivé de la photo
+        Employer.objects.bulk_update(employes, ['photo_vignettes', 'vignettes_a_generer'])
+    return len(employes)
+
+
+# ============================================================
+# 📤 Diffusion (ETag, Range, X-Accel-Redirect)
+# ============================================================
+def chemin_media(chemin):
+    """Nom de stockage d'un chemin demandé, ou Http404 s'il sort des dossiers médias."""
+    nom = posixpath.normpath(chemin or '')
+    if nom.startswith(('/', '.')) or '..' in nom.split('/') or not nom.startswith(DOSSIERS_MEDIAS):
+        raise Http404("Média introuvable.")
+    return nom
+
+
+def _plage(entete, taille):
+    """
+    (debut, fin) inclus d'un en-tête Range à une seule plage ; None si absent ou
+    multi-plages (réponse complète), False si non satisfiable (416).
+    """
+    if not entete or not entete.startswith('bytes=') or ',' in entete:
+        return None
+    debut, _, fin = entete[6:].strip().partition('-')
+    try:
+        if not debut:
+            suffixe = int(fin)
+            if suffixe <= 0:
+                return False
+            return max(taille - suffixe, 0), taille - 1
+        debut = int(debut)
+        fin = min(int(fin), taille - 1) if fin else taille - 1
+    except ValueError:
+        return None
+    if debut >= taille or debut > fin:
+        return False
+    return debut, fin
+
+
+def _lire(fichier, debut, longueur):
+    try:
+        fichier.seek(debut)
+        while longueur > 0:
+            bloc = fichier.read(min(TAILLE_BLOC, longueur))
+            if not bloc:
+                break
+            longueur -= len(bloc)
+            yield bloc
+    finally:
+        fichier.close()
+
+
+def reponse_media(request, chemin):
+    """
+    Réponse HTTP d'un média rh : 304 si l'ETag correspond, délégation au proxy
+    si MEDIA_ACCEL_REDIRECT est défini, sinon 200 ou 206 (Range) en streaming.
+    """
+    nom = chemin_media(chemin)
+    stockage = stockage_medias()
+    if not isinstance(stockage, FileSystemStorage):
+        # Stockage objet : le navigateur télécharge directement via l'URL présignée
+        return HttpResponseRedirect(stockage.url(nom))
+    if not stockage.exists(nom):
+        raise Http404("Média introuvable.")
+
+    # Nom adressé par contenu : immuable, le nom suffit comme ETag
+    adresse = sha_du_nom(nom) is not None
+    if adresse:
+        etag = f'"{posixpath.basename(nom)}"'
+        taille = None
+    else:
+        taille = stockage.size(nom)
+        etag = f'"{taille:x}-{int(stockage.get_modified_time(nom).timestamp()):x}"'
+    entetes = {
+        'ETag': etag,
+        'Cache-Control': 'private, max-age=31536000, immutable' if adresse else 'private, no-cache',
+        'Accept-Ranges': 'bytes',
+    }
+    type_contenu = mimetypes.guess_type(nom)[0] or 'application/octet-stream'
+
+    if etag in [v.strip() for v in request.headers.get('If-None-Match', '').split(',')]:
+        reponse = HttpResponse(status=304)
+        for cle, valeur in entetes.items():
+            reponse[cle] = valeur
+        return reponse
+
+    interne = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if interne:
+        # Le proxy sert les octets (Range compris) depuis sa location interne
+        reponse = HttpResponse(content_type=type_contenu)
+        reponse['X-Accel-Redirect'] = f"{interne.rstrip('/')}/{nom}"
+        for cle, valeur in entetes.items():
+            reponse[cle] = valeur
+        return reponse
+
+    taille = stockage.size(nom) if taille is None else taille
+    plage = _plage(request.headers.get('Range'), taille)
+    if plage is not None and request.headers.get('If-Range', etag) != etag:
+        plage = None  # Ressource changée depuis le téléchargement partiel : tout renvoyer
+    if plage is False:
+        reponse = HttpResponse(status=416)
+        reponse['Content-Range'] = f"bytes */{taille}"
+        return reponse
+
+    debut, fin = plage or (0, taille - 1)
+    longueur = max(fin - debut + 1, 0)
+    reponse = StreamingHttpResponse(
+        _lire(stockage.open(nom, 'rb'), debut, longueur),
+        status=206 if plage else 200, content_type=type_contenu,
+    )
+    reponse['Content-Length'] = str(longueur)
+    if plage:
+        reponse['Content-Range'] = f"bytes {debut}-{fin}/{taille}"
+    for cle, valeur in entetes.items():
+        reponse[cle] = valeur
+    return reponse
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0009_curseurconsommateur_evenementoutbox_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contrat',
+            index=models.Index(fields=['status_contrat', 'employer', '-date_debut_contrat'], name='contrat_paie_idx'),
+        ),
+    ]
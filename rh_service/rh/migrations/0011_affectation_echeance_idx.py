@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0010_contrat_contrat_paie_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='affectation',
+            index=models.Index(fields=['type_affectation', 'status_affectation', 'date_fin'], name='affectation_echeance_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0011_affectation_echeance_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conge',
+            index=models.Index(fields=['status_conge', 'date_debut', 'date_fin'], name='conge_cycle_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# (table, contrainte, colonnes de la période, condition préfixable par un alias) ;
+# la borne haute NULL d'un contrat donne un daterange non borné.
+CONTRAINTES = [
+    (
+        'rh_conge', 'conge_sans_chevauchement', ('date_debut', 'date_fin'),
+        "{t}status_conge IN ('approuve', 'termine')",
+    ),
+    (
+        'rh_contrat', 'contrat_emploi_sans_chevauchement', ('date_debut_contrat', 'date_fin_contrat'),
+        "{t}status_contrat = 'actif' AND {t}nature_contrat = 'emploi'",
+    ),
+]
+
+
+def creer_contraintes(apps, schema_editor):
+    """
+    EXCLUDE USING gist (employer_id WITH =, daterange(debut, fin, '[]') WITH &&) :
+    PostgreSQL refuse atomiquement deux périodes qui se chevauchent pour un même
+    employé. Ailleurs (SQLite des benchmarks), les modèles gardent leur vérification
+    en Python.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for table, nom, (debut, fin), condition in CONTRAINTES:
+        periode = f"daterange({debut}, {fin}, '[]')"
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {table} a JOIN {table} b "
+                f"ON a.employer_id = b.employer_id AND a.id < b.id "
+                f"AND daterange(a.{debut}, a.{fin}, '[]') && daterange(b.{debut}, b.{fin}, '[]') "
+                f"WHERE {condition.format(t='a.')} AND {condition.format(t='b.')}"
+            )
+            conflits = cursor.fetchone()[0]
+        if conflits:
+            raise RuntimeError(
+                f"{conflits} paire(s) de lignes de {table} se chevauchent déjà ({condition.format(t='')}) : "
+                f"corrigez-les avant d'appliquer la contrainte {nom}."
+            )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {nom} "
+            f"EXCLUDE USING gist (employer_id WITH =, {periode} WITH &&) WHERE ({condition.format(t='')})"
+        )
+
+
+def supprimer_contraintes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, nom, _, _ in CONTRAINTES:
+        schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {nom}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0012_conge_cycle_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_contraintes, supprimer_contraintes),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:51
+
+from datetime import date
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def initialiser_soldes(apps, schema_editor):
+    """Remplit le registre depuis l'historique des congés approuvés ou terminés."""
+    Conge = apps.get_model('rh', 'Conge')
+    SoldeConge = apps.get_model('rh', 'SoldeConge')
+    totaux = {}
+    conges = Conge.objects.filter(
+        status_conge__in=['approuve', 'termine'], type_conge__isnull=False
+    ).values_list('employer_id', 'type_conge_id', 'date_debut', 'date_fin')
+    for employer_id, type_conge_id, debut, fin in conges.iterator():
+        for annee in range(debut.year, fin.year + 1):
+            jours = (min(fin, date(annee, 12, 31)) - max(debut, date(annee, 1, 1))).days + 1
+            if jours > 0:
+                cle = (employer_id, type_conge_id, annee)
+                totaux[cle] = totaux.get(cle, 0) + jours
+    SoldeConge.objects.bulk_create(
+        [
+            SoldeConge(employer_id=employer_id, type_conge_id=type_conge_id, annee=annee, jours_pris=jours)
+            for (employer_id, type_conge_id, annee), jours in totaux.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0013_chevauchements_exclusion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='typeconge',
+            name='droit_annuel',
+            field=models.PositiveIntegerField(blank=True, help_text='Jours disponibles par employé et par an (vide = nombre_jours_max)', null=True),
+        ),
+        migrations.CreateModel(
+            name='SoldeConge',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('annee', models.PositiveSmallIntegerField()),
+                ('jours_pris', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='soldes_conge', to='rh.employer')),
+                ('type_conge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='soldes', to='rh.typeconge')),
+            ],
+            options={
+                'verbose_name': 'Solde de congé',
+                'verbose_name_plural': 'Soldes de congés',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='soldeconge',
+            constraint=models.UniqueConstraint(fields=('employer', 'type_conge', 'annee'), name='solde_conge_unique'),
+        ),
+        migrations.RunPython(initialiser_soldes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:54
+
+import django.core.validators
+from django.db import migrations, models
+import rh.medias
+
+
+def planifier_vignettes(apps, schema_editor):
+    """Les photos déjà enregistrées passent par le worker de vignettes."""
+    Employer = apps.get_model('rh', 'Employer')
+    Employer.objects.exclude(photo_profil__isnull=True).exclude(photo_profil='').update(vignettes_a_generer=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0014_soldes_conges'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employer',
+            name='photo_vignettes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='employer',
+            name='vignettes_a_generer',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='conge',
+            name='justificatif',
+            field=models.FileField(blank=True, null=True, storage=rh.medias.stockage_medias, upload_to='justificatifs_conge/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'png'])]),
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='cv',
+            field=models.FileField(blank=True, null=True, storage=rh.medias.stockage_medias, upload_to='cv_employes/'),
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='photo_profil',
+            field=models.ImageField(blank=True, null=True, storage=rh.medias.stockage_medias, upload_to='photos_profil/'),
+        ),
+        migrations.AddIndex(
+            model_name='employer',
+            index=models.Index(condition=models.Q(('vignettes_a_generer', True)), fields=['vignettes_a_generer'], name='employer_vignettes_idx'),
+        ),
+        migrations.RunPython(planifier_vignettes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:57
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0015_medias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Televersement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('champ', models.CharField(choices=[('photo_profil', 'Photo de profil'), ('cv', 'CV'), ('justificatif', 'Justificatif de congé')], max_length=20)),
+                ('nom_fichier', models.CharField(max_length=255)),
+                ('taille', models.PositiveBigIntegerField()),
+                ('recu', models.PositiveBigIntegerField(default=0)),
+                ('type_contenu', models.CharField(blank=True, max_length=100)),
+                ('proprietaire', models.CharField(blank=True, max_length=255)),
+                ('morceaux', models.JSONField(blank=True, default=list)),
+                ('fichier', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Téléversement',
+                'verbose_name_plural': 'Téléversements',
+            },
+        ),
+    ]
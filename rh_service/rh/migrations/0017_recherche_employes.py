@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# Colonnes de recherche tenues à jour par trigger (voir rh/recherche.py)
+CREATION = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "ALTER TABLE rh_employer ADD COLUMN texte_recherche text NOT NULL DEFAULT ''",
+    "ALTER TABLE rh_employer ADD COLUMN vecteur_recherche tsvector NOT NULL DEFAULT ''::tsvector",
+    """
+    CREATE OR REPLACE FUNCTION rh_employer_recherche() RETURNS trigger AS $$
+    DECLARE
+        fonction text;
+    BEGIN
+        SELECT nom_fonction INTO fonction FROM rh_fonction WHERE id = NEW.fonction_id;
+        NEW.texte_recherche := lower(unaccent(concat_ws(' ', NEW.nom_employer, NEW.prenom_employer, NEW.email, fonction)));
+        NEW.vecteur_recherche :=
+            setweight(to_tsvector('simple', lower(unaccent(concat_ws(' ', NEW.nom_employer, NEW.prenom_employer)))), 'A')
+            || setweight(to_tsvector('simple', lower(unaccent(coalesce(fonction, '')))), 'B')
+            || setweight(to_tsvector('simple', lower(unaccent(coalesce(NEW.email, '')))), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER rh_employer_recherche
+    BEFORE INSERT OR UPDATE OF nom_employer, prenom_employer, email, fonction_id ON rh_employer
+    FOR EACH ROW EXECUTE FUNCTION rh_employer_recherche()
+    """,
+    # Renommer une fonction recalcule ses employés (SET fonction_id = fonction_id déclenche le trigger)
+    """
+    CREATE OR REPLACE FUNCTION rh_fonction_recherche() RETURNS trigger AS $$
+    BEGIN
+        UPDATE rh_employer SET fonction_id = fonction_id WHERE fonction_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER rh_fonction_recherche
+    AFTER UPDATE OF nom_fonction ON rh_fonction
+    FOR EACH ROW WHEN (OLD.nom_fonction IS DISTINCT FROM NEW.nom_fonction)
+    EXECUTE FUNCTION rh_fonction_recherche()
+    """,
+    "UPDATE rh_employer SET fonction_id = fonction_id",
+    "CREATE INDEX employer_recherche_trgm_idx ON rh_employer USING gin (texte_recherche gin_trgm_ops)",
+    "CREATE INDEX employer_recherche_fts_idx ON rh_employer USING gin (vecteur_recherche)",
+]
+
+SUPPRESSION = [
+    "DROP TRIGGER IF EXISTS rh_fonction_recherche ON rh_fonction",
+    "DROP FUNCTION IF EXISTS rh_fonction_recherche()",
+    "DROP TRIGGER IF EXISTS rh_employer_recherche ON rh_employer",
+    "DROP FUNCTION IF EXISTS rh_employer_recherche()",
+    "ALTER TABLE rh_employer DROP COLUMN IF EXISTS vecteur_recherche",
+    "ALTER TABLE rh_employer DROP COLUMN IF EXISTS texte_recherche",
+]
+
+
+def executer(requetes):
+    def operation(apps, schema_editor):
+        # PostgreSQL uniquement : ailleurs, la recherche retombe sur ILIKE (recherche.py)
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for requete in requetes:
+            schema_editor.execute(requete)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0016_televersements'),
+    ]
+
+    operations = [
+        migrations.RunPython(executer(CREATION), executer(SUPPRESSION)),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0017_recherche_employes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='affectation',
+            index=models.Index(fields=['employer', '-date_creation_affectation', '-id'], name='affectation_chrono_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conge',
+            index=models.Index(fields=['employer', '-date_debut', '-id'], name='conge_chrono_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contrat',
+            index=models.Index(fields=['employer', '-date_debut_contrat', '-id'], name='contrat_chrono_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payement',
+            index=models.Index(fields=['contrat', '-date_payement', '-id'], name='payement_chrono_idx'),
+        ),
+    ]
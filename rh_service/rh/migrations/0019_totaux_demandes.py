@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:06
+
+from decimal import Decimal
+from django.db import migrations, models
+
+# Total des achats d'une demande tenu à jour par trigger (voir rh/demandes.py).
+# Trigger par instruction avec tables de transition : un bulk_create de
+# milliers d'achats ajuste chaque demande touchée une seule fois.
+CREATION = [
+    """
+    CREATE OR REPLACE FUNCTION rh_achat_total_demande() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE rh_demande d SET total_achats = d.total_achats + delta.montant
+            FROM (SELECT demande_id, sum(montant * nombre) AS montant FROM nouveaux
+                  WHERE demande_id IS NOT NULL GROUP BY demande_id) delta
+            WHERE d.id = delta.demande_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE rh_demande d SET total_achats = d.total_achats - delta.montant
+            FROM (SELECT demande_id, sum(montant * nombre) AS montant FROM anciens
+                  WHERE demande_id IS NOT NULL GROUP BY demande_id) delta
+            WHERE d.id = delta.demande_id;
+        ELSE
+            UPDATE rh_demande d SET total_achats = d.total_achats + delta.montant
+            FROM (SELECT demande_id, sum(montant) AS montant FROM (
+                      SELECT demande_id, montant * nombre AS montant FROM nouveaux
+                      UNION ALL
+                      SELECT demande_id, -(montant * nombre) FROM anciens
+                  ) lignes WHERE demande_id IS NOT NULL GROUP BY demande_id) delta
+            WHERE d.id = delta.demande_id AND delta.montant <> 0;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER rh_achat_total_insertion AFTER INSERT ON rh_achat
+    REFERENCING NEW TABLE AS nouveaux
+    FOR EACH STATEMENT EXECUTE FUNCTION rh_achat_total_demande()
+    """,
+    """
+    CREATE TRIGGER rh_achat_total_modification AFTER UPDATE ON rh_achat
+    REFERENCING OLD TABLE AS anciens NEW TABLE AS nouveaux
+    FOR EACH STATEMENT EXECUTE FUNCTION rh_achat_total_demande()
+    """,
+    """
+    CREATE TRIGGER rh_achat_total_suppression AFTER DELETE ON rh_achat
+    REFERENCING OLD TABLE AS anciens
+    FOR EACH STATEMENT EXECUTE FUNCTION rh_achat_total_demande()
+    """,
+    """
+    UPDATE rh_demande d SET total_achats = coalesce(
+        (SELECT sum(montant * nombre) FROM rh_achat WHERE demande_id = d.id), 0
+    )
+    """,
+]
+
+SUPPRESSION = [
+    "DROP TRIGGER IF EXISTS rh_achat_total_suppression ON rh_achat",
+    "DROP TRIGGER IF EXISTS rh_achat_total_modification ON rh_achat",
+    "DROP TRIGGER IF EXISTS rh_achat_total_insertion ON rh_achat",
+    "DROP FUNCTION IF EXISTS rh_achat_total_demande()",
+]
+
+
+def executer(requetes):
+    def operation(apps, schema_editor):
+        # PostgreSQL uniquement : ailleurs, le total est une sous-requête agrégée (demandes.py)
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for requete in requetes:
+            schema_editor.execute(requete)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0018_chronologie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demande',
+            name='total_achats',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.RunPython(executer(CREATION), executer(SUPPRESSION)),
+    ]
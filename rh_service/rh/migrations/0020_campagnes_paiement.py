@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0019_totaux_demandes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payement',
+            name='echeance',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='payement',
+            index=models.Index(fields=['status', 'echeance'], name='payement_echeance_idx'),
+        ),
+    ]
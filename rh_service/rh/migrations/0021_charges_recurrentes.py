@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:10
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rh', '0020_campagnes_paiement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Charge',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('reference', models.CharField(max_length=100, unique=True)),
+                ('type_charge', models.CharField(choices=[('location', 'Location'), ('electricite', 'Électricité')], max_length=20)),
+                ('echeance', models.DateField()),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('approuve', 'Approuvé'), ('rejete', 'Rejeté')], default='en_attente', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Charge',
+                'verbose_name_plural': 'Charges',
+                'ordering': ['echeance'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LotCharges',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('debut', models.DateField()),
+                ('fin', models.DateField()),
+                ('nombre', models.PositiveIntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Lot de charges',
+                'verbose_name_plural': 'Lots de charges',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['date_echeance'], name='location_echeance_idx'),
+        ),
+        migrations.AddField(
+            model_name='charge',
+            name='electricite',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='charges', to='rh.electricite'),
+        ),
+        migrations.AddField(
+            model_name='charge',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='charges', to='rh.location'),
+        ),
+        migrations.AddField(
+            model_name='charge',
+            name='lot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='charges', to='rh.lotcharges'),
+        ),
+        migrations.AddField(
+            model_name='payement',
+            name='charge',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payement', to='rh.charge'),
+        ),
+        migrations.AddIndex(
+            model_name='charge',
+            index=models.Index(fields=['echeance'], name='charge_echeance_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='charge',
+            index=models.Index(condition=models.Q(('lot__isnull', True)), fields=['echeance'], name='charge_a_transmettre_idx'),
+        ),
+    ]
@@ -1,10 +1,36 @@
-from django.db import models
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connection, models, transaction
 from django.core.validators import FileExtensionValidator
 import uuid
 from datetime import datetime, timedelta
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 
+from . import soldes
+from .demandes import MONTANT_ACHATS, statut_selon_paiements
+from .geo import invalider as invalider_geo
+from .medias import stockage_medias
+from commun.models import CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase
+from commun.events import publier_evenement, publier_evenements
+
+
+@contextmanager
+def violation_exclusion(contrainte, erreur):
+    """
+    Traduit en `erreur` la violation de la contrainte d'exclusion `contrainte`
+    (chevauchement refusé par PostgreSQL) ; un savepoint garde la transaction utilisable.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as e:
+        if contrainte in str(e):
+            raise erreur from e
+        raise
 
 
 class District(models.Model):
@@ -23,6 +49,14 @@ class District(models.Model):
     def __str__(self):
         return f"{self.name} ({self.region})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalider_geo()
+
+    def delete(self, *args, **kwargs):
+        invalider_geo()
+        return super().delete(*args, **kwargs)
+
 
 class Commune(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -41,6 +75,14 @@ class Commune(models.Model):
     def __str__(self):
         return f"{self.name} - {self.district.name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalider_geo()
+
+    def delete(self, *args, **kwargs):
+        invalider_geo()
+        return super().delete(*args, **kwargs)
+
 
 class Fokontany(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -59,6 +101,14 @@ class Fokontany(models.Model):
     def __str__(self):
         return f"{self.name} - {self.commune.name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalider_geo()
+
+    def delete(self, *args, **kwargs):
+        invalider_geo()
+        return super().delete(*args, **kwargs)
+
 
 class Fonction(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -108,8 +158,11 @@ class Employer(models.Model):
     adresse = models.TextField(blank=True, null=True)
 
     # Nouveaux champs
-    photo_profil = models.ImageField(upload_to="photos_profil/", null=True, blank=True)
-    cv = models.FileField(upload_to="cv_employes/", null=True, blank=True)
+    photo_profil = models.ImageField(upload_to="photos_profil/", storage=stockage_medias, null=True, blank=True)
+    cv = models.FileField(upload_to="cv_employes/", storage=stockage_medias, null=True, blank=True)
+    # Vignettes de la photo, générées hors requête (medias.traiter_vignettes)
+    photo_vignettes = models.JSONField(default=dict, blank=True)
+    vignettes_a_generer = models.BooleanField(default=False)
 
     diplome = models.CharField(max_length=20, choices=DIPLOME_CHOICES, blank=True, null=True)
     domaine_etude = models.CharField(max_length=150, blank=True, null=True)
@@ -137,11 +190,94 @@ class Employer(models.Model):
         ordering = ['nom_employer', 'prenom_employer']
         verbose_name = 'Employé'
         verbose_name_plural = 'Employés'
+        indexes = [
+            # File d'attente du worker de vignettes
+            models.Index(
+                fields=['vignettes_a_generer'], name='employer_vignettes_idx',
+                condition=models.Q(vignettes_a_generer=True),
+            ),
+        ]
+
+    CHAMPS_EVENEMENT = [
+        'nom_employer', 'prenom_employer', 'email', 'status_employer', 'district_id', 'fonction_id',
+    ]
+
+    def payload_evenement(self):
+        return {champ: getattr(self, champ) for champ in self.CHAMPS_EVENEMENT}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'photo_profil' in instance.__dict__:
+            instance._photo_initiale = instance.photo_profil.name
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Nouvelle photo : anciennes vignettes invalidées, régénérées par le worker
+        photo = self.photo_profil.name or None if 'photo_profil' in self.__dict__ else None
+        if 'photo_profil' in self.__dict__ and photo != (getattr(self, '_photo_initiale', None) or None):
+            self.photo_vignettes = {}
+            self.vignettes_a_generer = bool(photo)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'photo_vignettes', 'vignettes_a_generer'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            publier_evenement('rh.employe_modifie', self, self.payload_evenement())
+        if 'photo_profil' in self.__dict__:
+            # Nom adressé par contenu fixé par pre_save, pas celui du fichier envoyé
+            self._photo_initiale = self.photo_profil.name
+
+    @classmethod
+    def publier_modifications(cls, ids):
+        """rh.employe_modifie pour des employés modifiés par UPDATE en masse (une lecture, un INSERT)."""
+        employes = cls.objects.filter(pk__in=ids).only('id', *cls.CHAMPS_EVENEMENT)
+        publier_evenements([
+            ('rh.employe_modifie', employe, employe.payload_evenement()) for employe in employes
+        ])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            publier_evenement('rh.employe_supprime', self, {
+                'nom_employer': self.nom_employer,
+                'prenom_employer': self.prenom_employer,
+            })
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.nom_employer} {self.prenom_employer}"
 
 
+class Televersement(models.Model):
+    """Session de téléversement avec reprise (voir televersements.py)."""
+    CHAMP_CHOICES = [
+        ('photo_profil', 'Photo de profil'),
+        ('cv', 'CV'),
+        ('justificatif', 'Justificatif de congé'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    champ = models.CharField(max_length=20, choices=CHAMP_CHOICES)
+    nom_fichier = models.CharField(max_length=255)
+    taille = models.PositiveBigIntegerField()
+    recu = models.PositiveBigIntegerField(default=0)
+    type_contenu = models.CharField(max_length=100, blank=True)
+    # Utilisateur (sub du JWT) qui a ouvert la session : seul à la voir et à l'utiliser
+    proprietaire = models.CharField(max_length=255, blank=True)
+    # [début, fin) des morceaux déjà rangés dans le stockage des médias
+    morceaux = models.JSONField(default=list, blank=True)
+    # Nom dans le stockage des médias une fois le dernier morceau reçu
+    fichier = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Téléversement'
+        verbose_name_plural = 'Téléversements'
+
+    def __str__(self):
+        return f"{self.nom_fichier} ({self.recu}/{self.taille})"
+
+
 
 
 import uuid
@@ -199,6 +335,13 @@ class Affectation(models.Model):
         ordering = ['-date_creation_affectation']
         verbose_name = 'Affectation'
         verbose_name_plural = 'Affectations'
+        indexes = [
+            # Recherche des affectations temporaires échues (voir affectations.py)
+            models.Index(fields=['type_affectation', 'status_affectation', 'date_fin'],
+                         name='affectation_echeance_idx'),
+            # Chronologie d'un employé (voir chronologie.py)
+            models.Index(fields=['employer', '-date_creation_affectation', '-id'], name='affectation_chrono_idx'),
+        ]
 
     def __str__(self):
         parts = []
@@ -254,8 +397,9 @@ class Affectation(models.Model):
 
     @classmethod
     def verifier_toutes_les_affectations(cls):
-        for affectation in cls.objects.filter(type_affectation='temporaire', status_affectation='active'):
-            affectation.verifier_fin_affectation()
+        """Clôture en lots toutes les affectations temporaires échues (voir affectations.py)."""
+        from .affectations import expirer_affectations
+        return expirer_affectations()
 
 class TypeConge(models.Model):
     """
@@ -268,6 +412,10 @@ class TypeConge(models.Model):
     nombre_jours_max = models.IntegerField(
         help_text="Nombre maximum de jours autorisés pour ce type de congé"
     )
+    droit_annuel = models.PositiveIntegerField(
+        blank=True, null=True,
+        help_text="Jours disponibles par employé et par an (vide = nombre_jours_max)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -279,6 +427,9 @@ class TypeConge(models.Model):
     def __str__(self):
         return self.nom
 
+    def droit(self):
+        return self.droit_annuel if self.droit_annuel is not None else self.nombre_jours_max
+
 
 class Conge(models.Model):
     STATUS_CHOICES = [
@@ -304,6 +455,7 @@ class Conge(models.Model):
     motif = models.TextField()
     justificatif = models.FileField(
         upload_to='justificatifs_conge/',
+        storage=stockage_medias,
         blank=True,
         null=True,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'png'])]
@@ -315,6 +467,13 @@ class Conge(models.Model):
         ordering = ['-date_creation']
         verbose_name = 'Congé'
         verbose_name_plural = 'Congés'
+        indexes = [
+            # Cycle de vie des congés approuvés (voir conges.py)
+            models.Index(fields=['status_conge', 'date_debut', 'date_fin'], name='conge_cycle_idx'),
+            models.Index(fields=['employer', '-date_debut', '-id'], name='conge_chrono_idx'),
+        ]
+
+    MESSAGE_CHEVAUCHEMENT = "Ce congé chevauche un autre congé déjà approuvé pour cet employé."
 
     def __str__(self):
         return f"Congé {self.employer} - {self.status_conge} ({self.type_conge})"
@@ -337,34 +496,70 @@ class Conge(models.Model):
                 f"Le nombre de jours pour ce type de congé ne peut pas dépasser {self.type_conge.nombre_jours_max}."
             )
 
-        # Vérification chevauchement avec d'autres congés approuvés
-        chevauchements = Conge.objects.filter(
-            employer=self.employer,
-            status_conge='approuve',
-            date_debut__lte=self.date_fin,
-            date_fin__gte=self.date_debut
-        )
-        if self.pk:
-            chevauchements = chevauchements.exclude(pk=self.pk)
-        if chevauchements.exists():
-            raise ValidationError("Ce congé chevauche un autre congé déjà approuvé pour cet employé.")
+        # Chevauchement avec d'autres congés approuvés ou terminés, vérifié dès la demande
+        # (index conge_chrono_idx). Un congé décompté est couvert sous PostgreSQL par la
+        # contrainte d'exclusion (migration 0013) : la requête n'est alors pas faite.
+        if self.status_conge not in soldes.STATUTS_COMPTES or connection.vendor != 'postgresql':
+            chevauchements = Conge.objects.filter(
+                employer=self.employer,
+                status_conge__in=soldes.STATUTS_COMPTES,
+                date_debut__lte=self.date_fin,
+                date_fin__gte=self.date_debut
+            )
+            if self.pk:
+                chevauchements = chevauchements.exclude(pk=self.pk)
+            if chevauchements.exists():
+                raise ValidationError(self.MESSAGE_CHEVAUCHEMENT)
+
+    CHAMPS_SOLDE = ('employer_id', 'type_conge_id', 'status_conge', 'date_debut', 'date_fin')
+
+    def contribution_solde(self):
+        return soldes.contribution(*(getattr(self, champ) for champ in self.CHAMPS_SOLDE))
+
+    def _contribution_enregistree(self):
+        """
+        Contribution de la ligne en base (voir soldes.py), relue et verrouillée
+        dans la transaction courante : deux approbations simultanées du même
+        congé ne comptent ses jours qu'une fois.
+        """
+        if self._state.adding:
+            return {}
+        ligne = Conge.objects.select_for_update().filter(pk=self.pk).values_list(*self.CHAMPS_SOLDE).first()
+        return soldes.contribution(*ligne) if ligne else {}
 
     def save(self, *args, **kwargs):
         self.clean()  # assure que les validations sont appliquées
-        super().save(*args, **kwargs)
+        # Le statut de l'employé et le passage à 'termine' relèvent de traiter_conges (conges.py)
+        with transaction.atomic():
+            avant = self._contribution_enregistree()
+            with violation_exclusion('conge_sans_chevauchement', ValidationError(self.MESSAGE_CHEVAUCHEMENT)):
+                super().save(*args, **kwargs)
+            soldes.appliquer(soldes.difference(avant, self.contribution_solde()))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            soldes.appliquer(soldes.difference(self._contribution_enregistree(), {}))
+            return super().delete(*args, **kwargs)
+
+class SoldeConge(models.Model):
+    """Registre des jours de congé pris par employé, type et année (voir soldes.py)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    employer = models.ForeignKey('Employer', on_delete=models.CASCADE, related_name='soldes_conge')
+    type_conge = models.ForeignKey('TypeConge', on_delete=models.CASCADE, related_name='soldes')
+    annee = models.PositiveSmallIntegerField()
+    jours_pris = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Solde de congé'
+        verbose_name_plural = 'Soldes de congés'
+        constraints = [
+            models.UniqueConstraint(fields=['employer', 'type_conge', 'annee'], name='solde_conge_unique'),
+        ]
 
-        # Gestion du status employé
-        if self.status_conge == 'approuve':
-            self.employer.status_employer = 'conge'
-            self.employer.save(update_fields=['status_employer'])
+    def __str__(self):
+        return f"{self.employer_id} - {self.type_conge_id} ({self.annee}) : {self.jours_pris} j"
 
-        # Vérifie si le congé est terminé
-        today = timezone.now().date()
-        if self.status_conge == 'approuve' and self.date_fin < today:
-            self.status_conge = 'termine'
-            self.save(update_fields=['status_conge'])
-            self.employer.status_employer = 'actif'
-            self.employer.save(update_fields=['status_employer'])
 
 class TypeContrat(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -431,6 +626,13 @@ class Contrat(models.Model):
         ordering = ['-date_debut_contrat']
         verbose_name = 'Contrat'
         verbose_name_plural = 'Contrats'
+        indexes = [
+            # Export des salaires par employé pour la paie (ContratViewSet.salaires)
+            models.Index(fields=['status_contrat', 'employer', '-date_debut_contrat'], name='contrat_paie_idx'),
+            models.Index(fields=['employer', '-date_debut_contrat', '-id'], name='contrat_chrono_idx'),
+        ]
+
+    MESSAGE_CHEVAUCHEMENT = "Cet employé a déjà un contrat de travail actif pendant cette période."
 
     def __str__(self):
         type_nom = self.type_contrat.nom_type if self.type_contrat else "Type inconnu"
@@ -454,19 +656,22 @@ class Contrat(models.Model):
                         f"pour ce type ({self.type_contrat.duree_max_jours} jours)."
                     )
 
-        # Vérifier chevauchement des contrats actifs uniquement pour les contrats d’emploi
-        if self.nature_contrat == 'emploi':
+        # Vérifier chevauchement avec les contrats d’emploi actifs. Un contrat actif est
+        # couvert sous PostgreSQL par la contrainte d'exclusion (migration 0013).
+        if self.nature_contrat == 'emploi' and (
+                self.status_contrat != 'actif' or connection.vendor != 'postgresql'):
             chevauchements = Contrat.objects.filter(
+                models.Q(date_fin_contrat__isnull=True) | models.Q(date_fin_contrat__gte=self.date_debut_contrat),
                 employer=self.employer,
                 status_contrat='actif',
                 nature_contrat='emploi',
-                date_debut_contrat__lte=self.date_fin_contrat or date.max,
-                date_fin_contrat__gte=self.date_debut_contrat
             )
+            if self.date_fin_contrat:
+                chevauchements = chevauchements.filter(date_debut_contrat__lte=self.date_fin_contrat)
             if self.pk:
                 chevauchements = chevauchements.exclude(pk=self.pk)
             if chevauchements.exists():
-                raise ValueError("Cet employé a déjà un contrat de travail actif pendant cette période.")
+                raise ValueError(self.MESSAGE_CHEVAUCHEMENT)
 
     def save(self, *args, **kwargs):
         self.clean()
@@ -475,7 +680,8 @@ class Contrat(models.Model):
         if self.date_fin_contrat and self.date_fin_contrat < timezone.now().date():
             self.status_contrat = 'expire'
 
-        super().save(*args, **kwargs)
+        with violation_exclusion('contrat_emploi_sans_chevauchement', ValueError(self.MESSAGE_CHEVAUCHEMENT)):
+            super().save(*args, **kwargs)
         
 
 
@@ -493,6 +699,12 @@ class Location(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Première échéance des loyers : campagnes (paiements.py) et charges récurrentes (charges.py)
+            models.Index(fields=['date_echeance'], name='location_echeance_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nom} ({self.type_location})"
 
@@ -541,11 +753,23 @@ class Payement(models.Model):
     location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True, related_name='payements')
     electricite = models.ForeignKey(Electricite, on_delete=models.SET_NULL, null=True, blank=True, related_name='payements')
     contrat = models.ForeignKey('Contrat', on_delete=models.SET_NULL, null=True, blank=True, related_name='payements')
+    # Échéance couverte (loyer ou électricité d'une campagne, voir paiements.py)
+    echeance = models.DateField(null=True, blank=True)
+    # Charge réglée par ce paiement (même référence LOY-/ELE-) ; une charge n'a qu'un paiement
+    charge = models.OneToOneField(
+        'Charge', on_delete=models.SET_NULL, null=True, blank=True, related_name='payement'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-date_payement']
+        indexes = [
+            # Chronologie d'un employé, via ses contrats (voir chronologie.py)
+            models.Index(fields=['contrat', '-date_payement', '-id'], name='payement_chrono_idx'),
+            # Paiements d'une campagne à régler
+            models.Index(fields=['status', 'echeance'], name='payement_echeance_idx'),
+        ]
 
     def __str__(self):
         return f"Paiement {self.reference} - {self.montant}"
@@ -556,16 +780,10 @@ class Payement(models.Model):
             raise ValidationError("Un paiement doit être lié à au moins une chose à payer (Location, Electricité ou Contrat).")
 
     def save(self, *args, **kwargs):
-        # Calcul automatique du montant si non précisé
+        # Calcul automatique du montant si non précisé (une requête pour les trois objets payés)
         if not self.montant:
-            total = Decimal('0.00')
-            if self.location:
-                total += self.location.montant
-            if self.electricite:
-                total += self.electricite.montant
-            if self.contrat:
-                total += self.contrat.salaire  # ou autre champ correspondant
-            self.montant = total
+            from .paiements import montant_du
+            self.montant = montant_du(self.location_id, self.electricite_id, self.contrat_id)
 
         # Référence automatique
         if not self.reference:
@@ -627,6 +845,8 @@ class Demande(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='en_attente')
     date_demande = models.DateTimeField(auto_now_add=True)
     payements = models.ManyToManyField(Payement, related_name='demandes', blank=True)
+    # Somme des achats (montant × nombre), tenue à jour par trigger sous PostgreSQL (voir demandes.py)
+    total_achats = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -636,17 +856,107 @@ class Demande(models.Model):
     def __str__(self):
         return f"Demande {self.id} - {self.montant_total()}"
 
-    # Calcul automatique du montant total des achats liés
+    def save(self, *args, **kwargs):
+        # total_achats appartient au trigger : une ligne existante ne le réécrit jamais
+        # depuis la valeur chargée (un achat ajouté entre-temps serait perdu)
+        if not self._state.adding and not kwargs.get('force_insert'):
+            champs = kwargs.get('update_fields')
+            if champs is None:
+                champs = [champ.name for champ in self._meta.concrete_fields if not champ.primary_key]
+            kwargs['update_fields'] = [champ for champ in champs if champ != 'total_achats']
+        super().save(*args, **kwargs)
+
+    # Montant total des achats liés : annotation, colonne dénormalisée ou agrégat SQL
     def montant_total(self):
-        return sum([achat.montant * achat.nombre for achat in self.achats.all()])
+        if 'montant' in self.__dict__:
+            return self.montant
+        if connection.vendor == 'postgresql':
+            return self.total_achats
+        return self.achats.aggregate(total=MONTANT_ACHATS)['total'] or Decimal('0.00')
 
     # Vérifie si tous les paiements sont complétés et met à jour le statut
     def update_status(self):
-        payements = getattr(self, 'payements', [])
-        if payements.exists() and all(p.status == 'complete' for p in payements.all()):
-            self.status = 'approuve'
-        elif payements.exists() and any(p.status == 'echoue' for p in payements.all()):
-            self.status = 'refuse'
-        else:
-            self.status = 'en_cours'
-        self.save()
+        decompte = self.payements.aggregate(
+            total=models.Count('id'),
+            completes=models.Count('id', filter=models.Q(status='complete')),
+            echoues=models.Count('id', filter=models.Q(status='echoue')),
+        )
+        self.status = statut_selon_paiements(**decompte)
+        self.save(update_fields=['status', 'updated_at'])
+
+
+# -------------------- Charges récurrentes (voir charges.py) --------------------
+class LotCharges(models.Model):
+    """Envoi groupé de charges à finance (une ValidationDemande par charge)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    debut = models.DateField()
+    fin = models.DateField()
+    nombre = models.PositiveIntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Lot de charges'
+        verbose_name_plural = 'Lots de charges'
+
+    def __str__(self):
+        return f"Lot {self.debut} → {self.fin} ({self.nombre} charge(s))"
+
+
+class Charge(models.Model):
+    """Échéance d'un loyer ou d'un compteur d'électricité, matérialisée par le planificateur."""
+    TYPE_CHOICES = [
+        ('location', 'Location'),
+        ('electricite', 'Électricité'),
+    ]
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('approuve', 'Approuvé'),
+        ('rejete', 'Rejeté'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # LOY-/ELE-AAAAMMJJ-<id> : une charge par objet et par échéance
+    reference = models.CharField(max_length=100, unique=True)
+    type_charge = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, null=True, blank=True, related_name='charges')
+    electricite = models.ForeignKey(
+        Electricite, on_delete=models.CASCADE, null=True, blank=True, related_name='charges'
+    )
+    echeance = models.DateField()
+    montant = models.DecimalField(max_digits=12, decimal_places=2)
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    # Lot d'envoi à finance ; vide tant que la charge n'est pas transmise
+    lot = models.ForeignKey(LotCharges, on_delete=models.SET_NULL, null=True, blank=True, related_name='charges')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['echeance']
+        verbose_name = 'Charge'
+        verbose_name_plural = 'Charges'
+        indexes = [
+            models.Index(fields=['echeance'], name='charge_echeance_idx'),
+            # Index partiel : seules les charges à transmettre sont parcourues
+            models.Index(fields=['echeance'], name='charge_a_transmettre_idx',
+                         condition=models.Q(lot__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.reference} - {self.montant}"
+
+
+# ============================================================
+# 📨 Outbox transactionnelle et bus d'événements (voir commun/events.py)
+# ============================================================
+class EvenementOutbox(EvenementOutboxBase):
+    pass
+
+
+class EvenementConsomme(EvenementConsommeBase):
+    pass
+
+
+class CurseurConsommateur(CurseurConsommateurBase):
+    pass
@@ -0,0 +1,119 @@
+"""
+💸 Campagnes de paiement : loyers et électricité.
+
+- generer_echeances(debut, fin) : un paiement 'en_attente' par charge (loyer ou
+  électricité, échéances mensuelles de charges.py) de la période, matérialisée
+  au besoin. Le paiement est lié à sa charge et en reprend la référence
+  (LOY-/ELE-AAAAMMJJ-<id>) et le montant ; les charges de la période sont lues
+  en une requête jointe à leur paiement, un bulk_create pour l'écriture :
+  relancer une période ne crée rien de plus.
+- completer_lot(ids) : passe des centaines de paiements à 'complete' en un
+  UPDATE, puis recalcule le statut des demandes liées en un UPDATE groupé
+  (demandes.recalculer_statuts).
+"""
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .demandes import recalculer_statuts
+from .models import Charge, Contrat, Demande, Electricite, Location, Payement
+
+# Statuts depuis lesquels un paiement peut être complété
+COMPLETABLES = {'en_attente', 'echoue'}
+
+
+def reference_echeance(prefixe, echeance, pk):
+    return f"{prefixe}-{echeance:%Y%m%d}-{pk.hex.upper()}"
+
+
+def montant_du(location_id=None, electricite_id=None, contrat_id=None):
+    """Montant à payer pour ces objets (loyer + électricité + salaire), en une requête UNION ALL."""
+    parties = []
+    if location_id:
+        parties.append(Location.objects.filter(pk=location_id).values_list('montant'))
+    if electricite_id:
+        parties.append(Electricite.objects.filter(pk=electricite_id).values_list('montant'))
+    if contrat_id:
+        parties.append(Contrat.objects.filter(pk=contrat_id).values_list('salaire'))
+    if not parties:
+        return Decimal('0.00')
+    requete = parties[0].order_by().union(*(p.order_by() for p in parties[1:]), all=True)
+    return sum((montant for montant, in requete), Decimal('0.00'))
+
+
+def generer_echeances(debut, fin, mode_payement_id=None):
+    """
+    Paiements dus entre `debut` et `fin` (dates incluses), un par charge de la
+    période sans paiement (charges matérialisées au besoin).
+    Retourne {'crees', 'existants', 'montant_total'} (montant des paiements créés).
+    """
+    from .charges import charges_dues, enregistrer_charges
+
+    champs = ('id', 'reference', 'location_id', 'electricite_id', 'echeance', 'montant', 'payement__id')
+    charges = list(Charge.objects.filter(echeance__range=(debut, fin)).values_list(*champs))
+    connues = {ligne[1] for ligne in charges}
+    nouvelles = [charge for charge in charges_dues(debut, fin) if charge.reference not in connues]
+    if nouvelles:
+        # Relues après création : une charge créée en parallèle garde son propre id
+        enregistrer_charges(nouvelles)
+        charges += Charge.objects.filter(reference__in=[charge.reference for charge in nouvelles]).values_list(*champs)
+    dus, existants = [], 0
+    for pk, reference, location_id, electricite_id, echeance, montant, payement_id in charges:
+        if payement_id:
+            existants += 1
+            continue
+        dus.append(Payement(
+            charge_id=pk, reference=reference, location_id=location_id, electricite_id=electricite_id,
+            echeance=echeance, montant=montant, mode_payement_id=mode_payement_id,
+        ))
+    # ignore_conflicts : une campagne lancée deux fois en parallèle ne double aucun paiement
+    Payement.objects.bulk_create(dus, batch_size=500, ignore_conflicts=True)
+    # Seules les lignes réellement insérées portent l'id choisi ici
+    crees = list(Payement.objects.filter(pk__in=[p.pk for p in dus]).values_list('montant', flat=True)) if dus else []
+    return {
+        'crees': len(crees),
+        'existants': existants + len(dus) - len(crees),
+        'montant_total': sum(crees, Decimal('0.00')),
+    }
+
+
+def _uuid(valeur):
+    try:
+        return uuid.UUID(str(valeur))
+    except (TypeError, ValueError):
+        return None
+
+
+def completer_lot(ids, mode_payement_id=None):
+    """
+    Complète une liste de paiements. Retourne (résultats dans l'ordre reçu,
+    nombre de demandes dont le statut a été recalculé).
+    """
+    cles = [_uuid(pk) for pk in ids]
+    with transaction.atomic():
+        statuts = dict(
+            Payement.objects.filter(pk__in=[cle for cle in cles if cle]).select_for_update()
+            .values_list('id', 'status')
+        )
+        eligibles = [pk for pk, statut in statuts.items() if statut in COMPLETABLES]
+        demandes = 0
+        if eligibles:
+            champs = {'status': 'complete', 'updated_at': timezone.now()}
+            if mode_payement_id:
+                champs['mode_payement_id'] = mode_payement_id
+            Payement.objects.filter(pk__in=eligibles).update(**champs)
+            liees = Demande.payements.through.objects.filter(payement_id__in=eligibles).values('demande_id')
+            demandes = recalculer_statuts(Demande.objects.filter(pk__in=liees))
+
+    resultats = []
+    for pk, cle in zip(ids, cles):
+        if cle not in statuts:
+            resultats.append({'id': pk, 'resultat': 'erreur', 'detail': 'Paiement introuvable.'})
+        elif statuts[cle] not in COMPLETABLES:
+            resultats.append({'id': pk, 'resultat': 'erreur',
+                              'detail': f"Paiement '{statuts[cle]}' : passage à 'complete' impossible."})
+        else:
+            resultats.append({'id': pk, 'resultat': 'ok', 'status': 'complete'})
+    return resultats, demandes
@@ -0,0 +1,23 @@
+# ============================================
+# 📁 rh_service/permissions.py
+# ============================================
+from rest_framework import permissions
+
+from .medias import chemin_media, verifier_signature
+
+
+# ============================================================
+# 🔗 Liens de médias signés
+# ============================================================
+class LienMediaSigne(permissions.BasePermission):
+    """Utilisateur authentifié, ou lien signé (expire, signature) encore valable pour ce média."""
+    message = "Lien de média expiré ou invalide."
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return True
+        return verifier_signature(
+            chemin_media(view.kwargs.get('chemin')),
+            request.query_params.get('expire'),
+            request.query_params.get('signature'),
+        )
@@ -0,0 +1,140 @@
+"""
+🔎 Recherche d'employés floue et indexée.
+
+Sous PostgreSQL (migration 0017), deux colonnes de rh_employer tenues à jour
+par trigger à partir du nom, du prénom, de l'email et de la fonction :
+
+- texte_recherche : texte en minuscules sans accents, index GIN pg_trgm ;
+- vecteur_recherche : tsvector pondéré (nom/prénom A, fonction B, email C).
+
+Une recherche combine les deux : préfixes des mots via le tsvector
+(« rako he » → rako:* & he:*) ou similarité de trigrammes stricte par mot
+(<<%, variantes d'orthographe : « Rakotomalal », « Andrianavalona »…), classée par
+ts_rank + word_similarity. Les deux conditions passent par leur index GIN.
+
+Ailleurs (SQLite des benchmarks), la liste retombe sur le SearchFilter de DRF
+et l'autocomplétion classe en Python des candidats filtrés par préfixe.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Budget de l'autocomplétion : au-delà, la requête est annulée par PostgreSQL
+BUDGET_MS = 150
+# SQLSTATE query_canceled : levé par statement_timeout
+ANNULATION_DELAI = '57014'
+LIMITE_MAX = 50
+
+
+def normaliser(texte):
+    """Minuscules sans accents (équivalent Python de lower(unaccent(...)))."""
+    decompose = unicodedata.normalize('NFKD', texte or '')
+    return ''.join(c for c in decompose if not unicodedata.combining(c)).lower()
+
+
+def requete_prefixes(terme):
+    """tsquery 'mot1:* & mot2:*' des mots du terme, '' s'il n'en contient aucun."""
+    return ' & '.join(f"{mot}:*" for mot in re.findall(r'\w+', normaliser(terme)))
+
+
+def _conditions(table, terme, tsquery):
+    correspond = RawSQL(
+        f"({table}.vecteur_recherche @@ to_tsquery('simple', %s) "
+        f"OR lower(unaccent(%s)) <<%% {table}.texte_recherche)",
+        [tsquery, terme], output_field=BooleanField(),
+    )
+    score = RawSQL(
+        f"ts_rank({table}.vecteur_recherche, to_tsquery('simple', %s)) "
+        f"+ word_similarity(lower(unaccent(%s)), {table}.texte_recherche)",
+        [tsquery, terme], output_field=FloatField(),
+    )
+    return correspond, score
+
+
+def rechercher(queryset, terme):
+    """Employés du queryset correspondant au terme, du plus pertinent au moins pertinent (PostgreSQL)."""
+    tsquery = requete_prefixes(terme)
+    if not tsquery:
+        return queryset.none()
+    correspond, score = _conditions(queryset.model._meta.db_table, terme, tsquery)
+    return queryset.filter(correspond).annotate(score_recherche=score).order_by('-score_recherche', 'nom_employer')
+
+
+class RechercheEmployeFilter(filters.SearchFilter):
+    """`?search=` classé par pertinence sous PostgreSQL ; SearchFilter (ILIKE) ailleurs."""
+
+    def filter_queryset(self, request, queryset, view):
+        terme = request.query_params.get(self.search_param, '').strip()
+        if not terme or connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+        return rechercher(queryset, terme)
+
+
+# ============================================================
+# ⌨️ Autocomplétion
+# ============================================================
+CHAMPS_SUGGESTION = ('id', 'nom_employer', 'prenom_employer', 'email', 'fonction__nom_fonction')
+
+
+def _suggestion(ligne, score):
+    pk, nom, prenom, email, fonction = ligne
+    return {
+        'id': pk, 'nom_employer': nom, 'prenom_employer': prenom, 'email': email,
+        'fonction': fonction, 'score': round(score, 4),
+    }
+
+
+def suggestions(terme, limite=10):
+    """
+    Les `limite` meilleurs employés pour une saisie en cours, en une requête.
+    Retourne {'resultats': [...], 'tronque': bool} ; tronque = budget dépassé.
+    """
+    from .models import Employer
+
+    limite = max(1, min(limite, LIMITE_MAX))
+    tsquery = requete_prefixes(terme)
+    if not tsquery:
+        return {'resultats': [], 'tronque': False}
+
+    if connection.vendor != 'postgresql':
+        return {'resultats': _suggestions_sans_index(Employer, terme, limite), 'tronque': False}
+
+    correspond, score = _conditions(Employer._meta.db_table, terme, tsquery)
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [f"{BUDGET_MS}ms"])
+            lignes = list(
+                Employer.objects.filter(correspond).annotate(score_recherche=score)
+                .order_by('-score_recherche', 'nom_employer')
+                .values_list(*CHAMPS_SUGGESTION, 'score_recherche')[:limite]
+            )
+    except OperationalError as erreur:
+        # statement_timeout : une autocomplétion lente ne sert plus à rien, réponse vide signalée
+        if getattr(erreur.__cause__, 'pgcode', None) != ANNULATION_DELAI:
+            raise
+        return {'resultats': [], 'tronque': True}
+    return {'resultats': [_suggestion(ligne[:-1], ligne[-1]) for ligne in lignes], 'tronque': False}
+
+
+def _suggestions_sans_index(Employer, terme, limite):
+    """Candidats par préfixe de chaque mot (ILIKE), classés en Python par similarité."""
+    mots = set(re.findall(r'\w+', terme)) | set(re.findall(r'\w+', normaliser(terme)))
+    filtre = Q()
+    for mot in mots:
+        filtre |= Q(nom_employer__istartswith=mot) | Q(prenom_employer__istartswith=mot) | Q(email__istartswith=mot)
+    cible = normaliser(terme)
+    candidats = Employer.objects.filter(filtre).values_list(*CHAMPS_SUGGESTION)[:LIMITE_MAX * 10]
+    classes = sorted(
+        (
+            (SequenceMatcher(None, cible, normaliser(f"{ligne[1]} {ligne[2]}")).ratio(), ligne)
+            for ligne in candidats
+        ),
+        key=lambda paire: (-paire[0], paire[1][1]),
+    )
+    return [_suggestion(ligne, score) for score, ligne in classes[:limite]]
@@ -3,10 +3,23 @@ from .models import (
     District, Commune, Fokontany, Fonction, Affectation,
     Employer, TypeConge, Conge, TypeContrat, Contrat, Location,
     Electricite, ModePayement, Demande, Payement,
-    TypeAchat, Achat
+    TypeAchat, Achat, Televersement
 )
 from django.utils import timezone
 
+from .medias import stockage_medias
+from .televersements import fichier_televerse
+
+
+def fichiers_televerses(serializer, attrs, champs):
+    """Remplace `<champ>_televersement_id` par le fichier du téléversement terminé de l'utilisateur."""
+    for champ in champs:
+        televersement_id = attrs.pop(f'{champ}_televersement_id', None)
+        if televersement_id:
+            proprietaire = str(serializer.context['request'].user.id)
+            attrs[champ] = fichier_televerse(televersement_id, champ, proprietaire)
+    return attrs
+
 
 class DistrictSerializer(serializers.ModelSerializer):
     class Meta:
@@ -57,22 +70,42 @@ class EmployerSerializer(serializers.ModelSerializer):
     )
     photo_profil = serializers.ImageField(required=False, allow_null=True, allow_empty_file=True)
     cv = serializers.FileField(required=False, allow_null=True, allow_empty_file=True)
+    # {taille: {format: url}} ; null tant que le worker n'a pas généré les vignettes
+    photo_vignettes = serializers.SerializerMethodField()
+    # Fichiers envoyés par téléversement avec reprise (televersements/)
+    photo_profil_televersement_id = serializers.UUIDField(write_only=True, required=False)
+    cv_televersement_id = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = Employer
         fields = [
             'id', 'nom_employer', 'prenom_employer', 'date_naissance', 'status_employer',
             'date_entree', 'email', 'telephone', 'adresse',
-            'photo_profil', 'cv', 'diplome', 'domaine_etude',
+            'photo_profil', 'photo_vignettes', 'cv', 'photo_profil_televersement_id', 'cv_televersement_id',
+            'diplome', 'domaine_etude',
             'fonction', 'fonction_id', 'district', 'district_id',
             'created_at', 'updated_at'
         ]
 
+    def get_photo_vignettes(self, obj):
+        if not obj.photo_vignettes:
+            return None
+        stockage = stockage_medias()
+        request = self.context.get('request')
+        url = request.build_absolute_uri if request else (lambda chemin: chemin)
+        return {
+            taille: {format_: url(stockage.url(nom)) for format_, nom in formats.items()}
+            for taille, formats in obj.photo_vignettes.items()
+        }
+
     def validate_status_employer(self, value):
         if value not in dict(Employer.STATUS_CHOICES):
             raise serializers.ValidationError("Status invalide")
         return value
 
+    def validate(self, attrs):
+        return fichiers_televerses(self, attrs, ['photo_profil', 'cv'])
+
 
 
 class AffectationSerializer(serializers.ModelSerializer):
@@ -124,13 +157,14 @@ class AffectationSerializer(serializers.ModelSerializer):
 class TypeCongeSerializer(serializers.ModelSerializer):
     class Meta:
         model = TypeConge
-        fields = ['id', 'nom', 'description', 'nombre_jours_max', 'created_at', 'updated_at']
+        fields = ['id', 'nom', 'description', 'nombre_jours_max', 'droit_annuel', 'created_at', 'updated_at']
 
 class CongeSerializer(serializers.ModelSerializer):
     employer = EmployerSerializer(read_only=True)
     employer_id = serializers.UUIDField(write_only=True)
     type_conge = TypeCongeSerializer(read_only=True)
     type_conge_id = serializers.UUIDField(write_only=True)
+    justificatif_televersement_id = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = Conge
@@ -145,6 +179,7 @@ class CongeSerializer(serializers.ModelSerializer):
             'nombre_jours',
             'motif',
             'justificatif',
+            'justificatif_televersement_id',
             'created_at',
             'updated_at',
         ]
@@ -171,7 +206,7 @@ class CongeSerializer(serializers.ModelSerializer):
                     f"Le nombre de jours dépasse le maximum autorisé pour ce type de congé ({type_conge.nombre_jours_max})."
                 )
 
-        return data
+        return fichiers_televerses(self, data, ['justificatif'])
 
     def create(self, validated_data):
         employer_id = validated_data.pop('employer_id')
@@ -198,6 +233,19 @@ class CongeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class TeleversementSerializer(serializers.ModelSerializer):
+    termine = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Televersement
+        fields = ['id', 'champ', 'nom_fichier', 'taille', 'recu', 'type_contenu', 'fichier', 'termine',
+                  'created_at', 'updated_at']
+        read_only_fields = ['recu', 'type_contenu', 'fichier', 'created_at', 'updated_at']
+
+    def get_termine(self, obj):
+        return bool(obj.fichier)
+
+
 class TypeContratSerializer(serializers.ModelSerializer):
     class Meta:
         model = TypeContrat
@@ -220,14 +268,11 @@ class ContratSerializer(serializers.ModelSerializer):
 
 
 class LocationSerializer(serializers.ModelSerializer):
-    affectation = AffectationSerializer(read_only=True)
-    affectation_id = serializers.UUIDField(write_only=True)
-
     class Meta:
         model = Location
         fields = [
-            'id', 'adresse', 'ville', 'code_postal',
-            'affectation', 'affectation_id', 'created_at', 'updated_at'
+            'id', 'nom', 'type_location', 'description', 'adresse', 'ville', 'code_postal',
+            'montant', 'date_echeance', 'created_at', 'updated_at'
         ]
 
 
@@ -238,7 +283,7 @@ class ElectriciteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Electricite
         fields = [
-            'id', 'numero_compteur', 'fournisseur',
+            'id', 'numero_compteur', 'fournisseur', 'montant',
             'location', 'location_id', 'created_at', 'updated_at'
         ]
 
@@ -251,35 +296,47 @@ class ModePayementSerializer(serializers.ModelSerializer):
 
 
 class DemandeSerializer(serializers.ModelSerializer):
-    employer = EmployerSerializer(read_only=True)
-    employer_id = serializers.UUIDField(write_only=True)
+    # Annotations de demandes.avec_totaux() (calculées en SQL par DemandeViewSet)
+    montant = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    nb_payements = serializers.IntegerField(read_only=True)
+    nb_payements_completes = serializers.IntegerField(read_only=True)
+    nb_payements_echoues = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Demande
         fields = [
             'id', 'description', 'montant', 'status', 'date_demande',
-            'employer', 'employer_id', 'created_at', 'updated_at'
+            'nb_payements', 'nb_payements_completes', 'nb_payements_echoues',
+            'created_at', 'updated_at'
         ]
 
 
 class PayementSerializer(serializers.ModelSerializer):
     mode_payement = ModePayementSerializer(read_only=True)
     mode_payement_id = serializers.UUIDField(write_only=True, required=False, allow_null=True)
-    demande = DemandeSerializer(read_only=True)
-    demande_id = serializers.UUIDField(write_only=True, required=False, allow_null=True)
+    location = LocationSerializer(read_only=True)
+    location_id = serializers.UUIDField(write_only=True, required=False, allow_null=True)
     electricite = ElectriciteSerializer(read_only=True)
     electricite_id = serializers.UUIDField(write_only=True, required=False, allow_null=True)
+    contrat_id = serializers.UUIDField(required=False, allow_null=True)
 
     class Meta:
         model = Payement
         fields = [
-            'id', 'montant', 'date_payement', 'status', 'reference',
-            'mode_payement', 'mode_payement_id', 'demande', 'demande_id',
-            'electricite', 'electricite_id',
+            'id', 'montant', 'date_payement', 'status', 'reference', 'echeance',
+            'mode_payement', 'mode_payement_id', 'location', 'location_id',
+            'electricite', 'electricite_id', 'contrat_id',
             'created_at', 'updated_at'
         ]
 
 
+class ModePayementLotSerializer(serializers.Serializer):
+    """mode_payement_id facultatif des campagnes et règlements par lot, vérifié avant les écritures groupées."""
+    mode_payement_id = serializers.PrimaryKeyRelatedField(
+        queryset=ModePayement.objects.all(), required=False, allow_null=True
+    )
+
+
 class TypeAchatSerializer(serializers.ModelSerializer):
     class Meta:
         model = TypeAchat
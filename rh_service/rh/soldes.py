@@ -0,0 +1,168 @@
+"""
+📒 Soldes de congés par (employé, type de congé, année).
+
+Chaque congé approuvé ou terminé compte ses jours dans l'année où ils tombent
+(un congé à cheval sur deux années est réparti). Les transitions de statut et
+les changements de dates appliquent au registre SoldeConge la différence entre
+l'ancienne et la nouvelle contribution du congé, dans la même transaction :
+lire un solde est une lecture de ligne, sans somme sur l'historique.
+
+`reconstruire` recalcule une année entière en une agrégation groupée.
+"""
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, DurationField, ExpressionWrapper, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+# Statuts dont les jours sont décomptés du solde
+STATUTS_COMPTES = ('approuve', 'termine')
+
+
+def jours_par_annee(debut, fin):
+    """{annee: jours} de la période [debut, fin] (bornes incluses)."""
+    jours = {}
+    for annee in range(debut.year, fin.year + 1):
+        premier = max(debut, date(annee, 1, 1))
+        dernier = min(fin, date(annee, 12, 31))
+        jours[annee] = (dernier - premier).days + 1
+    return jours
+
+
+def contribution(employer_id, type_conge_id, status_conge, debut, fin):
+    """{(employer_id, type_conge_id, annee): jours} décomptés pour un congé dans cet état."""
+    if status_conge not in STATUTS_COMPTES or type_conge_id is None or not debut or not fin or debut > fin:
+        return {}
+    return {
+        (employer_id, type_conge_id, annee): jours
+        for annee, jours in jours_par_annee(debut, fin).items()
+    }
+
+
+def difference(avant, apres):
+    """Mouvements à appliquer pour passer de la contribution `avant` à `apres`."""
+    mouvements = dict(apres)
+    for cle, jours in avant.items():
+        mouvements[cle] = mouvements.get(cle, 0) - jours
+    return {cle: jours for cle, jours in mouvements.items() if jours}
+
+
+def cumuler(*contributions):
+    total = {}
+    for mouvements in contributions:
+        for cle, jours in mouvements.items():
+            total[cle] = total.get(cle, 0) + jours
+    return {cle: jours for cle, jours in total.items() if jours}
+
+
+def appliquer(mouvements):
+    """
+    Ajoute les mouvements au registre : lignes manquantes créées (ignore_conflicts),
+    puis un seul UPDATE jours_pris = jours_pris + CASE … (incrément atomique).
+    À appeler dans la transaction qui modifie les congés.
+    """
+    from .models import SoldeConge
+
+    if not mouvements:
+        return
+    SoldeConge.objects.bulk_create(
+        [
+            SoldeConge(employer_id=employer_id, type_conge_id=type_conge_id, annee=annee)
+            for employer_id, type_conge_id, annee in mouvements
+        ],
+        ignore_conflicts=True,
+    )
+    cles = [
+        Q(employer_id=employer_id, type_conge_id=type_conge_id, annee=annee)
+        for employer_id, type_conge_id, annee in mouvements
+    ]
+    filtre = Q()
+    for cle in cles:
+        filtre |= cle
+    SoldeConge.objects.filter(filtre).update(
+        jours_pris=F('jours_pris') + Case(
+            *[When(cle, then=Value(jours)) for cle, jours in zip(cles, mouvements.values())],
+            default=Value(0),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+# ============================================================
+# 🔎 Lecture des soldes
+# ============================================================
+def soldes(employer_ids, annee):
+    """
+    Soldes de plusieurs employés pour une année, tous types de congé compris
+    (jours_pris = 0 sans ligne au registre). Une requête sur le registre, une
+    sur les types.
+    """
+    from .models import SoldeConge, TypeConge
+
+    types = list(TypeConge.objects.order_by('nom'))
+    pris = {
+        (employer_id, type_conge_id): jours
+        for employer_id, type_conge_id, jours in SoldeConge.objects.filter(
+            employer_id__in=employer_ids, annee=annee
+        ).values_list('employer_id', 'type_conge_id', 'jours_pris')
+    }
+    return [
+        {
+            'employer_id': employer_id,
+            'soldes': [
+                {
+                    'type_conge_id': type_conge.id,
+                    'type_conge': type_conge.nom,
+                    'droit': type_conge.droit(),
+                    'jours_pris': pris.get((employer_id, type_conge.id), 0),
+                    'jours_restants': type_conge.droit() - pris.get((employer_id, type_conge.id), 0),
+                }
+                for type_conge in types
+            ],
+        }
+        for employer_id in employer_ids
+    ]
+
+
+# ============================================================
+# 🔧 Reconstruction depuis l'historique
+# ============================================================
+def reconstruire(annee):
+    """
+    Recalcule le registre d'une année : une agrégation groupée par (employé, type)
+    de la part de chaque congé compté tombant dans l'année, puis remplacement des
+    lignes de l'année. Retourne le nombre de lignes écrites.
+    """
+    from .models import Conge, SoldeConge
+
+    premier, dernier = date(annee, 1, 1), date(annee, 12, 31)
+    duree = ExpressionWrapper(
+        Least(F('date_fin'), Value(dernier)) - Greatest(F('date_debut'), Value(premier)),
+        output_field=DurationField(),
+    )
+    lignes = (
+        Conge.objects.filter(
+            status_conge__in=STATUTS_COMPTES, type_conge__isnull=False,
+            date_debut__lte=dernier, date_fin__gte=premier,
+        )
+        .values('employer_id', 'type_conge_id')
+        .annotate(ecart=Sum(duree), nombre=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Bloque les mouvements concurrents jusqu'au remplacement (lectures permises)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {SoldeConge._meta.db_table} IN EXCLUSIVE MODE")
+        soldes = [
+            SoldeConge(
+                employer_id=ligne['employer_id'], type_conge_id=ligne['type_conge_id'], annee=annee,
+                # Somme des (fin - début) + 1 jour par congé
+                jours_pris=(ligne['ecart'] or timedelta(0)).days + ligne['nombre'],
+            )
+            for ligne in lignes
+        ]
+        SoldeConge.objects.filter(annee=annee).delete()
+        SoldeConge.objects.bulk_create(soldes, batch_size=1000)
+    return len(soldes)
@@ -0,0 +1,196 @@
+"""
+🪣 Stockage S3 compatible (AWS S3, MinIO, Garage…) des médias rh.
+
+Client minimal sur `requests` signé en AWS Signature V4 : PUT en flux, GET,
+HEAD et DELETE d'objets, et URL présignées pour le téléchargement direct par
+le navigateur. Les octets ne transitent plus par rh_service : plusieurs
+réplicas peuvent servir l'API sans disque partagé.
+
+Configuration (settings / .env) : RH_S3_ENDPOINT, RH_S3_BUCKET, RH_S3_REGION,
+RH_S3_ACCESS_KEY, RH_S3_SECRET_KEY ; RH_S3_URL_PUBLIQUE si le navigateur
+atteint le stockage par une autre adresse que le service (ex. MinIO derrière
+le proxy).
+"""
+import hashlib
+import hmac
+import mimetypes
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urlsplit
+
+import requests
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+from .medias import TAILLE_BLOC, AdresseContenuMixin, fenetre_signature
+
+CONTENU_NON_SIGNE = 'UNSIGNED-PAYLOAD'
+
+
+def _hmac(cle, message):
+    return hmac.new(cle, message.encode(), hashlib.sha256).digest()
+
+
+class SignatureV4:
+    """Signature AWS V4 (service s3) des requêtes et des URL présignées."""
+
+    def __init__(self, access_key, secret_key, region):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self._cles = {}
+
+    def _cle(self, jour):
+        # Clé dérivée valable pour la journée : 4 HMAC évités par signature
+        if jour not in self._cles:
+            cle = _hmac(f"AWS4{self.secret_key}".encode(), jour)
+            for partie in (self.region, 's3', 'aws4_request'):
+                cle = _hmac(cle, partie)
+            self._cles = {jour: cle}
+        return self._cles[jour]
+
+    def _signature(self, horodatage, requete_canonique):
+        portee = f"{horodatage[:8]}/{self.region}/s3/aws4_request"
+        a_signer = '\n'.join([
+            'AWS4-HMAC-SHA256', horodatage, portee,
+            hashlib.sha256(requete_canonique.encode()).hexdigest(),
+        ])
+        return portee, hmac.new(self._cle(horodatage[:8]), a_signer.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _requete_canonique(methode, chemin, parametres, entetes, empreinte):
+        requete = '&'.join(
+            f"{quote(cle, safe='-_.~')}={quote(str(valeur), safe='-_.~')}"
+            for cle, valeur in sorted(parametres.items())
+        )
+        noms = sorted(entetes)
+        return '\n'.join([
+            methode, chemin, requete,
+            ''.join(f"{nom}:{str(entetes[nom]).strip()}\n" for nom in noms),
+            ';'.join(noms), empreinte,
+        ])
+
+    def entetes(self, methode, url, entetes=None, empreinte=CONTENU_NON_SIGNE, maintenant=None):
+        """En-têtes (Authorization compris) d'une requête signée."""
+        maintenant = maintenant or datetime.now(dt_timezone.utc)
+        horodatage = maintenant.strftime('%Y%m%dT%H%M%SZ')
+        morceaux = urlsplit(url)
+        entetes = {cle.lower(): valeur for cle, valeur in (entetes or {}).items()}
+        entetes.update({'host': morceaux.netloc, 'x-amz-date': horodatage, 'x-amz-content-sha256': empreinte})
+        parametres = dict(p.split('=', 1) if '=' in p else (p, '') for p in morceaux.query.split('&') if p)
+        canonique = self._requete_canonique(methode, morceaux.path or '/', parametres, entetes, empreinte)
+        portee, signature = self._signature(horodatage, canonique)
+        entetes['authorization'] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{portee}, "
+            f"SignedHeaders={';'.join(sorted(entetes))}, Signature={signature}"
+        )
+        del entetes['host']
+        return entetes
+
+    def url_presignee(self, methode, url, expiration, maintenant=None):
+        """URL utilisable sans en-tête d'authentification pendant `expiration` secondes."""
+        maintenant = maintenant or datetime.now(dt_timezone.utc)
+        horodatage = maintenant.strftime('%Y%m%dT%H%M%SZ')
+        morceaux = urlsplit(url)
+        parametres = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f"{self.access_key}/{horodatage[:8]}/{self.region}/s3/aws4_request",
+            'X-Amz-Date': horodatage,
+            'X-Amz-Expires': int(expiration),
+            'X-Amz-SignedHeaders': 'host',
+        }
+        canonique = self._requete_canonique(
+            methode, morceaux.path or '/', parametres, {'host': morceaux.netloc}, CONTENU_NON_SIGNE
+        )
+        _, signature = self._signature(horodatage, canonique)
+        requete = '&'.join(f"{cle}={quote(str(valeur), safe='-_.~')}" for cle, valeur in parametres.items())
+        return f"{url}?{requete}&X-Amz-Signature={signature}"
+
+
+class ErreurStockage(OSError):
+    pass
+
+
+@deconstructible
+class StockageS3(AdresseContenuMixin, Storage):
+    """Storage Django sur un bucket S3 (adressage par chemin : endpoint/bucket/nom)."""
+
+    def __init__(self, endpoint=None, bucket=None, region=None, access_key=None, secret_key=None,
+                 url_publique=None, expiration=None, session=None):
+        self.endpoint = (endpoint or settings.RH_S3_ENDPOINT).rstrip('/')
+        self.bucket = bucket or settings.RH_S3_BUCKET
+        self.url_publique = (url_publique or getattr(settings, 'RH_S3_URL_PUBLIQUE', '') or self.endpoint).rstrip('/')
+        self.expiration = expiration or getattr(settings, 'RH_MEDIA_URL_EXPIRATION', 3600)
+        self.signature = SignatureV4(
+            access_key or settings.RH_S3_ACCESS_KEY,
+            secret_key or settings.RH_S3_SECRET_KEY,
+            region or getattr(settings, 'RH_S3_REGION', '') or 'us-east-1',
+        )
+        self.session = session or requests.Session()
+
+    def _url(self, name, base=None):
+        return f"{base or self.endpoint}/{self.bucket}/{quote(name, safe='/-_.~')}"
+
+    def _requete(self, methode, name, entetes=None, attendus=(200,), **kwargs):
+        url = self._url(name)
+        reponse = self.session.request(
+            methode, url, headers=self.signature.entetes(methode, url, entetes), timeout=30, **kwargs
+        )
+        if reponse.status_code not in attendus:
+            raise ErreurStockage(f"S3 {methode} {name} : HTTP {reponse.status_code}")
+        return reponse
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        entetes = {'content-length': str(content.size)}
+        type_contenu = getattr(content, 'content_type', None) or mimetypes.guess_type(name)[0]
+        if type_contenu:
+            entetes['content-type'] = type_contenu
+        # Corps envoyé en flux depuis le fichier (UNSIGNED-PAYLOAD : pas de relecture pour le hacher)
+        corps = content.file if hasattr(content, 'file') and content.file is not None else content
+        self._requete('PUT', name, entetes, data=corps)
+        return name
+
+    def _open(self, name, mode='rb'):
+        reponse = self._requete('GET', name, stream=True, attendus=(200, 404))
+        if reponse.status_code == 404:
+            raise FileNotFoundError(name)
+        # Copie en flux dans un temporaire (mémoire bornée, seek possible pour Pillow et Range)
+        tampon = tempfile.SpooledTemporaryFile(max_size=TAILLE_BLOC * 16)
+        for bloc in reponse.iter_content(TAILLE_BLOC):
+            tampon.write(bloc)
+        tampon.seek(0)
+        return File(tampon, name=name)
+
+    def _tete(self, name):
+        return self._requete('HEAD', name, attendus=(200, 404))
+
+    def exists(self, name):
+        return self._tete(name).status_code == 200
+
+    def size(self, name):
+        reponse = self._tete(name)
+        if reponse.status_code == 404:
+            raise FileNotFoundError(name)
+        return int(reponse.headers['Content-Length'])
+
+    def get_modified_time(self, name):
+        reponse = self._tete(name)
+        if reponse.status_code == 404:
+            raise FileNotFoundError(name)
+        return parsedate_to_datetime(reponse.headers['Last-Modified'])
+
+    def delete(self, name):
+        self._requete('DELETE', name, attendus=(200, 204, 404))
+
+    def url(self, name):
+        # Date de signature alignée sur une fenêtre : l'URL reste stable (cache navigateur)
+        debut, expire = fenetre_signature(self.expiration)
+        return self.signature.url_presignee(
+            'GET', self._url(name, self.url_publique), expire - debut,
+            maintenant=datetime.fromtimestamp(debut, dt_timezone.utc),
+        )
@@ -0,0 +1,348 @@
+"""
+📥 Téléversement en flux des photos, CV et justificatifs.
+
+- Multipart (MultiPartTeleversementParser) : chaque morceau reçu est écrit dans
+  un fichier de transit sur le volume des médias, haché (sha256) et compté au
+  fil de l'eau ; le type réel est reconnu sur les premiers octets. Un type
+  refusé ou une taille dépassée interrompt la lecture du corps (415 / 413)
+  sans attendre la fin de l'envoi. Le stockage déplace ensuite le fichier de
+  transit sous son nom adressé par contenu (medias.py) : mémoire constante.
+- Reprise (Televersement) : POST televersements/ ouvre une session, chaque
+  PATCH ajoute un morceau à l'offset Upload-Offset, GET donne l'offset à
+  reprendre. Des requêtes courtes : un client mobile lent n'occupe pas un
+  worker pendant tout l'envoi. Chaque morceau est rangé dans le stockage des
+  médias (partagé entre réplicas), réassemblé au dernier. Une session n'est
+  visible que de son propriétaire (sub du JWT) ; le fichier terminé est
+  référencé par `<champ>_televersement_id` dans les serializers Employer et Conge.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions, status
+from rest_framework.parsers import MultiPartParser
+
+from .medias import TAILLE_BLOC, stockage_medias
+
+Mo = 1024 * 1024
+IMAGES = {'image/jpeg', 'image/png', 'image/webp'}
+DOCUMENTS = {'application/pdf', 'application/msword', 'application/zip'}
+
+# Champ de fichier : (dossier de stockage, taille maximale, types acceptés)
+LIMITES = {
+    'photo_profil': ('photos_profil', 5 * Mo, IMAGES),
+    'cv': ('cv_employes', 10 * Mo, DOCUMENTS),
+    'justificatif': ('justificatifs_conge', 10 * Mo, {'application/pdf', 'image/jpeg', 'image/png'}),
+}
+
+# Signatures des premiers octets ; .docx/.odt sont des archives zip
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'%PDF-', 'application/pdf'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (b'PK\x03\x04', 'application/zip'),
+]
+OCTETS_SIGNATURE = 16
+
+EXTENSIONS = {
+    'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'application/pdf': '.pdf',
+    'application/msword': '.doc', 'application/zip': '.docx',
+}
+
+DUREE_SESSION = timedelta(hours=24)
+
+
+def detecter_type(entete):
+    """Type MIME reconnu d'après les premiers octets, None si inconnu."""
+    if entete[:4] == b'RIFF' and entete[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, type_contenu in SIGNATURES:
+        if entete.startswith(signature):
+            return type_contenu
+    return None
+
+
+def dossier_transit():
+    """Fichiers en cours de réception, sur le même volume que MEDIA_ROOT (déplacement sans copie)."""
+    dossier = getattr(settings, 'RH_TELEVERSEMENTS_DIR', '') or os.path.join(settings.MEDIA_ROOT, '.televersements')
+    os.makedirs(dossier, exist_ok=True)
+    return dossier
+
+
+def controler(champ, taille=None, type_contenu=None):
+    """Message et statut HTTP d'un envoi refusé, None s'il est acceptable."""
+    _, maximum, types = LIMITES[champ]
+    if taille is not None and taille > maximum:
+        return (f"Fichier trop volumineux pour {champ} ({maximum // Mo} Mo maximum).",
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    if type_contenu is not None and type_contenu not in types:
+        return (f"Type de fichier non accepté pour {champ}.", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+    return None
+
+
+class TeleversementRefuse(exceptions.APIException):
+    def __init__(self, detail, code):
+        super().__init__(detail)
+        self.status_code = code
+
+
+# ============================================================
+# 🌊 Multipart en flux
+# ============================================================
+class FichierTeleverse(UploadedFile):
+    """Fichier reçu : transit sur disque, empreinte et type détecté déjà connus."""
+
+    def __init__(self, fichier, name, content_type, size, sha256):
+        super().__init__(fichier, name, content_type, size)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # Déjà déplacé par le stockage
+            pass
+
+
+class TeleversementHandler(FileUploadHandler):
+    """
+    Handler d'upload Django : écrit, hache et contrôle chaque morceau. Les
+    champs hors LIMITES sont laissés au handler suivant.
+    """
+    chunk_size = TAILLE_BLOC
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.erreur = None
+        self.transit = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.transit = None
+        if field_name not in LIMITES:
+            return
+        self.transit = tempfile.NamedTemporaryFile(dir=dossier_transit(), prefix='.envoi-')
+        self.sha = hashlib.sha256()
+        self.taille = 0
+        self.entete = b''
+        self.type_detecte = None
+        raise StopFutureHandlers()
+
+    def _refuser(self, erreur):
+        self.erreur = erreur
+        self.transit.close()
+        self.transit = None
+        # Corps non lu jusqu'au bout : le client est coupé dès le dépassement
+        raise StopUpload(connection_reset=True)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.transit is None:
+            return raw_data
+        if self.type_detecte is None:
+            self.entete += raw_data[:OCTETS_SIGNATURE - len(self.entete)]
+            if len(self.entete) >= OCTETS_SIGNATURE:
+                self.type_detecte = detecter_type(self.entete) or ''
+                erreur = controler(self.field_name, type_contenu=self.type_detecte)
+                if erreur:
+                    self._refuser(erreur)
+        self.taille += len(raw_data)
+        erreur = controler(self.field_name, taille=self.taille)
+        if erreur:
+            self._refuser(erreur)
+        self.sha.update(raw_data)
+        self.transit.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.transit is None:
+            return None
+        if self.type_detecte is None:
+            # Fichier plus court que la signature
+            self.type_detecte = detecter_type(self.entete) or ''
+            erreur = controler(self.field_name, type_contenu=self.type_detecte)
+            if erreur:
+                self._refuser(erreur)
+        self.transit.flush()
+        self.transit.seek(0)
+        nom = os.path.splitext(os.path.basename(self.file_name or ''))[0] + EXTENSIONS[self.type_detecte]
+        fichier = FichierTeleverse(self.transit, nom, self.type_detecte, self.taille, self.sha.hexdigest())
+        self.transit = None
+        return fichier
+
+    def upload_interrupted(self):
+        if self.transit is not None:
+            self.transit.close()
+
+
+class MultiPartTeleversementParser(MultiPartParser):
+    """MultiPartParser dont les fichiers passent par TeleversementHandler (413/415 immédiats)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        requete = parser_context['request']._request
+        handler = TeleversementHandler(requete)
+        requete.upload_handlers = [handler, *requete.upload_handlers]
+        donnees = super().parse(stream, media_type, parser_context)
+        if handler.erreur:
+            raise TeleversementRefuse(*handler.erreur)
+        return donnees
+
+
+# ============================================================
+# ⏯️ Téléversements avec reprise
+# ============================================================
+DOSSIER_MORCEAUX = '.televersements'
+
+
+def nom_morceau(televersement, debut, fin):
+    return posixpath.join(DOSSIER_MORCEAUX, str(televersement.pk), f"{debut:012d}-{fin:012d}")
+
+
+def _morceau_present(stockage, televersement, debut, fin):
+    try:
+        return stockage.size(nom_morceau(televersement, debut, fin)) == fin - debut
+    except (FileNotFoundError, OSError):
+        return False
+
+
+def _entete_recu(stockage, televersement):
+    """Premiers octets déjà rangés (quelques-uns au plus : le type n'est pas encore reconnu)."""
+    entete = b''
+    for debut, fin in televersement.morceaux:
+        with stockage.open(nom_morceau(televersement, debut, fin), 'rb') as morceau:
+            entete += morceau.read(OCTETS_SIGNATURE - len(entete))
+        if len(entete) >= OCTETS_SIGNATURE:
+            break
+    return entete
+
+
+def ajouter_morceau(televersement_id, offset, flux, proprietaire):
+    """
+    Ajoute au téléversement de `proprietaire` les octets de `flux` à partir de `offset` (doit
+    égaler les octets déjà reçus). Chaque morceau est rangé tel quel dans le
+    stockage des médias (disque ou S3) : la reprise fonctionne quel que soit le
+    réplica qui la reçoit. La ligne est verrouillée : deux reprises concurrentes
+    ne s'entrelacent pas. Finalise le fichier au dernier morceau.
+    """
+    from .models import Televersement
+
+    stockage = stockage_medias()
+    with transaction.atomic():
+        televersement = Televersement.objects.select_for_update().get(pk=televersement_id, proprietaire=proprietaire)
+        if televersement.fichier:
+            raise TeleversementRefuse("Téléversement déjà terminé.", status.HTTP_409_CONFLICT)
+        if offset != televersement.recu:
+            raise TeleversementRefuse(
+                f"Upload-Offset attendu : {televersement.recu}.", status.HTTP_409_CONFLICT
+            )
+        # Les octets déjà comptés doivent toujours être là (jamais de trou comblé par des zéros)
+        if offset and not (
+            televersement.morceaux and televersement.morceaux[-1][1] == offset
+            and _morceau_present(stockage, televersement, *televersement.morceaux[-1])
+        ):
+            raise TeleversementRefuse(
+                "Morceaux déjà reçus introuvables : recommencez le téléversement.", status.HTTP_409_CONFLICT
+            )
+
+        entete = b'' if televersement.type_contenu or not offset else _entete_recu(stockage, televersement)
+        tampon = tempfile.NamedTemporaryFile(dir=dossier_transit(), prefix='.morceau-')
+        with tampon:
+            recu = offset
+            while True:
+                bloc = flux.read(TAILLE_BLOC)
+                if not bloc:
+                    break
+                recu += len(bloc)
+                if recu > televersement.taille:
+                    raise TeleversementRefuse(
+                        "Le morceau dépasse la taille annoncée du fichier.",
+                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    )
+                tampon.write(bloc)
+                if not televersement.type_contenu:
+                    entete += bloc[:OCTETS_SIGNATURE - len(entete)]
+                    if len(entete) >= min(OCTETS_SIGNATURE, televersement.taille):
+                        televersement.type_contenu = detecter_type(entete) or ''
+                        erreur = controler(televersement.champ, type_contenu=televersement.type_contenu)
+                        if erreur:
+                            raise TeleversementRefuse(*erreur)
+            if recu > offset:
+                tampon.flush()
+                stockage.enregistrer_tel_quel(nom_morceau(televersement, offset, recu), File(tampon))
+                televersement.morceaux = [*televersement.morceaux, [offset, recu]]
+        televersement.recu = recu
+        if recu == televersement.taille:
+            finaliser(televersement, stockage)
+        televersement.save()
+    return televersement
+
+
+def finaliser(televersement, stockage):
+    """Morceaux réassemblés et hachés par blocs, puis passage au stockage adressé par contenu."""
+    dossier = LIMITES[televersement.champ][0]
+    nom = os.path.splitext(os.path.basename(televersement.nom_fichier))[0] + EXTENSIONS[televersement.type_contenu]
+    assemble = tempfile.NamedTemporaryFile(dir=dossier_transit(), prefix='.envoi-')
+    sha = hashlib.sha256()
+    try:
+        for debut, fin in televersement.morceaux:
+            with stockage.open(nom_morceau(televersement, debut, fin), 'rb') as morceau:
+                for bloc in iter(lambda: morceau.read(TAILLE_BLOC), b''):
+                    sha.update(bloc)
+                    assemble.write(bloc)
+    except FileNotFoundError:
+        assemble.close()
+        raise TeleversementRefuse(
+            "Morceaux déjà reçus introuvables : recommencez le téléversement.", status.HTTP_409_CONFLICT
+        )
+    assemble.flush()
+    assemble.seek(0)
+    fichier = FichierTeleverse(assemble, nom, televersement.type_contenu, televersement.taille, sha.hexdigest())
+    try:
+        televersement.fichier = stockage.save(f"{dossier}/{nom}", fichier)
+    finally:
+        fichier.close()
+    supprimer_morceaux(televersement, stockage)
+
+
+def supprimer_morceaux(televersement, stockage):
+    for debut, fin in televersement.morceaux:
+        stockage.delete(nom_morceau(televersement, debut, fin))
+    televersement.morceaux = []
+
+
+def purger_televersements(maintenant=None):
+    """
+    Supprime les sessions inactives depuis DUREE_SESSION et leurs morceaux
+    (un fichier terminé reste dans le stockage) ; retourne leur nombre.
+    """
+    from .models import Televersement
+
+    stockage = stockage_medias()
+    limite = (maintenant or timezone.now()) - DUREE_SESSION
+    anciens = list(Televersement.objects.filter(updated_at__lt=limite))
+    for televersement in anciens:
+        supprimer_morceaux(televersement, stockage)
+    Televersement.objects.filter(pk__in=[t.pk for t in anciens]).delete()
+    return len(anciens)
+
+
+def fichier_televerse(televersement_id, champ, proprietaire):
+    """Nom de stockage d'un téléversement terminé de `proprietaire` pour ce champ (ValidationError sinon)."""
+    from .models import Televersement
+
+    fichier = Televersement.objects.filter(pk=televersement_id, champ=champ, proprietaire=proprietaire) \
+        .exclude(fichier='').values_list('fichier', flat=True).first()
+    if not fichier:
+        raise exceptions.ValidationError({f'{champ}_televersement_id': "Téléversement introuvable ou incomplet."})
+    return fichier
@@ -3,10 +3,10 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     DistrictViewSet, CommuneViewSet, FokontanyViewSet,
     FonctionViewSet, AffectationViewSet, EmployerViewSet,
-    CongeViewSet, TypeCongeViewSet, TypeContratViewSet, ContratViewSet,
+    CongeViewSet, SoldeCongeViewSet, TypeCongeViewSet, TypeContratViewSet, ContratViewSet,
     LocationViewSet, ElectriciteViewSet,
     ModePayementViewSet, DemandeViewSet, PayementViewSet,
-    TypeAchatViewSet, AchatViewSet
+    TypeAchatViewSet, AchatViewSet, MediaView, TeleversementViewSet, GeoArbreView
 )
 
 router = DefaultRouter()
@@ -18,6 +18,8 @@ router.register(r'fonctions', FonctionViewSet, basename='fonction')
 router.register(r'affectations', AffectationViewSet, basename='affectation')
 router.register(r'employers', EmployerViewSet, basename='employer')
 router.register(r'conges', CongeViewSet, basename='conge')
+router.register(r'soldes-conges', SoldeCongeViewSet, basename='solde-conge')
+router.register(r'televersements', TeleversementViewSet, basename='televersement')
 router.register(r'type-conges', TypeCongeViewSet, basename='type-conge')  # <-- ajouté
 router.register(r'type-contrats', TypeContratViewSet, basename='type-contrat')
 router.register(r'contrats', ContratViewSet, basename='contrat')
@@ -31,4 +33,6 @@ router.register(r'achats', AchatViewSet, basename='achat')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('geo/tree/', GeoArbreView.as_view(), name='geo-arbre'),
+    path('medias/<path:chemin>', MediaView.as_view(), name='media'),
 ]
@@ -1,23 +1,47 @@
+import calendar
+import gzip
+import io
+import uuid
+from datetime import date
+
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.authentication import BasicAuthentication
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.views import APIView
+from rest_framework.generics import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from .models import (
     District, Commune, Fokontany, Fonction, Affectation,
     Employer, TypeConge, Conge, TypeContrat, Contrat, Location,
     Electricite, ModePayement, Demande, Payement,
-    TypeAchat, Achat
+    TypeAchat, Achat, Televersement
 )
 from .serializers import (
     DistrictSerializer, CommuneSerializer, FokontanySerializer,
     FonctionSerializer, AffectationSerializer, EmployerSerializer,TypeCongeSerializer, 
     CongeSerializer, TypeContratSerializer, ContratSerializer,
     LocationSerializer, ElectriciteSerializer, ModePayementSerializer, DemandeSerializer, PayementSerializer,
-    TypeAchatSerializer, AchatSerializer
+    TypeAchatSerializer, AchatSerializer, TeleversementSerializer, ModePayementLotSerializer
 )
+from .chronologie import TYPES as TYPES_CHRONOLOGIE, CurseurInvalide, chronologie
+from .conges import changer_statut_lot, importer_csv, traiter_conges
+from .demandes import avec_totaux, recalculer_statuts
+from .geo import arbre_compresse
+from .paiements import completer_lot, generer_echeances
+from .medias import reponse_media
+from .permissions import LienMediaSigne
+from .recherche import RechercheEmployeFilter, suggestions
+from .televersements import MultiPartTeleversementParser, ajouter_morceau, controler
+from .soldes import soldes
 
 
 class DistrictViewSet(viewsets.ModelViewSet):
@@ -46,6 +70,39 @@ class FokontanyViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
 
 
+class GeoArbreView(APIView):
+    """
+    Arbre District → Commune → Fokontany pour les sélecteurs en cascade,
+    complet ou restreint par `?district=` / `?commune=` (voir geo.py).
+    """
+
+    def get(self, request):
+        try:
+            district_id, commune_id = (
+                uuid.UUID(valeur) if valeur else None
+                for valeur in (request.query_params.get('district'), request.query_params.get('commune'))
+            )
+        except ValueError:
+            return Response({'detail': 'district et commune doivent être des UUID.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        entree = arbre_compresse(district_id, commune_id)
+        if entree is None:
+            return Response({'detail': 'District ou commune introuvable.'}, status=status.HTTP_404_NOT_FOUND)
+        etag, corps = entree
+
+        if etag in [v.strip() for v in request.headers.get('If-None-Match', '').split(',')]:
+            reponse = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            reponse = HttpResponse(corps, content_type='application/json')
+            reponse['Content-Encoding'] = 'gzip'
+        else:
+            reponse = HttpResponse(gzip.decompress(corps), content_type='application/json')
+        reponse['ETag'] = etag
+        reponse['Vary'] = 'Accept-Encoding'
+        reponse['Cache-Control'] = 'private, no-cache'
+        return reponse
+
+
 class FonctionViewSet(viewsets.ModelViewSet):
     queryset = Fonction.objects.all()
     serializer_class = FonctionSerializer
@@ -60,13 +117,58 @@ class FonctionViewSet(viewsets.ModelViewSet):
 class EmployerViewSet(viewsets.ModelViewSet):
     queryset = Employer.objects.select_related('fonction', 'district').all()
     serializer_class = EmployerSerializer
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # Fichiers reçus en flux, contrôlés au fil de l'envoi (televersements.py)
+    parser_classes = [MultiPartTeleversementParser, FormParser, JSONParser]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= classé par pertinence (trigrammes + plein texte sous PostgreSQL, voir recherche.py)
+    filter_backends = [DjangoFilterBackend, RechercheEmployeFilter, filters.OrderingFilter]
     filterset_fields = ['status_employer', 'fonction', 'district', 'diplome']
     search_fields = ['nom_employer', 'prenom_employer', 'email', 'domaine_etude']
     ordering_fields = ['nom_employer', 'date_entree', 'created_at']
 
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """Autocomplétion : `?q=<saisie>&limit=10`, les meilleurs employés dans un budget de temps strict."""
+        terme = request.query_params.get('q', '').strip()
+        try:
+            limite = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'detail': 'limit doit être un entier.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(suggestions(terme, limite))
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Chronologie de l'employé (affectations, contrats, congés, paiements), du plus
+        récent au plus ancien : `?limit=50&cursor=<suivant>&types=conge,contrat`.
+        """
+        employe = get_object_or_404(
+            Employer.objects.values('id', 'nom_employer', 'prenom_employer', 'fonction__nom_fonction', 'district__name'),
+            pk=pk,
+        )
+        types = request.query_params.get('types')
+        types = tuple(t.strip() for t in types.split(',')) if types else TYPES_CHRONOLOGIE
+        if not set(types) <= set(TYPES_CHRONOLOGIE):
+            return Response(
+                {'detail': f"types parmi : {', '.join(TYPES_CHRONOLOGIE)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            taille = int(request.query_params.get('limit', 50))
+        except ValueError:
+            return Response({'detail': 'limit doit être un entier.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = chronologie(employe['id'], request.query_params.get('cursor'), taille, types)
+        except CurseurInvalide as erreur:
+            return Response({'detail': str(erreur)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'employe': {
+                'id': employe['id'], 'nom_employer': employe['nom_employer'],
+                'prenom_employer': employe['prenom_employer'],
+                'fonction': employe['fonction__nom_fonction'], 'district': employe['district__name'],
+            },
+            **page,
+        })
+
     @action(detail=False, methods=['get'])
     def actifs(self, request):
         queryset = self.queryset.filter(status_employer='actif')
@@ -84,6 +186,55 @@ class EmployerViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(employer)
         return Response(serializer.data)
 
+class MediaView(APIView):
+    """
+    Photos, vignettes, CV et justificatifs (`medias/<chemin>`) : ETag, 304,
+    Range et délégation X-Accel-Redirect (voir medias.py). Accessible sans jeton
+    via les liens signés que produisent les serializers ; avec un stockage S3,
+    redirige vers l'URL présignée du bucket.
+    """
+    permission_classes = [LienMediaSigne]
+
+    def get(self, request, chemin):
+        return reponse_media(request, chemin)
+
+
+class TeleversementViewSet(viewsets.ViewSet):
+    """
+    Téléversement avec reprise : POST {champ, nom_fichier, taille} ouvre la session,
+    PATCH (en-tête Upload-Offset, corps brut) ajoute un morceau, GET donne l'offset
+    atteint. Une fois terminé, l'id se passe en `<champ>_televersement_id`.
+    Une session n'est visible que de l'utilisateur qui l'a ouverte.
+    """
+
+    def create(self, request):
+        serializer = TeleversementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        erreur = controler(serializer.validated_data['champ'], taille=serializer.validated_data['taille'])
+        if erreur:
+            return Response({'detail': erreur[0]}, status=erreur[1])
+        televersement = serializer.save(proprietaire=str(request.user.id))
+        return Response(TeleversementSerializer(televersement).data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        televersement = Televersement.objects.filter(pk=pk, proprietaire=str(request.user.id)).first()
+        if televersement is None:
+            return Response({'detail': 'Téléversement introuvable.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(TeleversementSerializer(televersement).data)
+
+    def partial_update(self, request, pk=None):
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({'detail': "En-tête Upload-Offset requis (entier)."}, status=status.HTTP_400_BAD_REQUEST)
+        proprietaire = str(request.user.id)
+        if not Televersement.objects.filter(pk=pk, proprietaire=proprietaire).exists():
+            return Response({'detail': 'Téléversement introuvable.'}, status=status.HTTP_404_NOT_FOUND)
+        # Corps lu par blocs directement depuis la requête, jamais chargé en entier
+        televersement = ajouter_morceau(pk, offset, request.stream or io.BytesIO(), proprietaire)
+        return Response(TeleversementSerializer(televersement).data)
+
+
 class AffectationViewSet(viewsets.ModelViewSet):
     queryset = Affectation.objects.select_related(
         'nouveau_fonction', 'nouveau_district',
@@ -128,6 +279,7 @@ class TypeCongeViewSet(viewsets.ModelViewSet):
 class CongeViewSet(viewsets.ModelViewSet):
     queryset = Conge.objects.all().order_by('-date_creation')
     serializer_class = CongeSerializer
+    parser_classes = [MultiPartTeleversementParser, FormParser, JSONParser]
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
 
     def get_queryset(self):
@@ -167,7 +319,10 @@ class CongeViewSet(viewsets.ModelViewSet):
         """
         conge = self.get_object()
         conge.status_conge = 'approuve'
-        conge.save()
+        with transaction.atomic():
+            conge.save()
+            # Statut de l'employé mis à jour tout de suite, sans attendre la passe planifiée
+            traiter_conges(employer_ids=[conge.employer_id])
         return Response({'status': 'Congé approuvé'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
@@ -187,9 +342,80 @@ class CongeViewSet(viewsets.ModelViewSet):
         """
         conge = self.get_object()
         conge.status_conge = 'annule'
-        conge.save()
+        with transaction.atomic():
+            conge.save()
+            # Statut de l'employé mis à jour tout de suite, sans attendre la passe planifiée
+            traiter_conges(employer_ids=[conge.employer_id])
         return Response({'status': 'Congé annulé'}, status=status.HTTP_200_OK)
 
+    ACTIONS_LOT = {'approve': 'approuve', 'reject': 'refuse', 'cancel': 'annule'}
+    LOT_MAX = 1000
+
+    @action(detail=False, methods=['post'])
+    def lot(self, request):
+        """
+        Décision sur plusieurs congés : {"action": "approve" | "reject" | "cancel", "ids": [...]}.
+        Retourne un résultat par congé (ok ou erreur et motif).
+        """
+        statut = self.ACTIONS_LOT.get(request.data.get('action'))
+        ids = request.data.get('ids')
+        if statut is None:
+            return Response({'detail': "action doit valoir approve, reject ou cancel."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids or len(ids) > self.LOT_MAX:
+            return Response({'detail': f"ids doit être une liste de 1 à {self.LOT_MAX} identifiants."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            resultats = changer_statut_lot(ids, statut)
+        except DjangoValidationError as e:
+            return Response({'detail': e.messages[0]}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'traites': sum(1 for r in resultats if r['resultat'] == 'ok'),
+            'resultats': resultats,
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def importer(self, request):
+        """
+        Import CSV de demandes de congé (champ `fichier`) ; `approuver=true` crée
+        directement des congés approuvés (reprise d'historique, planning validé).
+        """
+        fichier = request.FILES.get('fichier')
+        if fichier is None:
+            return Response({'detail': "Fichier CSV requis (champ 'fichier')."}, status=status.HTTP_400_BAD_REQUEST)
+        approuver = str(request.data.get('approuver', '')).lower() in ('1', 'true', 'oui')
+        try:
+            resultats = importer_csv(fichier, approuver=approuver)
+        except UnicodeDecodeError:
+            return Response({'detail': "Le fichier doit être encodé en UTF-8."}, status=status.HTTP_400_BAD_REQUEST)
+        except DjangoValidationError as e:
+            return Response({'detail': e.messages[0]}, status=status.HTTP_409_CONFLICT)
+        crees = sum(1 for r in resultats if r['resultat'] == 'cree')
+        return Response({'crees': crees, 'erreurs': len(resultats) - crees, 'resultats': resultats},
+                        status=status.HTTP_201_CREATED if crees else status.HTTP_200_OK)
+
+
+
+class SoldeCongeViewSet(viewsets.ViewSet):
+    """
+    Soldes de congés de plusieurs employés pour une année, lus dans le registre
+    SoldeConge : `?employer_ids=<id>,<id>…&annee=`.
+    """
+    EMPLOYES_MAX = 1000
+
+    def list(self, request):
+        try:
+            annee = int(request.query_params.get('annee', timezone.localdate().year))
+            employer_ids = list(dict.fromkeys(
+                uuid.UUID(valeur) for valeur in request.query_params.get('employer_ids', '').split(',') if valeur
+            ))
+        except ValueError:
+            return Response({'detail': 'annee doit être un entier et employer_ids une liste d’UUID.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not employer_ids or len(employer_ids) > self.EMPLOYES_MAX:
+            return Response({'detail': f"employer_ids doit contenir de 1 à {self.EMPLOYES_MAX} identifiants."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({'annee': annee, 'resultats': soldes(employer_ids, annee)})
 
 
 class TypeContratViewSet(viewsets.ModelViewSet):
@@ -213,14 +439,63 @@ class ContratViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(contrats, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def salaires(self, request):
+        """
+        Salaires des contrats de travail actifs sur un mois, pour la paie de
+        finance_service. Une ligne par employé (contrat le plus récent), par pages
+        triées par employer_id : `?mois=&annee=&after=<employer_id>&limit=`.
+        """
+        try:
+            mois = int(request.query_params['mois'])
+            annee = int(request.query_params['annee'])
+            limite = min(int(request.query_params.get('limit', 500)), 5000)
+            debut_mois = date(annee, mois, 1)
+        except (KeyError, ValueError):
+            return Response({'detail': 'mois, annee et limit doivent être des entiers valides.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        fin_mois = date(annee, mois, calendar.monthrange(annee, mois)[1])
+
+        contrats = Contrat.objects.filter(
+            status_contrat='actif', nature_contrat='emploi', date_debut_contrat__lte=fin_mois,
+        ).filter(Q(date_fin_contrat__isnull=True) | Q(date_fin_contrat__gte=debut_mois))
+
+        total = None
+        after = request.query_params.get('after')
+        if after:
+            contrats = contrats.filter(employer_id__gt=after)
+        else:
+            total = contrats.values('employer_id').distinct().count()
+
+        lignes = contrats.order_by('employer_id', '-date_debut_contrat').values(
+            'employer_id', 'id', 'salaire', 'date_debut_contrat', 'date_fin_contrat'
+        )[:limite]
+
+        # Premier contrat de chaque employé = le plus récent ; les suivants sont ignorés
+        resultats, vus = [], set()
+        for ligne in lignes:
+            if ligne['employer_id'] in vus:
+                continue
+            vus.add(ligne['employer_id'])
+            resultats.append({
+                'employer_id': ligne['employer_id'],
+                'contrat_id': ligne['id'],
+                'salaire': str(ligne['salaire']),
+                'date_debut_contrat': ligne['date_debut_contrat'],
+                'date_fin_contrat': ligne['date_fin_contrat'],
+            })
+
+        suivant = resultats[-1]['employer_id'] if len(lignes) == limite else None
+        return Response({'results': resultats, 'next': suivant, 'total': total})
+
 
 class LocationViewSet(viewsets.ModelViewSet):
-    queryset = Location.objects.select_related('affectation').all()
+    queryset = Location.objects.all()
     serializer_class = LocationSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['ville', 'affectation']
-    search_fields = ['adresse', 'ville', 'code_postal']
-    ordering_fields = ['ville', 'created_at']
+    filterset_fields = ['ville', 'type_location', 'date_echeance']
+    search_fields = ['nom', 'adresse', 'ville', 'code_postal']
+    ordering_fields = ['ville', 'date_echeance', 'created_at']
 
 
 class ElectriciteViewSet(viewsets.ModelViewSet):
@@ -242,13 +517,32 @@ class ModePayementViewSet(viewsets.ModelViewSet):
 
 
 class DemandeViewSet(viewsets.ModelViewSet):
-    queryset = Demande.objects.select_related('employer').all()
+    # Montant et décomptes de paiements annotés en SQL : une requête pour toute la liste
+    queryset = avec_totaux(Demande.objects.all())
     serializer_class = DemandeSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'employer']
-    search_fields = ['description', 'employer__nom_employer', 'employer__prenom_employer']
+    filterset_fields = ['status']
+    search_fields = ['description']
     ordering_fields = ['date_demande', 'montant']
 
+    def _annoter(self, serializer):
+        # Instance créée/modifiée relue avec ses annotations pour la réponse
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+    def perform_create(self, serializer):
+        serializer.save()
+        self._annoter(serializer)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        self._annoter(serializer)
+
+    @action(detail=False, methods=['post'])
+    def recalculer_statuts(self, request):
+        """Statut de toutes les demandes (filtrables : ?status=) selon leurs paiements, en un UPDATE."""
+        nombre = recalculer_statuts(self.filter_queryset(Demande.objects.all()))
+        return Response({'demandes_mises_a_jour': nombre})
+
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         demande = self.get_object()
@@ -268,22 +562,73 @@ class DemandeViewSet(viewsets.ModelViewSet):
 
 class PayementViewSet(viewsets.ModelViewSet):
     queryset = Payement.objects.select_related(
-        'mode_payement', 'demande', 'electricite', 'loyer'
+        'mode_payement', 'location', 'electricite__location'
     ).all()
     serializer_class = PayementSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'mode_payement', 'demande', 'electricite']
+    filterset_fields = ['status', 'mode_payement', 'location', 'electricite', 'contrat', 'echeance']
     search_fields = ['reference']
-    ordering_fields = ['date_payement', 'montant']
+    ordering_fields = ['date_payement', 'montant', 'echeance']
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         payement = self.get_object()
         payement.status = 'complete'
-        payement.save()
+        with transaction.atomic():
+            payement.save()
+            # Statut des demandes liées à jour dans la même transaction
+            recalculer_statuts(Demande.objects.filter(payements=payement))
         serializer = self.get_serializer(payement)
         return Response(serializer.data)
 
+    LOT_MAX = 1000
+
+    def _mode_payement_id(self, request):
+        """mode_payement_id du corps, None si absent ; 400 s'il est invalide ou inconnu."""
+        serializer = ModePayementLotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        mode_payement = serializer.validated_data.get('mode_payement_id')
+        return mode_payement.pk if mode_payement else None
+
+    @action(detail=False, methods=['post'])
+    def generer(self, request):
+        """
+        Campagne de paiements : {"debut": "2026-10-01", "fin": "2026-10-31", "mode_payement_id"?}.
+        Crée les loyers et factures d'électricité dus sur la période ; relancer ne crée pas de doublon.
+        """
+        try:
+            debut = parse_date(str(request.data.get('debut', '')))
+            fin = parse_date(str(request.data.get('fin', '')))
+        except ValueError:
+            debut = fin = None
+        if not debut or not fin or debut > fin:
+            return Response({'detail': "debut et fin (AAAA-MM-JJ, debut <= fin) requis."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        mode_payement_id = self._mode_payement_id(request)
+        with transaction.atomic():
+            resultat = generer_echeances(debut, fin, mode_payement_id)
+        return Response(
+            {**resultat, 'montant_total': str(resultat['montant_total'])},
+            status=status.HTTP_201_CREATED if resultat['crees'] else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['post'])
+    def completer(self, request):
+        """
+        Règlement par lot : {"ids": [...], "mode_payement_id"?}. Retourne un résultat
+        par paiement et le nombre de demandes dont le statut a été recalculé.
+        """
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or len(ids) > self.LOT_MAX:
+            return Response({'detail': f"ids doit être une liste de 1 à {self.LOT_MAX} identifiants."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        resultats, demandes = completer_lot(ids, self._mode_payement_id(request))
+        return Response({
+            'traites': sum(1 for r in resultats if r['resultat'] == 'ok'),
+            'demandes_mises_a_jour': demandes,
+            'resultats': resultats,
+        })
+
 
 class TypeAchatViewSet(viewsets.ModelViewSet):
     queryset = TypeAchat.objects.all()
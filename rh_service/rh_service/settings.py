@@ -2,11 +2,17 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config
 import os
+import sys
 import mimetypes
 
 # === Répertoires de base ===
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Paquet commun aux services (commun/) : copié dans /app par le Dockerfile,
+# à la racine du dépôt en développement
+if not (BASE_DIR / "commun").is_dir():
+    sys.path.append(str(BASE_DIR.parent))
+
 # === Sécurité ===
 SECRET_KEY = config("SECRET_KEY", default="rh_service_secret_key_123")
 DEBUG = config("DEBUG", default=True, cast=bool)
@@ -16,6 +22,7 @@ ALLOWED_HOSTS = config("DJANGO_ALLOWED_HOSTS", default="localhost,127.0.0.1").sp
 INSTALLED_APPS = [
     # Apps internes
     "rh",
+    "commun",
 
     # Apps Django de base
     "django.contrib.admin",
@@ -82,6 +89,30 @@ DATABASES = {
     }
 }
 
+# Bus d'événements inter-services (outbox + relais, voir commun/events.py).
+# Base partagée par tous les services ; par défaut sur le même serveur que DB_HOST,
+# créée si besoin au démarrage (manage.py preparer_bus, entrypoint.sh).
+DATABASES["event_bus"] = {
+    "ENGINE": "django.db.backends.postgresql",
+    "NAME": config("EVENT_BUS_DB_NAME", default="event_bus_db"),
+    "USER": config("EVENT_BUS_DB_USER", default=DATABASES["default"]["USER"]),
+    "PASSWORD": config("EVENT_BUS_DB_PASSWORD", default=DATABASES["default"]["PASSWORD"]),
+    "HOST": config("EVENT_BUS_DB_HOST", default=DATABASES["default"]["HOST"]),
+    "PORT": config("EVENT_BUS_DB_PORT", default=DATABASES["default"]["PORT"]),
+}
+EVENT_BUS_DATABASE = "event_bus"
+EVENT_BROKER = config("EVENT_BROKER", default="commun.events.TableQueueBroker")
+EVENT_SERVICE = "rh_service"
+
+# Cache partagé par tous les workers (arbre géographique, voir rh/geo.py).
+# Table créée par `manage.py createcachetable` au démarrage du conteneur.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": config("CACHE_LOCATION", default="rh_cache"),
+    }
+}
+
 # === Django REST Framework ===
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -115,6 +146,23 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Médias rh (photos, CV, justificatifs) : servis par rh.views.MediaView, avec
+# ETag et Range ; si défini, les octets sont délégués au proxy via X-Accel-Redirect
+# vers ce préfixe interne (location nginx `internal` pointant sur MEDIA_ROOT).
+RH_MEDIA_URL = "/api/rh/medias/"
+MEDIA_ACCEL_REDIRECT = config("MEDIA_ACCEL_REDIRECT", default="")
+# Durée de validité des liens de médias signés / présignés (secondes)
+RH_MEDIA_URL_EXPIRATION = config("RH_MEDIA_URL_EXPIRATION", default=3600, cast=int)
+
+# === Stockage des médias rh : "local" (MEDIA_ROOT) ou "s3" (S3 / MinIO) ===
+# Passage de l'un à l'autre : python manage.py migrer_medias local s3
+RH_MEDIA_STORAGE = config("RH_MEDIA_STORAGE", default="local")
+RH_S3_ENDPOINT = config("RH_S3_ENDPOINT", default="http://minio:9000")
+RH_S3_URL_PUBLIQUE = config("RH_S3_URL_PUBLIQUE", default="")
+RH_S3_BUCKET = config("RH_S3_BUCKET", default="rh-medias")
+RH_S3_REGION = config("RH_S3_REGION", default="us-east-1")
+RH_S3_ACCESS_KEY = config("RH_S3_ACCESS_KEY", default="")
+RH_S3_SECRET_KEY = config("RH_S3_SECRET_KEY", default="")
 
 
 # 💡 URL absolue complète pour les médias (utilisable côté frontend)
@@ -13,6 +13,9 @@ python manage.py makemigrations --noinput
 echo "📦 Applying all migrations..."
 python manage.py migrate --noinput
 
+echo "📨 Preparing event bus database..."
+python manage.py preparer_bus
+
 echo "⚙️ Collecting static files..."
 python manage.py collectstatic --noinput
 
@@ -0,0 +1,42 @@
+"""
+📥 Réactions de stock_service aux événements des autres services.
+"""
+from commun.events import consommateur
+from .models import DemandeAchat, UtilisateurAuth
+
+
+@consommateur('auth.utilisateur_modifie')
+def synchroniser_utilisateur(message):
+    """Met à jour la copie locale utilisée pour autoriser les sorties de stock."""
+    payload = message['payload']
+    UtilisateurAuth.objects.update_or_create(
+        id=message['aggregate_id'],
+        defaults={
+            'username': payload['username'],
+            'role': payload['role'],
+            'magasin_id': payload['magasin_id'],
+            'is_active': payload['is_active'],
+        },
+    )
+
+
+@consommateur('auth.utilisateur_supprime')
+def supprimer_utilisateur(message):
+    UtilisateurAuth.objects.filter(id=message['aggregate_id']).delete()
+
+
+@consommateur('finance.validation_traitee')
+def appliquer_decision_finance(message):
+    """Reporte sur la DemandeAchat la décision prise par la finance."""
+    payload = message['payload']
+    if payload['service_origine'] != 'stock_service' or payload['type_demande'] != 'achat_stock':
+        return
+    demande = DemandeAchat.objects.filter(
+        id=payload['demande_origine_id'], statut='en_attente'
+    ).first()
+    if demande is None:
+        return
+    if payload['statut'] == 'approuve':
+        demande.valider_finance(payload['validateur_finance_id'])
+    elif payload['statut'] == 'rejete':
+        demande.rejeter_finance(payload['validateur_finance_id'], payload.get('commentaire', ''))
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:21
+
+import django.core.serializers.json
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurseurConsommateur',
+            fields=[
+                ('nom', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Curseur de consommateur',
+                'verbose_name_plural': 'Curseurs de consommateurs',
+                'db_table': 'curseurs_consommateurs',
+            },
+        ),
+        migrations.CreateModel(
+            name='UtilisateurAuth',
+            fields=[
+                ('id', models.UUIDField(help_text="UUID de l'utilisateur (depuis auth_service)", primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=150)),
+                ('role', models.CharField(max_length=50)),
+                ('magasin_id', models.UUIDField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Utilisateur (copie auth)',
+                'verbose_name_plural': 'Utilisateurs (copie auth)',
+                'db_table': 'utilisateurs_auth',
+            },
+        ),
+        migrations.CreateModel(
+            name='EvenementOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type_evenement', models.CharField(max_length=100)),
+                ('aggregate_type', models.CharField(max_length=100)),
+                ('aggregate_id', models.CharField(max_length=100)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('publie_le', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Événement outbox',
+                'verbose_name_plural': 'Événements outbox',
+                'db_table': 'outbox_evenements',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('publie_le__isnull', True)), fields=['created_at'], name='outbox_a_publier_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EvenementConsomme',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('consommateur', models.CharField(max_length=100)),
+                ('event_id', models.UUIDField()),
+                ('type_evenement', models.CharField(max_length=100)),
+                ('traite_le', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Événement consommé',
+                'verbose_name_plural': 'Événements consommés',
+                'db_table': 'evenements_consommes',
+                'unique_together': {('consommateur', 'event_id')},
+            },
+        ),
+    ]
@@ -1,11 +1,17 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.conf import settings
 import requests
 
+from commun.models import (
+    CompteurNumeroBase, CurseurConsommateurBase, EvenementConsommeBase, EvenementOutboxBase,
+)
+from commun.events import publier_evenement
+from commun.numerotation import numero
+
 
 # =========================
 # Catégories d'articles
@@ -206,26 +212,41 @@ class MouvementStock(models.Model):
             if not self._verifier_autorisation_magasinier():
                 raise ValidationError("Le magasinier n'est pas autorisé à effectuer ce mouvement dans ce magasin.")
 
-        # Gestion du stock uniquement pour entrée, sortie et retour
-        if self.type_mouvement in ['entree', 'sortie', 'retour']:
-            if self.type_mouvement in ['entree', 'retour']:
-                if not self.magasin_dest:
-                    raise ValidationError("Entrée/Retour doit avoir un magasin destinataire.")
-                stock, _ = Stock.objects.get_or_create(article=self.article, magasin=self.magasin_dest)
-                stock.ajouter_quantite(self.quantite)
-
-            elif self.type_mouvement == 'sortie':
-                if not self.magasin_source:
-                    raise ValidationError("Sortie doit avoir un magasin source.")
-                stock = Stock.objects.filter(article=self.article, magasin=self.magasin_source).first()
-                if not stock or stock.quantite < self.quantite:
-                    raise ValidationError(f"Stock insuffisant dans le magasin {self.magasin_source.nom}")
-                stock.retirer_quantite(self.quantite)
-
-        # Les transferts créés par le responsable ne modifient pas le stock
-        # Inventaire n'affecte pas le stock directement
-
-        super().save(*args, **kwargs)
+        creation = self._state.adding
+        with transaction.atomic():
+            # Gestion du stock uniquement pour entrée, sortie et retour
+            if self.type_mouvement in ['entree', 'sortie', 'retour']:
+                if self.type_mouvement in ['entree', 'retour']:
+                    if not self.magasin_dest:
+                        raise ValidationError("Entrée/Retour doit avoir un magasin destinataire.")
+                    stock, _ = Stock.objects.get_or_create(article=self.article, magasin=self.magasin_dest)
+                    stock.ajouter_quantite(self.quantite)
+
+                elif self.type_mouvement == 'sortie':
+                    if not self.magasin_source:
+                        raise ValidationError("Sortie doit avoir un magasin source.")
+                    stock = Stock.objects.filter(article=self.article, magasin=self.magasin_source).first()
+                    if not stock or stock.quantite < self.quantite:
+                        raise ValidationError(f"Stock insuffisant dans le magasin {self.magasin_source.nom}")
+                    stock.retirer_quantite(self.quantite)
+
+            # Les transferts créés par le responsable ne modifient pas le stock
+            # Inventaire n'affecte pas le stock directement
+
+            super().save(*args, **kwargs)
+
+            if creation:
+                publier_evenement('stock.mouvement_cree', self, {
+                    'article_id': self.article_id,
+                    'magasin_source_id': self.magasin_source_id,
+                    'magasin_dest_id': self.magasin_dest_id,
+                    'quantite': self.quantite,
+                    'type_mouvement': self.type_mouvement,
+                    'magasinier_id': self.magasinier_id,
+                    'recepteur_id': self.recepteur_id,
+                    'recepteur_type': self.recepteur_type,
+                    'date_mouvement': self.date_mouvement,
+                })
 
 
     # ============================================================
@@ -234,8 +255,12 @@ class MouvementStock(models.Model):
 
     def _verifier_autorisation_magasinier(self):
         """
-        Vérifie via AUTH_SERVICE si le magasinier appartient au magasin_source.
+        Vérifie si le magasinier appartient au magasin_source : d'abord dans la copie
+        locale alimentée par les événements auth, sinon via AUTH_SERVICE.
         """
+        utilisateur = UtilisateurAuth.objects.filter(pk=self.magasinier_id).first()
+        if utilisateur is not None:
+            return utilisateur.is_active and utilisateur.magasin_id == self.magasin_source.id
         try:
             response = requests.get(f"{settings.AUTH_SERVICE_URL}/api/users/{self.magasinier_id}/")
             if response.status_code != 200:
@@ -389,7 +414,7 @@ class DemandeAchat(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    numero = models.CharField(max_length=100, unique=True)
+    numero = models.CharField(max_length=100, unique=True, blank=True)
     article = models.ForeignKey(Article, on_delete=models.PROTECT, related_name='demandes_achat')
     quantite = models.IntegerField()
     montant_estime = models.DecimalField(max_digits=15, decimal_places=2)
@@ -418,6 +443,25 @@ class DemandeAchat(models.Model):
         verbose_name_plural = "Demandes d'achat"
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        if not self.numero:
+            self.numero = numero('ACH')
+
+        # Nouvelle demande : finance_service la reçoit pour validation
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            publier_evenement('stock.demande_achat_creee', self, {
+                'numero': self.numero,
+                'article_id': self.article_id,
+                'quantite': self.quantite,
+                'montant_estime': self.montant_estime,
+                'demandeur_id': self.demandeur_id,
+                'justification': self.justification,
+            })
+
     # ------------------------
     # Méthodes Finance
     # ------------------------
@@ -428,7 +472,9 @@ class DemandeAchat(models.Model):
         self.statut = 'approuve'
         self.finance_valideur_id = finance_user_id
         self.date_validation_finance = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            self._publier_decision_finance('stock.demande_achat_approuvee')
 
     def rejeter_finance(self, finance_user_id: uuid.UUID, commentaire: str = ''):
         """Rejette la demande côté finance."""
@@ -438,7 +484,19 @@ class DemandeAchat(models.Model):
         self.finance_valideur_id = finance_user_id
         self.commentaire_finance = commentaire
         self.date_validation_finance = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            self._publier_decision_finance('stock.demande_achat_rejetee')
+
+    def _publier_decision_finance(self, type_evenement):
+        publier_evenement(type_evenement, self, {
+            'numero': self.numero,
+            'article_id': self.article_id,
+            'quantite': self.quantite,
+            'montant_estime': self.montant_estime,
+            'finance_valideur_id': self.finance_valideur_id,
+            'commentaire': self.commentaire_finance,
+        })
 
     # ------------------------
     # Méthodes Magasinier
@@ -478,7 +536,7 @@ class DemandeReapprovisionnement(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    numero = models.CharField(max_length=100, unique=True)
+    numero = models.CharField(max_length=100, unique=True, blank=True)
     magasin = models.ForeignKey(Magasin, on_delete=models.PROTECT, related_name='demandes_reappro')
     article = models.ForeignKey(Article, on_delete=models.PROTECT, related_name='demandes_reappro')
     quantite_demandee = models.IntegerField()
@@ -503,6 +561,11 @@ class DemandeReapprovisionnement(models.Model):
         ordering = ['-created_at']
 
     # 🔹 Méthodes
+    def save(self, *args, **kwargs):
+        if not self.numero:
+            self.numero = numero('REA')
+        super().save(*args, **kwargs)
+
     def valider(self, responsable_stock_id: uuid.UUID):
         self.statut = 'approuve'
         self.validateur_id = responsable_stock_id
@@ -602,4 +665,47 @@ class LigneInventaire(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.article.nom}: compté {self.quantite_comptée}, stock {self.quantite_stock}, écart {self.ecart}"
\ No newline at end of file
+        return f"{self.article.nom}: compté {self.quantite_comptée}, stock {self.quantite_stock}, écart {self.ecart}"
+
+
+# ============================================================
+# 🔢 Compteurs de numérotation (hors PostgreSQL, voir commun/numerotation.py)
+# ============================================================
+class CompteurNumero(CompteurNumeroBase):
+    pass
+
+# ============================================================
+# 📨 Outbox transactionnelle et bus d'événements (voir commun/events.py)
+# ============================================================
+class EvenementOutbox(EvenementOutboxBase):
+    pass
+
+
+class EvenementConsomme(EvenementConsommeBase):
+    pass
+
+
+class CurseurConsommateur(CurseurConsommateurBase):
+    pass
+
+
+class UtilisateurAuth(models.Model):
+    """
+    Copie locale des utilisateurs auth_service utiles au stock (magasin, statut),
+    alimentée par les événements `auth.utilisateur_*` : évite un appel HTTP à
+    chaque mouvement de sortie.
+    """
+    id = models.UUIDField(primary_key=True, help_text="UUID de l'utilisateur (depuis auth_service)")
+    username = models.CharField(max_length=150)
+    role = models.CharField(max_length=50)
+    magasin_id = models.UUIDField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'utilisateurs_auth'
+        verbose_name = 'Utilisateur (copie auth)'
+        verbose_name_plural = 'Utilisateurs (copie auth)'
+
+    def __str__(self):
+        return f"{self.username} ({self.role})"